@@ -310,10 +310,13 @@ texinfo_documents = [
 
 # Example configuration for intersphinx: refer to the Python standard library.
 intersphinx_mapping = {
-    "python": ("https://docs.python.org/", None),
-    # TODO: Configure external documentation references, eg:
-    # 'Flask-Admin': ('https://flask-admin.readthedocs.io/en/latest/', None),
+    "python": ("https://docs.python.org/3/", None),
+    "babel": ("https://babel.pocoo.org/en/latest/", None),
+    "flask": ("https://flask.palletsprojects.com/en/latest/", None),
 }
 
 # Autodoc configuraton.
 autoclass_content = "both"
+
+# Cross-references in docstrings inherited from Flask-Babel.
+nitpick_ignore = [("py:meth", "init_app")]
@@ -300,16 +300,10 @@ except AttributeError:
 
     security.safe_str_cmp = hmac.compare_digest
 
-from flask_babel import (
-    Babel,
-    LazyString,
-    force_locale,
-    get_locale,
-    gettext,
-    lazy_gettext,
-)
+from flask_babel import Babel, LazyString, force_locale, get_locale, gettext
 
 from .ext import InvenioI18N
+from .lazy import lazy_gettext
 
 __version__ = "4.0.1"
 
@@ -4,13 +4,235 @@
 
 """Flask-Babel domain for merging translations from many directories."""
 
+import gettext
 import os
+import sys
+import tempfile
+from collections import OrderedDict
+from collections.abc import MutableMapping
 from importlib.resources import files
+from threading import Lock
 
+from babel import support
+from babel.messages.catalog import Catalog
+from babel.messages.mofile import read_mo, write_mo
+from flask import current_app, g, has_app_context
+from flask_babel import Babel, Domain, get_locale
 from invenio_base.utils import entry_points
 
+from .lazy import lazy_string_key
+from .mofile import load_mmap_translations
 
-class MultidirDomain:
+
+def find_catalog_locales(directories, domain="messages"):
+    """Find the locales with a compiled catalog in any of the directories.
+
+    :param directories: List of translation directories.
+    :param domain: Name of message catalog domain.
+    :returns: Sorted list of locale identifiers.
+    """
+    locales = set()
+    for dirname in directories:
+        for name in os.listdir(dirname):
+            if os.path.isfile(
+                os.path.join(dirname, name, "LC_MESSAGES", f"{domain}.mo")
+            ):
+                locales.add(name)
+    return sorted(locales)
+
+
+def merge_catalogs(directories, locale, domain="messages"):
+    """Merge the compiled catalogs of a locale from several directories.
+
+    Catalogs are looked up and merged exactly like
+    :meth:`MultidirDomain.load_translations` does at runtime, i.e. later
+    directories override messages and headers of earlier ones.
+
+    :param directories: List of translation directories.
+    :param locale: Locale identifier.
+    :param domain: Name of message catalog domain.
+    :returns: The merged :class:`~babel.messages.catalog.Catalog` or ``None``
+        if no directory has a catalog for the locale.
+    """
+    merged = None
+    for dirname in directories:
+        filename = gettext.find(domain, dirname, [str(locale)])
+        if filename is None:
+            continue
+        with open(filename, "rb") as fp:
+            catalog = read_mo(fp)
+        if merged is None:
+            merged = Catalog(locale=locale, domain=domain)
+        merged.mime_headers = catalog.mime_headers
+        for message in catalog:
+            if not message.id:
+                continue
+            context = message.context
+            if isinstance(context, bytes):
+                context = context.decode(catalog.charset)
+            msgid, string = message.id, message.string
+            if isinstance(msgid, list):
+                msgid, string = tuple(msgid), tuple(string)
+            # ``Catalog.add`` keeps the string of an existing message.
+            merged.delete(msgid, context=context)
+            merged.add(msgid, string, context=context)
+    return merged
+
+
+def lookup_message(translations, singular, plural=None, num=None, context=None):
+    """Look a message up in translations without formatting it.
+
+    See :meth:`MultidirDomain.lookup`.
+    """
+    if plural is None:
+        if context is None:
+            return translations.ugettext(singular)
+        return translations.upgettext(context, singular)
+    if context is None:
+        return translations.ungettext(singular, plural, num)
+    return translations.unpgettext(context, singular, plural, num)
+
+
+def estimate_size(translations):
+    """Estimate the memory used by the decoded messages of translations.
+
+    Catalogs which are not decoded into a dictionary (see
+    :mod:`invenio_i18n.mofile`) are counted as zero bytes.
+    """
+    catalog = getattr(translations, "_catalog", None)
+    if not isinstance(catalog, dict):
+        return 0
+    size = sys.getsizeof(catalog)
+    for key, value in catalog.items():
+        if isinstance(key, tuple):
+            key = key[0]
+        size += sys.getsizeof(key) + sys.getsizeof(value)
+    return size
+
+
+class CatalogCache(MutableMapping):
+    """Bounded LRU cache of merged translations.
+
+    Keys are ``(locale, domain)`` tuples. When the number of cached locales
+    exceeds ``maxsize`` or their estimated size (see :func:`estimate_size`)
+    exceeds ``max_bytes``, the least recently used locales are evicted.
+    Pinned locales are never evicted.
+    """
+
+    on_remove = None
+    """Callable called with the key of every removed or replaced catalog."""
+
+    def __init__(self, maxsize=0, max_bytes=0, pinned=()):
+        """Constructor.
+
+        :param maxsize: Maximum number of cached catalogs. ``0`` means no
+            limit.
+        :param max_bytes: Maximum estimated size of the cached catalogs.
+            ``0`` means no limit.
+        :param pinned: Locale identifiers which are never evicted.
+        """
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.pinned = frozenset(str(locale) for locale in pinned)
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self._bytes = 0
+        self._lock = Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key, default=None):
+        """Get a catalog and mark it as recently used."""
+        with self._lock:
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def peek(self, key):
+        """Get a catalog without marking it as used or counting it."""
+        return self._entries.get(key)
+
+    def __getitem__(self, key):
+        """Get a catalog."""
+        return self._entries[key]
+
+    def __setitem__(self, key, value):
+        """Cache a catalog and evict others if the cache is full."""
+        size = estimate_size(value)
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = value
+            self._sizes[key] = size
+            self._bytes += size
+            self._evict()
+
+    def __delitem__(self, key):
+        """Remove a catalog."""
+        with self._lock:
+            if key not in self._entries:
+                raise KeyError(key)
+            self._remove(key)
+
+    def __iter__(self):
+        """Iterate over the keys from least to most recently used."""
+        return iter(list(self._entries))
+
+    def __len__(self):
+        """Get the number of cached catalogs."""
+        return len(self._entries)
+
+    def clear(self):
+        """Remove all catalogs (statistics are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._bytes = 0
+
+    def _remove(self, key):
+        """Remove a catalog if it is cached."""
+        if self._entries.pop(key, None) is not None:
+            self._bytes -= self._sizes.pop(key)
+            if self.on_remove is not None:
+                self.on_remove(key)
+
+    def _evict(self):
+        """Evict the least recently used unpinned catalogs."""
+        for key in list(self._entries):
+            if not (
+                (self.maxsize and len(self._entries) > self.maxsize)
+                or (self.max_bytes and self._bytes > self.max_bytes)
+            ):
+                break
+            if key[0] in self.pinned:
+                continue
+            self._remove(key)
+            self.evictions += 1
+
+    def stats(self):
+        """Get the cache statistics.
+
+        :returns: Dictionary with the cached ``locales`` (from least to most
+            recently used), their estimated size in ``bytes``, the number of
+            ``hits``, ``misses`` and ``evictions`` and the limits.
+        """
+        with self._lock:
+            return {
+                "locales": [key[0] for key in self._entries],
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "maxsize": self.maxsize,
+                "max_bytes": self.max_bytes,
+                "pinned": sorted(self.pinned),
+            }
+
+
+class MultidirDomain(Domain):
     """Domain supporting merging translations from many catalogs.
 
     The domain contains an internal list of paths that it loads translations
@@ -18,17 +240,41 @@ class MultidirDomain:
     the last path in the list will overwrite strings set by previous paths.
 
     Entry points are added to the list of paths before the ``paths``.
+
+    Merged translations are cached per locale in ``cache``, a
+    :class:`CatalogCache`. They are loaded on first use, or up front with
+    :meth:`preload`.
     """
 
-    def __init__(self, paths=None, entry_point_group=None, domain="messages"):
+    def __init__(
+        self,
+        paths=None,
+        entry_point_group=None,
+        domain="messages",
+        catalog_backend="gnu",
+        cache=None,
+    ):
         """Initialize domain.
 
         :param paths: List of paths with translations.
         :param entry_point_group: Name of entry point group.
         :param domain: Name of message catalog domain.
             (Default: ``'messages'``)
+        :param catalog_backend: ``"gnu"`` to decode catalogs into memory or
+            ``"mmap"`` to look messages up in memory-mapped files (see
+            :mod:`invenio_i18n.mofile`). (Default: ``'gnu'``)
+        :param cache: The :class:`CatalogCache` of the merged translations.
+            (Default: an unbounded cache)
         """
-        self._translation_directories = []
+        super().__init__(translation_directories=[], domain=domain)
+        self.catalog_backend = catalog_backend
+        self.cache = cache if cache is not None else CatalogCache()
+        self.cache.on_remove = self._forget_resolved
+        self._signatures = {}
+        self.instruments = ()
+        self.resolved = OrderedDict()
+        self.resolved_maxsize = 0
+        self._resolved_lock = Lock()
 
         if entry_point_group:
             self.add_entrypoint(entry_point_group)
@@ -36,16 +282,308 @@ class MultidirDomain:
         for p in paths or []:
             self.add_path(p)
 
-    def add_entrypoint(self, entry_point_group):
-        """Load translations from an entry point."""
-        for ep in entry_points(group=entry_point_group):
-            if not (files(ep.module) / "translations").is_dir():
-                continue
-            dirname = str(files(ep.module) / "translations")
+    def add_entrypoint(self, entry_point_group, manifest=None):
+        """Load translations from an entry point.
+
+        :param entry_point_group: Name of entry point group.
+        :param manifest: A :class:`~invenio_i18n.manifest.DiscoveryManifest`
+            to take the directories from if it is valid, or to store them in
+            otherwise.
+        """
+        directories = manifest.get(entry_point_group) if manifest else None
+        if directories is None:
+            directories = []
+            for ep in entry_points(group=entry_point_group):
+                if not (files(ep.module) / "translations").is_dir():
+                    continue
+                directories.append(str(files(ep.module) / "translations"))
+            if manifest:
+                manifest.set(entry_point_group, directories)
+
+        for dirname in directories:
             self.add_path(dirname)
 
     def add_path(self, path):
-        """Load translations from an existing path."""
+        """Load translations from an existing path.
+
+        Paths which were already added are ignored.
+        """
         if not os.path.exists(path):
             raise RuntimeError(f"Path does not exists: {path}")
+        if path in self._translation_directories:
+            return
         self._translation_directories.append(path)
+        # Merged translations do not include the new path yet.
+        self.cache.clear()
+        with self._resolved_lock:
+            self.resolved.clear()
+
+    def load_translations(self, locale):
+        """Get the merged translations of a locale.
+
+        :param locale: A :class:`~babel.core.Locale` or locale identifier.
+        :returns: The cached translations, or the translations merged from
+            all directories if they are not cached yet.
+        """
+        cache = self.get_translations_cache(None)
+        key = (str(locale), self.domain[0])
+        translations = cache.get(key)
+        if translations is None:
+            signature = self._catalog_signature(locale)
+            translations = self._merge_translations(locale)
+            cache[key] = translations
+            self._signatures[key] = signature
+        return translations
+
+    def _catalog_signature(self, locale):
+        """Get the catalog files of a locale with their modification times."""
+        domain = self.domain[0]
+        signature = []
+        for dirname in self.translation_directories:
+            filename = gettext.find(domain, dirname, [str(locale)])
+            if filename is not None:
+                try:
+                    signature.append((filename, os.stat(filename).st_mtime_ns))
+                except OSError:
+                    continue
+        return tuple(signature)
+
+    def reload(self, locales=None):
+        """Reload the translations of cached locales.
+
+        The translations are loaded and merged before they replace the cached
+        ones, so requests never see partially loaded catalogs. Requests which
+        already use the previous translations keep them until they end.
+
+        :param locales: Locales to reload. Defaults to all cached locales.
+        :returns: List of reloaded locale identifiers.
+        """
+        domain = self.domain[0]
+        if locales is None:
+            locales = [locale for locale, name in list(self.cache) if name == domain]
+        reloaded = []
+        for locale in locales:
+            key = (str(locale), domain)
+            signature = self._catalog_signature(locale)
+            self.cache[key] = self._merge_translations(locale)
+            self._signatures[key] = signature
+            reloaded.append(key[0])
+        return reloaded
+
+    def reload_changed(self):
+        """Reload the cached locales whose catalog files have changed.
+
+        A catalog file changed if it was modified, added or removed since the
+        translations were loaded.
+
+        :returns: List of reloaded locale identifiers.
+        """
+        cached = set(self.cache)
+        for key in list(self._signatures):
+            if key not in cached:
+                self._signatures.pop(key, None)
+        changed = [
+            locale
+            for locale, domain in cached
+            if domain == self.domain[0]
+            and self._signatures.get((locale, domain))
+            != self._catalog_signature(locale)
+        ]
+        return self.reload(changed) if changed else []
+
+    def _merge_translations(self, locale):
+        """Load and merge the catalogs of a locale from all directories."""
+        domain = self.domain[0]
+        if self.catalog_backend == "mmap":
+            filenames = []
+            for dirname in self.translation_directories:
+                filename = gettext.find(domain, dirname, [str(locale)])
+                if filename is not None:
+                    filenames.append(filename)
+            return load_mmap_translations(filenames, domain)
+
+        translations = support.Translations()
+        for dirname in self.translation_directories:
+            catalog = support.Translations.load(dirname, [locale], domain)
+            translations.merge(catalog)
+            # ``merge`` does not copy the plural forms of the catalog.
+            if hasattr(catalog, "plural"):
+                translations.plural = catalog.plural
+        return translations
+
+    def write_merged_catalogs(self, output_directory, locales=None):
+        """Write one merged catalog per locale.
+
+        The catalogs are written as ``<locale>/LC_MESSAGES/<domain>.mo`` to
+        the output directory, which can then be used as the only translation
+        directory at runtime (see ``I18N_MERGED_TRANSLATIONS_PATH``).
+
+        :param output_directory: Directory to write the catalogs to.
+        :param locales: List of locale identifiers. Defaults to all locales
+            with a catalog in any of the translation directories.
+        :returns: List of written files.
+        """
+        domain = self.domain[0]
+        if locales is None:
+            locales = find_catalog_locales(self.translation_directories, domain)
+
+        written = []
+        for locale in locales:
+            catalog = merge_catalogs(self.translation_directories, locale, domain)
+            if catalog is None:
+                continue
+            dirname = os.path.join(output_directory, str(locale), "LC_MESSAGES")
+            os.makedirs(dirname, exist_ok=True)
+            filename = os.path.join(dirname, f"{domain}.mo")
+            # Replace the file atomically, it may be in use by a running app.
+            fd, tmp_path = tempfile.mkstemp(dir=dirname, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as fp:
+                    write_mo(fp, catalog)
+                os.replace(tmp_path, filename)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+            written.append(filename)
+        return written
+
+    def get_translations(self):
+        """Get the translations of the current locale.
+
+        The translations are kept in ``g``, so that a request uses the same
+        translations until it ends, even if they are reloaded meanwhile.
+        """
+        if not has_app_context():
+            return support.NullTranslations()
+        locale = get_locale()
+        loaded = g.setdefault("_invenio_i18n_translations", {})
+        translations = loaded.get((self, str(locale)))
+        if translations is None:
+            translations = self.load_translations(locale)
+            loaded[self, str(locale)] = translations
+        return translations
+
+    def _record(self, msgid, msgid_plural, context, missed):
+        """Pass a lookup to the instruments (see :mod:`.instrumentation`)."""
+        for instrument in self.instruments:
+            instrument(msgid, msgid_plural, context, missed)
+
+    def lookup(self, singular, plural=None, num=None, context=None):
+        """Look a message up in the translations of the current locale.
+
+        Unlike :meth:`gettext` and the like, the message is not formatted.
+        The lookup is passed to the instruments. Used by the template
+        gettext callables (see :mod:`invenio_i18n.jinja2`).
+
+        :param singular: The message id.
+        :param plural: The plural message id, if any.
+        :param num: The number selecting the plural form.
+        :param context: The message context, if any.
+        :returns: The translated message.
+        """
+        s = lookup_message(self.get_translations(), singular, plural, num, context)
+        if self.instruments:
+            # Lookups return the very same message id object if the message
+            # has no translation, which makes misses cheap to detect.
+            self._record(singular, plural, context, s is singular or s is plural)
+        return s
+
+    def gettext(self, string, **variables):
+        """Translate a string (see ``flask_babel.Domain.gettext``)."""
+        s = self.lookup(string)
+        return s if not variables else s % variables
+
+    def ngettext(self, singular, plural, num, **variables):
+        """Translate a plural string (see ``flask_babel.Domain.ngettext``)."""
+        variables.setdefault("num", num)
+        s = self.lookup(singular, plural, num)
+        return s if not variables else s % variables
+
+    def pgettext(self, context, string, **variables):
+        """Translate a string with context."""
+        s = self.lookup(string, context=context)
+        return s if not variables else s % variables
+
+    def npgettext(self, context, singular, plural, num, **variables):
+        """Translate a plural string with context."""
+        variables.setdefault("num", num)
+        s = self.lookup(singular, plural, num, context)
+        return s if not variables else s % variables
+
+    def resolve_lazy_string(self, lazy_string):
+        """Get the string of a lazy string, memoized per locale.
+
+        Resolved strings are keyed by the current locale, the translation
+        function and its arguments (see
+        :func:`~invenio_i18n.lazy.lazy_string_key`). The memo is a LRU cache of at most
+        ``resolved_maxsize`` strings. Strings are only memoized while the
+        translations of their locale are in ``cache``, and are dropped
+        when the translations are evicted, reloaded or when translations
+        are added. The memo is bypassed while instruments are installed, so
+        that they see every lookup.
+        """
+        if not self.resolved_maxsize or self.instruments or not has_app_context():
+            return str(lazy_string._func(*lazy_string._args, **lazy_string._kwargs))
+        locale = str(get_locale())
+        try:
+            key = (locale, *lazy_string_key(lazy_string))
+            with self._resolved_lock:
+                value = self.resolved.get(key)
+                if value is not None:
+                    self.resolved.move_to_end(key)
+                    return value
+        except TypeError:
+            # Unhashable arguments.
+            return str(lazy_string._func(*lazy_string._args, **lazy_string._kwargs))
+
+        translations = self.get_translations()
+        value = str(lazy_string._func(*lazy_string._args, **lazy_string._kwargs))
+        # Requests keep using replaced or evicted translations until they
+        # end, their strings must not be memoized.
+        if self.cache.peek((locale, self.domain[0])) is translations:
+            with self._resolved_lock:
+                self.resolved[key] = value
+                if len(self.resolved) > self.resolved_maxsize:
+                    self.resolved.popitem(last=False)
+        return value
+
+    def _forget_resolved(self, key):
+        """Drop the memoized strings of a removed catalog."""
+        locale = key[0]
+        with self._resolved_lock:
+            for resolved_key in [k for k in self.resolved if k[0] == locale]:
+                del self.resolved[resolved_key]
+
+    def preload(self, locales):
+        """Load and merge the translations of several locales.
+
+        Called before the application server forks its workers, the merged
+        catalogs are shared copy-on-write between the workers instead of
+        being loaded by each worker on first use.
+
+        :param locales: Iterable of :class:`~babel.core.Locale` objects or locale
+            identifiers.
+        """
+        for locale in locales:
+            self.load_translations(locale)
+
+
+class MultidirBabel(Babel):
+    """Flask-Babel extension translating with the domain of each application.
+
+    Flask-Babel keeps one domain per extension instance. Applications sharing
+    an :class:`~invenio_i18n.ext.InvenioI18N` instance (e.g. the UI and the
+    API application) each have their own :class:`MultidirDomain` instead,
+    with their own translation directories, catalog cache and backend (see
+    :func:`get_translation_domain`).
+    """
+
+    @property
+    def domain_instance(self):
+        """Get the domain of the current application."""
+        return get_translation_domain()
+
+
+def get_translation_domain(app=None):
+    """Get the :class:`MultidirDomain` of an application."""
+    return (app or current_app).extensions["invenio-i18n-domain"]
@@ -18,6 +18,15 @@ from rich_click import STRING
 from rich_click import Path as ClickPath
 from rich_click import group, option, secho
 
+from .babel import MultidirDomain
+from .instrumentation import (
+    aggregate_lookups,
+    aggregate_misses,
+    compact_dumps,
+    read_dumps,
+    write_misses_po,
+)
+from .reload import trigger_reload
 from .translation_utilities.collect import (
     collect_translations,
     write_translations_to_json,
@@ -671,3 +680,173 @@ def fetch_from_transifex(token, languages, output_directory):
         output_file = Path(f"{output_directory}/{language}.json")
         with output_file.open("w", encoding="utf-8") as fp:
             dump(collected_translations[language], fp, indent=4, ensure_ascii=False)
+
+
+@i18n.command("merge-catalogs")
+@option(
+    "--output-directory",
+    "-o",
+    type=ClickPath(file_okay=False, dir_okay=True, writable=True, path_type=Path),
+    default=None,
+    help="Directory for the merged catalogs. Default: I18N_MERGED_TRANSLATIONS_PATH",
+)
+@option(
+    "--locale",
+    "-l",
+    "locales",
+    multiple=True,
+    callback=convert_to_list,
+    help="Languages to merge. Default: all languages with a catalog",
+)
+def merge_catalogs(output_directory: Optional[Path], locales: Optional[list[str]]):
+    """Merge the compiled catalogs of all translation directories.
+
+    Writes one catalog per locale, merged from all translation directories of
+    the application with the same precedence as at runtime. Point
+    I18N_MERGED_TRANSLATIONS_PATH to the output directory to load only the
+    merged catalogs.
+
+    Examples:
+        invenio i18n merge-catalogs -o /opt/invenio/var/instance/translations-merged
+        invenio i18n merge-catalogs -o ./translations-merged -l de -l fr
+    """
+    output_directory = output_directory or current_app.config.get(
+        "I18N_MERGED_TRANSLATIONS_PATH"
+    )
+    if not output_directory:
+        secho("Error: Provide --output-directory", fg="red")
+        return
+
+    domain = MultidirDomain()
+    current_app.extensions["invenio-i18n"].add_translation_sources(domain, current_app)
+    written = domain.write_merged_catalogs(output_directory, locales or None)
+    secho(
+        f"Merged {len(domain.translation_directories)} translation directories "
+        f"into {len(written)} catalog(s) in {output_directory}",
+        fg="green",
+    )
+
+
+@i18n.command("reload-catalogs")
+def reload_catalogs():
+    """Make all workers reload their translation catalogs.
+
+    Touches I18N_RELOAD_TRIGGER_FILE. Running workers reload the catalogs
+    within I18N_RELOAD_INTERVAL seconds.
+
+    Examples:
+        invenio i18n reload-catalogs
+    """
+    if not trigger_reload():
+        secho("Error: I18N_RELOAD_TRIGGER_FILE is not set", fg="red")
+        return
+    secho(
+        f"Triggered reload: {current_app.config['I18N_RELOAD_TRIGGER_FILE']}",
+        fg="green",
+    )
+
+
+@i18n.command("missing-report")
+@option(
+    "--output",
+    "-o",
+    required=True,
+    type=ClickPath(writable=True, path_type=Path),
+    help="JSON file, or directory for one PO file per locale with --format po.",
+)
+@option(
+    "--format",
+    "output_format",
+    type=click.Choice(["json", "po"]),
+    default="json",
+    help="Report format. Default: json",
+)
+@option(
+    "--locale",
+    "-l",
+    "locales",
+    multiple=True,
+    callback=convert_to_list,
+    help="Languages to include. Default: all languages",
+)
+def missing_report(output: Path, output_format: str, locales: Optional[list[str]]):
+    """Report the most frequently looked up messages without translation.
+
+    Aggregates the counters written by all processes to
+    I18N_INSTRUMENTATION_DIRECTORY (see I18N_MISSES_SAMPLE_RATE).
+
+    Examples:
+        invenio i18n missing-report -o missing.json
+        invenio i18n missing-report --format po -o ./missing -l de
+    """
+    directory = current_app.config.get("I18N_INSTRUMENTATION_DIRECTORY")
+    if not directory:
+        secho("Error: I18N_INSTRUMENTATION_DIRECTORY is not set", fg="red")
+        return
+
+    compact_dumps(directory, "misses", current_app.config["I18N_MISSES_MAX_ENTRIES"])
+    report = aggregate_misses(read_dumps(directory, "misses"))
+    if locales:
+        report = {locale: report[locale] for locale in locales if locale in report}
+
+    if output_format == "po":
+        written = write_misses_po(report, output)
+        secho(f"Wrote {len(written)} PO file(s) to {output}", fg="green")
+    else:
+        ensure_parent_directory(None, None, output)
+        with output.open("w", encoding="utf-8") as fp:
+            dump(report, fp, indent=2, ensure_ascii=False)
+        secho(f"Wrote missing translations report: {output}", fg="green")
+
+
+@i18n.command("lookup-report")
+@option(
+    "--output",
+    "-o",
+    required=True,
+    type=ClickPath(writable=True, path_type=Path),
+    callback=ensure_parent_directory,
+    help="JSON file to write the report to.",
+)
+@option(
+    "--limit",
+    "-n",
+    type=int,
+    default=100,
+    help="Number of messages per language. Default: 100",
+)
+@option(
+    "--locale",
+    "-l",
+    "locales",
+    multiple=True,
+    callback=convert_to_list,
+    help="Languages to include. Default: all languages",
+)
+def lookup_report(output: Path, limit: int, locales: Optional[list[str]]):
+    """Report the most looked up messages and the lookups per endpoint.
+
+    Aggregates the counters written by all processes to
+    I18N_INSTRUMENTATION_DIRECTORY (see I18N_LOOKUPS_SAMPLE_RATE).
+
+    Examples:
+        invenio i18n lookup-report -o lookups.json
+        invenio i18n lookup-report -o lookups.json -n 20 -l de
+    """
+    directory = current_app.config.get("I18N_INSTRUMENTATION_DIRECTORY")
+    if not directory:
+        secho("Error: I18N_INSTRUMENTATION_DIRECTORY is not set", fg="red")
+        return
+
+    compact_dumps(directory, "lookups", current_app.config["I18N_LOOKUPS_MAX_ENTRIES"])
+    report = aggregate_lookups(read_dumps(directory, "lookups"), limit)
+    if locales:
+        report["locales"] = {
+            locale: report["locales"][locale]
+            for locale in locales
+            if locale in report["locales"]
+        }
+
+    with output.open("w", encoding="utf-8") as fp:
+        dump(report, fp, indent=2, ensure_ascii=False)
+    secho(f"Wrote lookup report: {output}", fg="green")
@@ -13,6 +13,144 @@ sets system-wide defaults. For further details see:
 I18N_TRANSLATIONS_PATHS = []
 """List of paths to load message catalogs from."""
 
+I18N_MERGED_TRANSLATIONS_PATH = None
+"""Directory with merged catalogs to load instead of all translation paths.
+
+By default, the catalogs of a locale are loaded from every translation
+directory (``I18N_TRANSLATIONS_PATHS``, entry points and the instance
+``translations`` folder) and merged at runtime. The command
+``invenio i18n merge-catalogs`` writes one merged catalog per locale, using
+the same precedence. If this variable points to its output directory, only
+those catalogs are loaded.
+"""
+
+I18N_CATALOG_BACKEND = "gnu"
+"""How compiled message catalogs are loaded.
+
+``"gnu"`` decodes all messages of a catalog into a dictionary of each
+process. ``"mmap"`` maps the ``.mo`` files into memory and decodes messages
+on lookup only, so that all worker processes of a host share one copy of
+the catalogs in the page cache (see :mod:`invenio_i18n.mofile`). The mmap
+backend works best together with ``I18N_MERGED_TRANSLATIONS_PATH``.
+
+With the mmap backend, catalogs must only be replaced atomically (written to
+a temporary file and renamed). Recompiling a ``.mo`` file in place
+truncates it under the running workers, which are then killed with
+``SIGBUS``.
+"""
+
+I18N_CATALOG_CACHE_SIZE = 0
+"""Maximum number of locales whose translations are kept in memory.
+
+Translations of a locale are loaded on its first request and are kept for the
+life of the worker process. If set, the least recently used locales are
+evicted when more locales are loaded. ``0`` means no limit.
+"""
+
+I18N_CATALOG_CACHE_BYTES = 0
+"""Maximum estimated size in bytes of the translations kept in memory.
+
+``0`` means no limit. Memory-mapped catalogs (see ``I18N_CATALOG_BACKEND``)
+are not counted.
+"""
+
+I18N_CATALOG_CACHE_PINNED = []
+"""Locales which are never evicted from the translations cache.
+
+``BABEL_DEFAULT_LOCALE`` is always pinned. Add the most requested locales of
+your instance, e.g. ``["de", "fr"]``.
+"""
+
+I18N_RELOAD_INTERVAL = 0
+"""Seconds between two checks for changed translation catalogs.
+
+If set, every worker process reloads the translations of cached locales
+whose catalog files have been modified, added or removed, without a restart
+(see :mod:`invenio_i18n.reload`). ``0`` disables reloading.
+"""
+
+I18N_RELOAD_TRIGGER_FILE = None
+"""File whose modification makes all workers reload all cached catalogs.
+
+Touched by ``invenio i18n reload-catalogs``. Only used if
+``I18N_RELOAD_INTERVAL`` is set.
+"""
+
+I18N_MISSES_SAMPLE_RATE = 0
+"""Fraction of translation lookups checked for missing translations.
+
+If set (e.g. to ``0.01``), a sample of the lookups of messages without
+translation in the current locale is counted per locale and message (see
+:mod:`invenio_i18n.instrumentation`). ``invenio i18n missing-report``
+builds a JSON or PO report from the counts of all processes. ``0`` disables
+the collector.
+"""
+
+I18N_MISSES_MAX_ENTRIES = 10000
+"""Maximum number of distinct missing messages counted per process."""
+
+I18N_MISSES_IGNORED_LOCALES = None
+"""Locales whose missing translations are not collected.
+
+Usually the language the messages are written in, which needs no
+translation. ``None`` ignores ``BABEL_DEFAULT_LOCALE``.
+"""
+
+I18N_LOOKUPS_SAMPLE_RATE = 0
+"""Fraction of translation lookups counted for lookup statistics.
+
+If set, a sample of the lookups of translated messages is counted per locale
+and message, and the number of lookups of every request is summed up per
+endpoint (see :class:`invenio_i18n.instrumentation.LookupStatistics`).
+``invenio i18n lookup-report`` builds a report from the counts of all
+processes. ``0`` disables the statistics.
+"""
+
+I18N_LOOKUPS_MAX_ENTRIES = 10000
+"""Maximum number of distinct translated messages counted per process."""
+
+I18N_INSTRUMENTATION_DIRECTORY = None
+"""Directory the worker processes write their lookup counters to.
+
+Must be shared by all processes whose counters should end up in the same
+report, e.g. ``/var/tmp/invenio-i18n``. Each process writes its own file,
+and the files of finished processes are merged into one file per host.
+"""
+
+I18N_INSTRUMENTATION_FLUSH_INTERVAL = 300
+"""Seconds between two writes of the counters of a process."""
+
+I18N_LAZY_STRING_CACHE_SIZE = 10000
+"""Maximum number of resolved lazy strings memoized per process.
+
+Applies to lazy strings of :mod:`invenio_i18n.lazy` (e.g.
+``invenio_i18n.lazy_gettext``). The least recently used strings are dropped
+first, and the strings of a locale are dropped when its translations are
+reloaded or evicted from the catalog cache. ``0`` disables it.
+"""
+
+I18N_JSON_BACKEND = "json"
+"""Library used by the JSON provider of the application.
+
+``"json"`` for the standard library or ``"orjson"`` for `orjson
+<https://github.com/ijl/orjson>`_, if it is installed (e.g. with the
+``orjson`` extra). orjson never escapes non-ASCII characters.
+"""
+
+I18N_DISCOVERY_MANIFEST = None
+"""Path of a file caching the translation directories of entry points.
+
+Discovering the translation directories of all installed packages is
+repeated on every application startup. If set, the result is stored in this
+file and reused by later startups until a package is installed, upgraded or
+removed (see :class:`~invenio_i18n.manifest.DiscoveryManifest`). The
+directory must be writable by the application, e.g.:
+
+.. code-block:: python
+
+    I18N_DISCOVERY_MANIFEST = "/var/cache/invenio/i18n-manifest.json"
+"""
+
 I18N_LANGUAGES = []
 """List of tuples of available languages.
 
@@ -27,24 +165,162 @@ Example configuration with english and danish with english as default language:
 .. note:: You should not include ``BABEL_DEFAULT_LOCALE`` in this list.
 """
 
+I18N_PRELOAD_LOCALES = False
+"""Load the translations of these locales when the application is created.
+
+Translations are otherwise loaded and merged from all translation
+directories on the first request of each locale, separately in every worker
+process. Set to ``True`` to preload all languages of ``I18N_LANGUAGES`` (and
+the default locale) or to a list of locale codes. If the application is
+created before the server forks its workers (e.g. ``gunicorn --preload``),
+the workers share the loaded catalogs copy-on-write.
+"""
+
 I18N_SET_LANGUAGE_URL = "/lang"
 """URL prefix for set language view.
 
 Set to ``None`` to prevent view from being installed.
 """
 
+I18N_URL_PREFIX_ROUTING = False
+"""Accept a language code as first URL segment, e.g. ``/de/records/1``.
+
+The prefix is removed before routing and decides the locale of the request.
+Links built with ``url_for`` keep the prefix and the set language view
+redirects to the URL with the new prefix. Each language variant of a page
+thus has its own URL and can be cached independently by proxies. Other
+spellings of a configured code (e.g. ``/DE/``) redirect to the configured
+one.
+"""
+
+I18N_URL_PREFIX_EXCLUDED_ENDPOINTS = ["static", "*.static"]
+"""Endpoints whose links never get the language prefix.
+
+Patterns (see :mod:`fnmatch`) of language independent endpoints, by default
+the static files of the application and of all blueprints.
+"""
+
 I18N_DEFAULT_REDIRECT_ENDPOINT = None
 """Endpoint to redirect if no next parameter is provided."""
 
 I18N_SESSION_KEY = "language"
 """Key to retrieve language identifier from the current session object."""
 
+I18N_LANGUAGE_STORAGE = "session"
+"""Where the language chosen with the set language view is stored.
+
+* ``"session"`` stores it in the session under ``I18N_SESSION_KEY``.
+* ``"cookie"`` stores it in a dedicated cookie signed with the application's
+  ``SECRET_KEY``. The locale selector then never reads the session, which
+  avoids loading it from a server-side session store for anonymous requests.
+"""
+
+I18N_LANGUAGE_COOKIE_NAME = "language"
+"""Name of the language cookie (see ``I18N_LANGUAGE_STORAGE``)."""
+
+I18N_LANGUAGE_COOKIE_MAX_AGE = 60 * 60 * 24 * 365
+"""Lifetime of the language cookie in seconds."""
+
 I18N_USER_LANG_ATTR = "prefered_language"
 """Attribute name which contains language identifier on the User object.
 
 It is used only when the login manager is installed and a user is
 authenticated. Set to ``None`` to prevent selector from being used.
 """
+
+I18N_USER_LANG_RESOLVER = None
+"""Factory for the resolver of the logged-in user's language.
+
+Import string or callable which is called with the application and returns a
+callable without arguments returning the user's language code (or ``None``).
+The resolver should also provide an ``invalidate(user=None)`` method. By
+default a :class:`~invenio_i18n.users.UserAttributeResolver` reading
+``I18N_USER_LANG_ATTR`` is used.
+"""
+
+I18N_USER_LANG_CACHE_TTL = 0
+"""Seconds the language of a user is cached by the default resolver.
+
+``0`` loads the user on every request. The cache is local to each process:
+:meth:`~invenio_i18n.ext.InvenioI18N.invalidate_user_language` only clears
+the calling process, so other processes may serve the old language of a
+user for up to this number of seconds.
+"""
+
+I18N_USER_LANG_CACHE_SIZE = 1024
+"""Maximum number of users whose language is cached by the default resolver."""
+
+I18N_TIMEZONE_QUERY_ARG = "tz"
+"""Query string argument selecting the timezone of a request, e.g.
+``?tz=Europe/Zurich``. Set to ``None`` to ignore the query string.
+"""
+
+I18N_TIMEZONE_SESSION_KEY = "timezone"
+"""Key to retrieve the timezone name from the current session object."""
+
+I18N_TIMEZONE_COOKIE_NAME = "timezone"
+"""Name of the timezone cookie (see ``I18N_LANGUAGE_STORAGE``)."""
+
+I18N_USER_TIMEZONE_ATTR = "timezone"
+"""Attribute name which contains the timezone name on the User object.
+
+Set to ``None`` to prevent selector from being used.
+"""
+
+I18N_USER_TIMEZONE_RESOLVER = None
+"""Factory for the resolver of the logged-in user's timezone.
+
+Same as ``I18N_USER_LANG_RESOLVER``, for the timezone name. By default a
+:class:`~invenio_i18n.users.UserAttributeResolver` reading
+``I18N_USER_TIMEZONE_ATTR`` is used.
+"""
+
+I18N_USER_TIMEZONE_CACHE_TTL = 0
+"""Seconds the timezone of a user is cached by the default resolver.
+
+Same as ``I18N_USER_LANG_CACHE_TTL``: ``0`` loads the user on every request,
+and :meth:`~invenio_i18n.ext.InvenioI18N.invalidate_user_timezone` only
+clears the calling process.
+"""
+
+I18N_USER_TIMEZONE_CACHE_SIZE = 1024
+"""Maximum number of users whose timezone is cached by the default resolver."""
+
+I18N_LOCALE_SELECTORS = [
+    "invenio_i18n.selectors:URLLocaleSelector",
+    "invenio_i18n.selectors:QueryStringLocaleSelector",
+    "invenio_i18n.selectors:StoredLocaleSelector",
+    "invenio_i18n.selectors:UserLocaleSelector",
+    "invenio_i18n.selectors:HeaderLocaleSelector",
+]
+"""Stages of the default locale selector, tried in order.
+
+Items are :class:`~invenio_i18n.selectors.LocaleSelector` classes, instances
+or import strings. The first stage returning a language code decides the
+locale, otherwise ``BABEL_DEFAULT_LOCALE`` is used. Remove stages your
+instance does not need, e.g. the user stage on a purely anonymous site.
+"""
+
+I18N_RESPONSE_HEADERS = True
+"""Add ``Content-Language`` and ``Vary`` headers to localized responses.
+
+If the locale was selected while handling a request, the response gets a
+``Content-Language`` header and a ``Vary`` header with the request headers the
+consulted selector stages depend on (e.g. ``Accept-Language``), so that shared
+caches store one copy per language. Locales taken from the URL or the query
+string do not add a ``Vary`` header. Responses using a timezone selected from
+the stored or the user's timezone vary on ``Cookie`` (see
+:func:`invenio_i18n.selectors.get_timezone`).
+"""
+
+I18N_ACCEPT_LANGUAGE_CACHE_SIZE = 256
+"""Number of distinct ``Accept-Language`` header values to cache.
+
+The locale negotiated for a raw header value is kept in a per-application LRU
+cache, so the header is only parsed the first time it is seen. Set to ``0`` to
+disable the cache.
+"""
+
 I18N_JS_DISTR_EXCEPTIONAL_PACKAGE_MAP = {}
 """Exceptional package name mapper for JS/React localization distribution.
 
@@ -7,22 +7,68 @@
 import json
 import os.path
 
-from babel import Locale, UnknownLocaleError
+from babel import Locale
 from flask import current_app
-from flask_babel import Babel, LazyString
+from flask.json.provider import DefaultJSONProvider
+from flask_babel import LazyString
 from flask_babel import get_locale as get_current_locale
 from flask_babel import get_timezone as get_current_timezone
 from werkzeug.local import LocalProxy
 
 from . import config
-from .babel import MultidirDomain
+from .babel import (
+    CatalogCache,
+    MultidirBabel,
+    MultidirDomain,
+    get_translation_domain,
+)
+from .formatting import (
+    format_date,
+    format_datetime,
+    format_datetimes,
+    format_decimal,
+    format_filesize,
+    format_filesizes,
+    format_number,
+    format_numbers,
+    format_time,
+)
+from .instrumentation import (
+    aggregate_lookups,
+    get_lookup_statistics,
+    get_request_lookups,
+    init_lookup_statistics,
+    init_miss_collector,
+)
 from .jinja2 import (
     filter_language_name,
     filter_language_name_local,
     filter_to_user_timezone,
     filter_to_utc,
+    template_gettext,
+    template_ngettext,
+    template_npgettext,
+    template_pgettext,
+)
+from .json import I18NJSONProvider
+from .manifest import DiscoveryManifest
+from .negotiation import MAX_IDENTIFIER_LENGTH, parse_locale_identifier
+from .registry import build_language_registry, get_language_registry
+from .reload import init_catalog_reloader
+from .routing import init_url_prefix_routing
+from .selectors import (
+    get_locale,
+    get_timezone,
+    init_accept_language_cache,
+    init_locale_selector,
+    set_response_headers,
+)
+from .users import (
+    get_user_language_resolver,
+    get_user_timezone_resolver,
+    init_user_language_resolver,
+    init_user_timezone_resolver,
 )
-from .selectors import get_locale, get_timezone
 
 current_i18n = LocalProxy(lambda: current_app.extensions["invenio-i18n"])
 text_type = str
@@ -31,7 +77,9 @@ text_type = str
 def get_lazystring_encoder(app):
     """Return a JSONEncoder for handling lazy strings from Babel.
 
-    Installed on Flask application by default by :class:`InvenioI18N`.
+    .. deprecated:: 4.1.0
+       :class:`InvenioI18N` installs
+       :class:`~invenio_i18n.json.I18NJSONProvider` instead.
     """
 
     class JSONEncoder(json.JSONEncoder):
@@ -62,20 +110,13 @@ class InvenioI18N(object):
         :param localeselector: Callback function used for locale selection.
             (Default: :func:`invenio_i18n.selectors.get_locale()`)
         :param timezoneselector: Callback function used for timezone selection.
-            (Default: ``BABEL_DEFAULT_TIMEZONE``)
+            (Default: :func:`invenio_i18n.selectors.get_timezone()`)
         :param entry_point_group: Entrypoint used to load translations from.
             Set to ``None`` to not load translations from entry points.
         """
-        self.domain = MultidirDomain()
-        self.babel = Babel(
-            date_formats=date_formats,
-            configure_jinja=True,
-            default_domain=self.domain,
-        )
+        self.babel = MultidirBabel(date_formats=date_formats, configure_jinja=True)
         self.entry_point_group = entry_point_group
         self.translation_bundle_entry_point = translation_bundle_entry_point
-        self._locales_cache = None
-        self._languages_cache = None
 
         if app:
             self.init_app(app, localeselector, timezoneselector)
@@ -86,27 +127,77 @@ class InvenioI18N(object):
         The initialization will:
 
          * Set default values for the configuration variables.
+         * Create the translation domain of the application, see
+           :meth:`init_multidir_domain`.
          * Load translations from paths specified in
-           ``I18N_TRANSLATIONS_PATHS``.
+           ``I18N_TRANSLATIONS_PATHS`` (or only the merged catalogs from
+           ``I18N_MERGED_TRANSLATIONS_PATH``).
          * Load translations from ``app.root_path>/translations`` if it exists.
-         * Load translations from a specified entry point.
+         * Load translations from a specified entry point (using the
+           discovery manifest from ``I18N_DISCOVERY_MANIFEST`` if set).
+         * Build the language registry of the application from
+           ``I18N_LANGUAGES``.
+         * Build the locale selector pipeline from ``I18N_LOCALE_SELECTORS``
+           together with the
+           ``Accept-Language`` cache and the user language resolver it uses.
+         * Install the user timezone resolver of the timezone selector.
+         * Install the URL language prefix middleware if
+           ``I18N_URL_PREFIX_ROUTING`` is enabled.
+         * Add ``Content-Language`` and ``Vary`` response headers if
+           ``I18N_RESPONSE_HEADERS`` is enabled.
+         * Preload the translations of the locales in
+           ``I18N_PRELOAD_LOCALES``.
+         * Start reloading changed catalogs if ``I18N_RELOAD_INTERVAL`` is
+           set.
+         * Collect missing translations if ``I18N_MISSES_SAMPLE_RATE`` is set.
+         * Collect lookup statistics if ``I18N_LOOKUPS_SAMPLE_RATE`` is set.
+         * Install template gettext callables translating with the domain of
+           the application (see :func:`~invenio_i18n.jinja2.template_gettext`).
          * Add ``toutc`` and ``tousertimezone`` template filters.
-         * Install a custom JSON encoder on app.
+         * Add ``format_datetime``, ``format_date``, ``format_time``,
+           ``format_number``, ``format_decimal`` and ``format_filesize``
+           template filters and their batch variants ``format_datetimes``,
+           ``format_numbers`` and ``format_filesizes``, see
+           :mod:`invenio_i18n.formatting`.
+         * Install a lazy string aware JSON provider on app, see
+           :class:`~invenio_i18n.json.I18NJSONProvider`.
         """
         self.init_config(app)
-        self.init_multidir_domain(app)
+        domain = self.init_multidir_domain(app)
 
         # Initialize Flask-Babel
         self.babel.init_app(
             app,
-            default_translation_directories=";".join(
-                self.domain._translation_directories
-            ),
+            default_translation_directories=";".join(domain.translation_directories),
             locale_selector=localeselector or get_locale,
             timezone_selector=timezoneselector or get_timezone,
         )
 
         app.config.setdefault("BABEL_DEFAULT_LOCALE", "en")
+        build_language_registry(app)
+        if app.config["I18N_PRELOAD_LOCALES"]:
+            self.preload_translations(app)
+        init_catalog_reloader(app, domain)
+        init_miss_collector(app, domain)
+        init_lookup_statistics(app, domain)
+        init_accept_language_cache(app)
+        init_user_language_resolver(app)
+        init_locale_selector(app)
+        init_user_timezone_resolver(app)
+        init_url_prefix_routing(app)
+        if app.config["I18N_RESPONSE_HEADERS"] and set_response_headers not in (
+            app.after_request_funcs.get(None, [])
+        ):
+            app.after_request(set_response_headers)
+
+        # Template lookups go through the domain of the application.
+        app.jinja_env.install_gettext_callables(
+            gettext=template_gettext,
+            ngettext=template_ngettext,
+            newstyle=True,
+            pgettext=template_pgettext,
+            npgettext=template_npgettext,
+        )
 
         # Register Jinja2 template filters for date formatting (Flask-Babel
         # already installs other filters).
@@ -114,10 +205,23 @@ class InvenioI18N(object):
         app.add_template_filter(filter_to_user_timezone, name="tousertimezone")
         app.add_template_filter(filter_language_name, name="language_name")
         app.add_template_filter(filter_language_name_local, name="language_name_local")
+
+        # Formatting with cached compiled patterns (see formatting module).
+        app.add_template_filter(format_datetime, name="format_datetime")
+        app.add_template_filter(format_date, name="format_date")
+        app.add_template_filter(format_time, name="format_time")
+        app.add_template_filter(format_number, name="format_number")
+        app.add_template_filter(format_decimal, name="format_decimal")
+        app.add_template_filter(format_filesize, name="format_filesize")
+        app.add_template_filter(format_datetimes, name="format_datetimes")
+        app.add_template_filter(format_numbers, name="format_numbers")
+        app.add_template_filter(format_filesizes, name="format_filesizes")
         app.add_template_global(current_i18n, name="current_i18n")
 
-        # Lazy string aware JSON encoder.
-        app.json_provider_class = get_lazystring_encoder(app)
+        # Lazy string aware JSON provider, unless the application has its own.
+        if type(app.json) is DefaultJSONProvider:
+            app.json_provider_class = I18NJSONProvider
+            app.json = I18NJSONProvider(app)
 
         app.extensions["invenio-i18n"] = self
 
@@ -128,64 +232,206 @@ class InvenioI18N(object):
                 app.config.setdefault(k, getattr(config, k))
 
     def init_multidir_domain(self, app):
-        """Initialize MultidirDomain."""
+        """Initialize the MultidirDomain of an application.
+
+        Each application has its own domain, see
+        :func:`~invenio_i18n.babel.get_translation_domain`.
+
+        If ``I18N_MERGED_TRANSLATIONS_PATH`` is set, only the merged catalogs
+        in that directory are loaded. Otherwise, if
+        ``BABEL_TRANSLATION_DIRECTORIES`` is set, only the directories listed
+        there are loaded, like Flask-Babel does. Otherwise see
+        :meth:`add_translation_sources`. Loaded catalogs are kept in a
+        :class:`~invenio_i18n.babel.CatalogCache` limited by
+        ``I18N_CATALOG_CACHE_SIZE`` and ``I18N_CATALOG_CACHE_BYTES``.
+
+        :returns: The :class:`~invenio_i18n.babel.MultidirDomain`.
+        """
+        cache = CatalogCache(
+            maxsize=app.config["I18N_CATALOG_CACHE_SIZE"],
+            max_bytes=app.config["I18N_CATALOG_CACHE_BYTES"],
+            pinned=[
+                app.config.get("BABEL_DEFAULT_LOCALE", "en"),
+                *app.config["I18N_CATALOG_CACHE_PINNED"],
+            ],
+        )
+        domain = MultidirDomain(
+            catalog_backend=app.config["I18N_CATALOG_BACKEND"], cache=cache
+        )
+        domain.resolved_maxsize = app.config["I18N_LAZY_STRING_CACHE_SIZE"]
+        merged_path = app.config["I18N_MERGED_TRANSLATIONS_PATH"]
+        babel_directories = app.config.get("BABEL_TRANSLATION_DIRECTORIES")
+        if merged_path:
+            domain.add_path(merged_path)
+        elif babel_directories:
+            for path in babel_directories.split(";"):
+                # Relative to the application like in Flask-Babel.
+                path = os.path.join(app.root_path, path)
+                if os.path.isdir(path):
+                    domain.add_path(path)
+        else:
+            self.add_translation_sources(domain, app)
+        app.extensions["invenio-i18n-domain"] = domain
+        return domain
+
+    def add_translation_sources(self, domain, app):
+        """Add the translation directories of an application to a domain."""
         # 1. Paths listed in I18N_TRANSLATIONS_PATHS
         for p in app.config.get("I18N_TRANSLATIONS_PATHS", []):
-            self.domain.add_path(p)
+            domain.add_path(p)
+
+        manifest = None
+        if app.config["I18N_DISCOVERY_MANIFEST"]:
+            manifest = DiscoveryManifest(app.config["I18N_DISCOVERY_MANIFEST"])
 
         # 2. Entrypoints
         if self.entry_point_group:
-            self.domain.add_entrypoint(self.entry_point_group)
+            domain.add_entrypoint(self.entry_point_group, manifest=manifest)
 
         # 3. bundle entrypoint
         if self.translation_bundle_entry_point:
-            self.domain.add_entrypoint(self.translation_bundle_entry_point)
+            domain.add_entrypoint(
+                self.translation_bundle_entry_point, manifest=manifest
+            )
 
         # 4. <app.root_path>/translations
         app_translations = os.path.join(app.root_path, "translations")
         if os.path.exists(app_translations):
-            self.domain.add_path(app_translations)
+            domain.add_path(app_translations)
 
-    def iter_languages(self):
-        """Iterate over list of languages."""
-        default_lang = self.babel.default_locale.language
-        default_title = self.babel.default_locale.get_display_name(default_lang)
+    def preload_translations(self, app=None, locales=None):
+        """Load and merge the translations of several locales up front.
+
+        See :meth:`~invenio_i18n.babel.MultidirDomain.preload`.
+
+        :param app: Flask application. Defaults to the current application.
+        :param locales: Iterable of locales. Defaults to the list in
+            ``I18N_PRELOAD_LOCALES`` or, if it is not a list, all configured
+            locales.
+        """
+        app = app or current_app
+        if locales is None:
+            locales = app.config.get("I18N_PRELOAD_LOCALES")
+            if not isinstance(locales, (list, tuple)):
+                locales = get_language_registry(app).locales
+        get_translation_domain(app).preload(locales)
+
+    @property
+    def domain(self):
+        """Get the translation domain of the current application.
+
+        See :class:`~invenio_i18n.babel.MultidirDomain`.
+        """
+        return get_translation_domain()
 
-        yield (default_lang, default_title)
+    def reload_translations(self, locales=None):
+        """Reload the translations of cached locales in this process.
 
-        for lang, title in current_app.config.get("I18N_LANGUAGES", []):
-            yield lang, title
+        See :meth:`~invenio_i18n.babel.MultidirDomain.reload`. To reload the
+        translations in all worker processes, use
+        :func:`~invenio_i18n.reload.trigger_reload`.
+        """
+        return self.domain.reload(locales)
+
+    def get_lookup_statistics(self, limit=None):
+        """Get the lookup statistics of this process.
+
+        See :func:`~invenio_i18n.instrumentation.aggregate_lookups`. Use
+        ``invenio i18n lookup-report`` for the statistics of all processes.
+
+        :param limit: Maximum number of messages per locale.
+        :returns: The statistics or ``None`` if ``I18N_LOOKUPS_SAMPLE_RATE``
+            is not set.
+        """
+        statistics = get_lookup_statistics()
+        if statistics is None:
+            return None
+        with statistics._lock:
+            dump = statistics.dump()
+        return aggregate_lookups([dump], limit)
+
+    @property
+    def request_lookups(self):
+        """Get the number of translation lookups of the current request."""
+        return get_request_lookups()
+
+    def iter_languages(self):
+        """Iterate over list of languages."""
+        yield from get_language_registry().languages
 
     def get_languages(self):
-        """Get list of languages."""
-        if self._languages_cache is None:
-            self._languages_cache = list(self.iter_languages())
-        return self._languages_cache
+        """Get list of languages.
+
+        Read from the :class:`~invenio_i18n.registry.LanguageRegistry` of the
+        current application.
+        """
+        return list(get_language_registry().languages)
 
     def get_locales(self):
         """Get a list of supported locales.
 
-        Computes the list using ``I18N_LANGUAGES`` configuration variable.
+        Computes the list using ``I18N_LANGUAGES`` configuration variable
+        once per application, see
+        :class:`~invenio_i18n.registry.LanguageRegistry`.
         """
-        if self._locales_cache is None:
-            langs = [self.babel.default_locale]
-            for lang, dummy_title in current_app.config.get("I18N_LANGUAGES", []):
-                langs.append(Locale.parse(lang))
-            self._locales_cache = langs
+        return list(get_language_registry().locales)
 
-        return self._locales_cache
+    def get_display_name(self, code, display_code=None):
+        """Get the display name of a configured language.
 
-    def is_locale_available(self, locale):
+        See :meth:`~invenio_i18n.registry.LanguageRegistry.get_display_name`.
+        """
+        return get_language_registry().get_display_name(code, display_code)
+
+    def is_locale_available(self, locale, fallback=False):
         """Check if provided locale is available.
 
         First parse a locale and then check if it is configured as available.
         Could be that locale data is available (Locale will not raise) but it
         is not configured as available in the app.
+
+        Parsing is memoized (see
+        :func:`~invenio_i18n.negotiation.parse_locale_identifier`), so the
+        check is cheap enough to validate untrusted input on every request.
+
+        :param fallback: Also accept regional and script variants of a
+            configured locale (e.g. ``de_AT`` if ``de`` is configured), see
+            :meth:`~invenio_i18n.negotiation.LocaleIndex.match`.
         """
-        try:
-            return Locale.parse(locale) in self.get_locales()
-        except (UnknownLocaleError, TypeError):
+        registry = get_language_registry()
+        if isinstance(locale, Locale):
+            locale = str(locale)
+        elif not isinstance(locale, str) or len(locale) > MAX_IDENTIFIER_LENGTH:
             return False
+        if locale in registry.identifiers:
+            return True
+        if fallback and registry.index.match(locale) is not None:
+            return True
+        return parse_locale_identifier(locale) in registry.identifiers
+
+    def invalidate_user_language(self, user=None):
+        """Drop the cached language of a user in the current application.
+
+        Call it after the user changed the preferred language, so that the
+        change takes effect in this process before the cache entry expires
+        (see ``I18N_USER_LANG_CACHE_TTL``).
+
+        :param user: The user object or the value of its ``get_id()`` (not
+            necessarily the user id). If ``None``, all users are dropped.
+        """
+        get_user_language_resolver().invalidate(user)
+
+    def invalidate_user_timezone(self, user=None):
+        """Drop the cached timezone of a user in the current application.
+
+        Call it after the user changed the timezone, so that the change
+        takes effect in this process before the cache entry expires (see
+        ``I18N_USER_TIMEZONE_CACHE_TTL``).
+
+        :param user: The user object or the value of its ``get_id()`` (not
+            necessarily the user id). If ``None``, all users are dropped.
+        """
+        get_user_timezone_resolver().invalidate(user)
 
     @property
     def locale(self):
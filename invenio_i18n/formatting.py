@@ -0,0 +1,289 @@
+# SPDX-FileCopyrightText: 2026 CERN.
+# SPDX-License-Identifier: MIT
+
+"""Date and number formatting with compiled patterns.
+
+The functions of this module format like the corresponding functions of
+Flask-Babel, but look the compiled Babel pattern up in a cache keyed by
+locale and format. Predefined datetime formats (``short``, ``medium``,
+``long`` and ``full``) are compiled into one pattern combining the date and
+time patterns of the locale, so formatting a datetime applies a single
+pattern instead of formatting the date and time separately.
+
+The batch functions (:func:`format_datetimes`, :func:`format_numbers` and
+:func:`format_filesizes`) resolve the locale, timezone and pattern once for
+a whole list of values, e.g. for the rows of a search result.
+
+The functions are installed as template filters by
+:class:`~invenio_i18n.ext.InvenioI18N` (``format_datetime``,
+``format_date``, ``format_time``, ``format_number``, ``format_decimal``,
+``format_filesize``, ``format_datetimes``, ``format_numbers`` and
+``format_filesizes``).
+"""
+
+import re
+from datetime import date, datetime, time, timezone
+from functools import lru_cache
+
+from babel import dates, numbers
+from flask_babel import get_babel, get_locale, get_timezone
+
+from .timezones import get_user_timezone
+
+PREDEFINED_FORMATS = ("short", "medium", "long", "full")
+
+FILESIZE_UNITS = (
+    "digital-byte",
+    "digital-kilobyte",
+    "digital-megabyte",
+    "digital-gigabyte",
+    "digital-terabyte",
+    "digital-petabyte",
+)
+"""CLDR units of file sizes, each 1000 times the previous one."""
+
+FILESIZE_FORMAT = "#,##0.#"
+
+_DATETIME_PLACEHOLDER_RE = re.compile(r"(\{[01]\})")
+
+
+def combine_datetime_pattern(datetime_format, date_pattern, time_pattern):
+    """Combine a date and a time pattern into one datetime pattern.
+
+    :param datetime_format: Datetime format of a locale, e.g. ``"{1}, {0}"``.
+    :param date_pattern: ``babel.dates.DateTimePattern`` inserted for
+        ``{1}``.
+    :param time_pattern: ``babel.dates.DateTimePattern`` inserted for
+        ``{0}``.
+    :returns: A ``babel.dates.DateTimePattern``.
+    """
+    patterns = []
+    formats = []
+    for part in _DATETIME_PLACEHOLDER_RE.split(datetime_format):
+        if part in ("{0}", "{1}"):
+            pattern = time_pattern if part == "{0}" else date_pattern
+            patterns.append(pattern.pattern)
+            formats.append(pattern.format)
+        elif part:
+            # Babel drops the quotes of the format and keeps the text as is.
+            literal = part.replace("'", "")
+            patterns.append(part)
+            formats.append(literal.replace("%", "%%"))
+    return dates.DateTimePattern("".join(patterns), "".join(formats))
+
+
+@lru_cache(maxsize=1024)
+def get_date_pattern(locale, kind, format):
+    """Get the compiled pattern of a date, time or datetime format.
+
+    :param locale: The :class:`~babel.core.Locale`.
+    :param kind: ``"date"``, ``"time"`` or ``"datetime"``.
+    :param format: A predefined format or a custom pattern.
+    :returns: A ``babel.dates.DateTimePattern``.
+    """
+    if format not in PREDEFINED_FORMATS:
+        return dates.parse_pattern(format)
+    if kind == "date":
+        return dates.get_date_format(format, locale=locale)
+    if kind == "time":
+        return dates.get_time_format(format, locale=locale)
+    return combine_datetime_pattern(
+        dates.get_datetime_format(format, locale=locale),
+        dates.get_date_format(format, locale=locale),
+        dates.get_time_format(format, locale=locale),
+    )
+
+
+@lru_cache(maxsize=1024)
+def get_number_pattern(locale, format=None):
+    """Get the compiled pattern of a decimal number format.
+
+    :param locale: The :class:`~babel.core.Locale`.
+    :param format: A custom pattern or ``None`` for the format of the locale.
+    :returns: A ``babel.numbers.NumberPattern``.
+    """
+    if format is None:
+        format = locale.decimal_formats[None]
+    return numbers.parse_pattern(format)
+
+
+@lru_cache(maxsize=256)
+def get_filesize_patterns(locale, length="short"):
+    """Get the unit patterns of :data:`FILESIZE_UNITS` in a locale.
+
+    :param locale: The :class:`~babel.core.Locale`.
+    :param length: ``"short"``, ``"long"`` or ``"narrow"``.
+    :returns: Tuple of dictionaries mapping plural forms to patterns like
+        ``"{0} MB"``, one per unit. Each has at least an ``"other"`` form.
+    """
+    # Same data as babel.units.format_unit, which has no public API for it.
+    unit_patterns = locale._data["unit_patterns"]
+    result = []
+    for unit in FILESIZE_UNITS:
+        patterns = dict(unit_patterns[unit].get(length, {}))
+        if "other" not in patterns:
+            # Some locales lack forms of some lengths.
+            fallback = unit_patterns[unit].get("short", {})
+            patterns["other"] = next(
+                iter(patterns.values()), fallback.get("other", "{0} " + unit)
+            )
+        result.append(patterns)
+    return tuple(result)
+
+
+def resolve_format(kind, format=None):
+    """Get the format to use like Flask-Babel.
+
+    ``None`` selects the default format of ``Babel.date_formats``, and
+    predefined formats can be overridden there (e.g. with
+    ``date_formats["datetime.short"]``).
+    """
+    date_formats = get_babel().instance.date_formats
+    if format is None:
+        format = date_formats[kind]
+    if format in PREDEFINED_FORMATS:
+        format = date_formats[f"{kind}.{format}"] or format
+    return format
+
+
+def to_datetime(value):
+    """Convert a formatting argument to a datetime like Babel."""
+    if value is None:
+        return datetime.now(timezone.utc)
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value, timezone.utc)
+    if isinstance(value, time):
+        return datetime.combine(date.today(), value)
+    if not isinstance(value, datetime):
+        return datetime.combine(value, time())
+    return value
+
+
+def to_timezone(value, tzinfo):
+    """Convert a datetime to a timezone, assuming UTC for naive ones."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    if tzinfo is None:
+        return value
+    return value.astimezone(tzinfo)
+
+
+def format_datetime(datetime=None, format=None, rebase=True):
+    """Format a datetime in the current locale and timezone.
+
+    Same as ``flask_babel.format_datetime``.
+    """
+    locale = get_locale()
+    pattern = get_date_pattern(locale, "datetime", resolve_format("datetime", format))
+    tzinfo = get_user_timezone() if rebase else None
+    return pattern.apply(to_timezone(to_datetime(datetime), tzinfo), locale)
+
+
+def format_date(date=None, format=None, rebase=True):
+    """Format a date in the current locale.
+
+    Same as ``flask_babel.format_date``.
+    """
+    locale = get_locale()
+    pattern = get_date_pattern(locale, "date", resolve_format("date", format))
+    if date is None:
+        date = datetime.now().date()
+    elif isinstance(date, datetime):
+        if rebase:
+            date = to_timezone(date, get_user_timezone())
+        date = date.date()
+    return pattern.apply(date, locale)
+
+
+def format_time(time=None, format=None, rebase=True):
+    """Format a time in the current locale and timezone.
+
+    Same as ``flask_babel.format_time``.
+    """
+    locale = get_locale()
+    pattern = get_date_pattern(locale, "time", resolve_format("time", format))
+    if time is None or isinstance(time, (int, float, datetime)):
+        # The pattern is applied to the datetime, as a zoneinfo timezone
+        # needs the date to know its offset.
+        tzinfo = get_user_timezone() if rebase else None
+        return pattern.apply(to_timezone(to_datetime(time), tzinfo), locale)
+    # Times without a date are resolved with the timezone of Flask-Babel
+    # like Babel does.
+    tzinfo = get_timezone() if rebase else None
+    if tzinfo is not None or time.tzinfo is None:
+        time = time.replace(tzinfo=tzinfo or timezone.utc)
+    return pattern.apply(time, locale)
+
+
+def format_number(number):
+    """Format a number in the current locale.
+
+    Same as ``flask_babel.format_number``.
+    """
+    locale = get_locale()
+    return get_number_pattern(locale).apply(number, locale)
+
+
+def format_decimal(number, format=None):
+    """Format a decimal number in the current locale.
+
+    Same as ``flask_babel.format_decimal``.
+    """
+    locale = get_locale()
+    return get_number_pattern(locale, format).apply(number, locale)
+
+
+def format_filesize(size, length="short"):
+    """Format a file size in bytes with the largest fitting unit.
+
+    Uses decimal units (e.g. ``1 kB`` is 1000 bytes) like Jinja's
+    ``filesizeformat`` filter, with localized numbers and unit names.
+    """
+    return format_filesizes([size], length)[0]
+
+
+def format_datetimes(values, format=None, rebase=True):
+    """Format a sequence of datetimes like :func:`format_datetime`.
+
+    :returns: List of formatted strings.
+    """
+    locale = get_locale()
+    pattern = get_date_pattern(locale, "datetime", resolve_format("datetime", format))
+    tzinfo = get_user_timezone() if rebase else None
+    return [
+        pattern.apply(to_timezone(to_datetime(value), tzinfo), locale)
+        for value in values
+    ]
+
+
+def format_numbers(values, format=None):
+    """Format a sequence of numbers like :func:`format_decimal`.
+
+    :returns: List of formatted strings.
+    """
+    locale = get_locale()
+    apply = get_number_pattern(locale, format).apply
+    return [apply(value, locale) for value in values]
+
+
+def format_filesizes(values, length="short"):
+    """Format a sequence of file sizes like :func:`format_filesize`.
+
+    :returns: List of formatted strings.
+    """
+    locale = get_locale()
+    apply = get_number_pattern(locale, FILESIZE_FORMAT).apply
+    patterns = get_filesize_patterns(locale, length)
+    plural_form = locale.plural_form
+    last = len(patterns) - 1
+    formatted = []
+    for size in values:
+        index = 0
+        while abs(size) >= 1000 and index < last:
+            size /= 1000
+            index += 1
+        number = apply(size, locale)
+        unit_patterns = patterns[index]
+        pattern = unit_patterns.get(plural_form(size)) or unit_patterns["other"]
+        formatted.append(pattern.format(number))
+    return formatted
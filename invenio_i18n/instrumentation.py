@@ -0,0 +1,545 @@
+# SPDX-FileCopyrightText: 2026 CERN.
+# SPDX-License-Identifier: MIT
+
+"""Sampled instrumentation of translation lookups.
+
+Instruments are installed on the
+:class:`~invenio_i18n.babel.MultidirDomain` and called for every
+``gettext``, ``ngettext``, ``pgettext`` and ``npgettext`` lookup, in code
+and in templates. They only
+look at a random sample of the lookups and count them in bounded memory, so
+they are cheap enough to leave enabled in production.
+
+Every worker process periodically writes its counters to a JSON file in a
+shared directory, from which the ``invenio i18n`` commands build reports.
+The files of finished processes (e.g. recycled workers) are merged into one
+file per host, so that the directory does not grow with every process.
+"""
+
+import atexit
+import fcntl
+import glob
+import json
+import os
+import random
+import socket
+import tempfile
+from threading import Lock, Thread
+from time import monotonic
+
+from babel.messages.catalog import Catalog
+from babel.messages.pofile import write_po
+from flask import current_app, g, has_request_context, request
+from flask_babel import get_locale
+
+
+class BoundedCounter:
+    """Counter of a bounded number of keys.
+
+    Once ``maxsize`` keys are counted, new keys are dropped (and counted in
+    ``dropped``) while known keys are still counted.
+    """
+
+    def __init__(self, maxsize):
+        """Constructor.
+
+        :param maxsize: Maximum number of keys.
+        """
+        self.maxsize = maxsize
+        self.counts = {}
+        self.dropped = 0
+
+    def add(self, key, count=1):
+        """Count a key."""
+        if key in self.counts:
+            self.counts[key] += count
+        elif len(self.counts) < self.maxsize:
+            self.counts[key] = count
+        else:
+            self.dropped += count
+
+    def most_common(self, n=None):
+        """Get the ``n`` most common keys with their counts."""
+        items = sorted(self.counts.items(), key=lambda item: item[1], reverse=True)
+        return items if n is None else items[:n]
+
+    def clear(self):
+        """Reset the counter."""
+        self.counts.clear()
+        self.dropped = 0
+
+
+def get_dump_path(directory, prefix, name=None):
+    """Get the path of a dump of the current host.
+
+    :param name: Name of the dump, by default the id of the current process.
+    """
+    if name is None:
+        name = os.getpid()
+    return os.path.join(directory, f"{prefix}-{socket.gethostname()}-{name}.json")
+
+
+def write_dump(directory, prefix, data, name=None):
+    """Atomically write the dump of the current process to a directory.
+
+    :param name: Name of the dump, by default the id of the current process.
+    :returns: The path of the dump file.
+    """
+    os.makedirs(directory, exist_ok=True)
+    filename = get_dump_path(directory, prefix, name)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as fp:
+            json.dump(data, fp)
+        os.replace(tmp_path, filename)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return filename
+
+
+def read_dump(filename):
+    """Read a dump file or return ``None`` if it is unreadable."""
+    try:
+        with open(filename, encoding="utf-8") as fp:
+            return json.load(fp)
+    except (OSError, ValueError):
+        return None
+
+
+def read_dumps(directory, prefix):
+    """Read the dumps of all processes from a directory.
+
+    Unreadable files (e.g. of an older format) are skipped.
+    """
+    dumps = []
+    for filename in sorted(glob.glob(os.path.join(directory, f"{prefix}-*.json"))):
+        dump = read_dump(filename)
+        if dump is not None:
+            dumps.append(dump)
+    return dumps
+
+
+def is_process_alive(pid):
+    """Check if a process of the current host is running."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Running as another user.
+        return True
+    return True
+
+
+def merge_dumps(dumps, maxsize=None):
+    """Merge several process dumps into one.
+
+    Entries of the merged dump carry their estimated number of lookups, so
+    that dumps with different sample rates can be merged. The requests per
+    endpoint of lookup statistics are summed up.
+
+    :param maxsize: Maximum number of messages to keep. The least counted
+        messages are counted in ``dropped`` instead.
+    """
+    counts = {}
+    endpoints = {}
+    dropped = 0
+    for dump in dumps:
+        rate = dump.get("sample_rate") or 1
+        dropped += dump.get("dropped", 0)
+        for endpoint, (requests, lookups, maximum) in dump.get("endpoints", {}).items():
+            stats = endpoints.setdefault(endpoint, [0, 0, 0])
+            stats[0] += requests
+            stats[1] += lookups
+            stats[2] = max(stats[2], maximum)
+        for locale, context, msgid, msgid_plural, count, *estimated in dump.get(
+            "entries", []
+        ):
+            totals = counts.setdefault((locale, context, msgid, msgid_plural), [0, 0])
+            totals[0] += count
+            totals[1] += estimated[0] if estimated else count / rate
+
+    entries = sorted(counts.items(), key=lambda item: -item[1][0])
+    if maxsize is not None:
+        dropped += sum(count for _, (count, _) in entries[maxsize:])
+        entries = entries[:maxsize]
+    merged = {
+        "sample_rate": None,
+        "dropped": dropped,
+        "entries": [[*key, count, estimated] for key, (count, estimated) in entries],
+    }
+    if endpoints:
+        merged["endpoints"] = endpoints
+    return merged
+
+
+def compact_dumps(directory, prefix, maxsize=None):
+    """Merge the dumps of finished processes of the current host.
+
+    The dumps are merged into the ``merged`` dump of the host and removed.
+    Only processes of the current host can be checked, the dumps of other
+    hosts are compacted by their own processes.
+
+    :param maxsize: Maximum number of messages of the merged dump.
+    :returns: The number of merged dumps.
+    """
+    base = get_dump_path(directory, prefix, "")[: -len(".json")]
+    os.makedirs(directory, exist_ok=True)
+    lock_path = os.path.join(directory, f".{prefix}-{socket.gethostname()}.lock")
+    with open(lock_path, "a") as lock:
+        # Processes of the host compacting at the same time would merge the
+        # same dumps twice.
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        finished = []
+        for filename in glob.glob(glob.escape(base) + "*.json"):
+            pid = filename[len(base) : -len(".json")]
+            if pid.isdigit() and int(pid) > 0 and not is_process_alive(int(pid)):
+                finished.append(filename)
+        if not finished:
+            return 0
+
+        merged = read_dump(get_dump_path(directory, prefix, "merged"))
+        dumps = [merged] if merged is not None else []
+        dumps.extend(filter(None, map(read_dump, finished)))
+        write_dump(directory, prefix, merge_dumps(dumps, maxsize), name="merged")
+        for filename in finished:
+            try:
+                os.unlink(filename)
+            except FileNotFoundError:
+                pass
+    return len(finished)
+
+
+class Instrument:
+    """Base class of sampled lookup instruments.
+
+    Subclasses implement :meth:`record` and :meth:`dump`.
+    """
+
+    prefix = None
+    """Prefix of the dump files of the instrument."""
+
+    def __init__(self, sample_rate, maxsize, directory=None, flush_interval=300):
+        """Constructor.
+
+        :param sample_rate: Fraction of the lookups to record (``0`` to ``1``).
+        :param maxsize: Maximum number of distinct messages to count.
+        :param directory: Directory to write the dumps to.
+        :param flush_interval: Seconds between two dumps.
+        """
+        self.sample_rate = sample_rate
+        self.counter = BoundedCounter(maxsize)
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self._lock = Lock()
+        self._next_flush = monotonic() + flush_interval
+        if directory:
+            atexit.register(self.flush)
+
+    def __call__(self, msgid, msgid_plural, context, missed):
+        """Record a sample of the lookups."""
+        if random.random() >= self.sample_rate:
+            return
+        locale = get_locale()
+        if locale is None:
+            return
+        with self._lock:
+            self.record(str(locale), msgid, msgid_plural, context, missed)
+            flush = self.directory and monotonic() >= self._next_flush
+            if flush:
+                self._next_flush = monotonic() + self.flush_interval
+        if flush:
+            # Write off the request path.
+            Thread(target=self.flush, name="invenio-i18n-flush", daemon=True).start()
+
+    def record(self, locale, msgid, msgid_plural, context, missed):
+        """Count a sampled lookup."""
+        raise NotImplementedError()
+
+    def dump(self):
+        """Get the JSON serializable counters of the process."""
+        raise NotImplementedError()
+
+    def is_empty(self):
+        """Check if nothing has been counted."""
+        return not self.counter.counts and not self.counter.dropped
+
+    def flush(self):
+        """Write the counters of the process to the dump directory.
+
+        Nothing is written while the counters are empty (e.g. in processes
+        which do not serve requests), and the dumps of finished processes
+        are merged (see :func:`compact_dumps`).
+
+        :returns: The path of the dump file or ``None``.
+        """
+        with self._lock:
+            self._next_flush = monotonic() + self.flush_interval
+            if not self.directory:
+                return None
+            data = None if self.is_empty() else self.dump()
+        try:
+            compact_dumps(self.directory, self.prefix, self.counter.maxsize)
+            if data is None:
+                # Drop the counters written before they were cleared.
+                os.unlink(get_dump_path(self.directory, self.prefix))
+                return None
+            return write_dump(self.directory, self.prefix, data)
+        except OSError:
+            return None
+
+    def clear(self):
+        """Reset the counters."""
+        with self._lock:
+            self.counter.clear()
+
+
+class MissCollector(Instrument):
+    """Count the lookups of messages without translation."""
+
+    prefix = "misses"
+
+    def __init__(self, *args, ignored_locales=(), **kwargs):
+        """Constructor (see :class:`Instrument`).
+
+        :param ignored_locales: Locales whose misses are not counted, e.g.
+            the language the messages are written in.
+        """
+        super().__init__(*args, **kwargs)
+        self.ignored_locales = frozenset(str(locale) for locale in ignored_locales)
+
+    def record(self, locale, msgid, msgid_plural, context, missed):
+        """Count a missing translation."""
+        if missed and locale not in self.ignored_locales:
+            self.counter.add((locale, context, msgid, msgid_plural))
+
+    def dump(self):
+        """Get the counted misses."""
+        return {
+            "sample_rate": self.sample_rate,
+            "dropped": self.counter.dropped,
+            "entries": [[*key, count] for key, count in self.counter.counts.items()],
+        }
+
+
+class LookupStatistics(Instrument):
+    """Count the lookups of translated messages and the lookups per request.
+
+    Unlike the sampled message counts, the number of lookups of every
+    request is counted and summed up per endpoint once the request ends.
+    """
+
+    prefix = "lookups"
+
+    def __init__(self, *args, **kwargs):
+        """Constructor (see :class:`Instrument`)."""
+        super().__init__(*args, **kwargs)
+        self.endpoints = {}
+
+    def __call__(self, msgid, msgid_plural, context, missed):
+        """Count the lookup in the current request and record a sample."""
+        if has_request_context():
+            g._invenio_i18n_lookups = g.get("_invenio_i18n_lookups", 0) + 1
+        super().__call__(msgid, msgid_plural, context, missed)
+
+    def record(self, locale, msgid, msgid_plural, context, missed):
+        """Count a translated message."""
+        if not missed:
+            self.counter.add((locale, context, msgid, msgid_plural))
+
+    def record_request(self, endpoint, lookups):
+        """Add the number of lookups of a request to its endpoint."""
+        with self._lock:
+            stats = self.endpoints.get(endpoint)
+            if stats is None:
+                stats = self.endpoints[endpoint] = [0, 0, 0]
+            stats[0] += 1
+            stats[1] += lookups
+            stats[2] = max(stats[2], lookups)
+
+    def request_finished(self, response):
+        """Record the lookups of the current request (after request hook)."""
+        lookups = g.pop("_invenio_i18n_lookups", 0)
+        self.record_request(request.endpoint or "<unmatched>", lookups)
+        return response
+
+    def is_empty(self):
+        """Check if nothing has been counted."""
+        return super().is_empty() and not self.endpoints
+
+    def dump(self):
+        """Get the counted lookups."""
+        return {
+            "sample_rate": self.sample_rate,
+            "dropped": self.counter.dropped,
+            "entries": [[*key, count] for key, count in self.counter.counts.items()],
+            "endpoints": {
+                endpoint: list(stats) for endpoint, stats in self.endpoints.items()
+            },
+        }
+
+    def clear(self):
+        """Reset the counters."""
+        with self._lock:
+            self.counter.clear()
+            self.endpoints.clear()
+
+
+def install_instrument(domain, instrument):
+    """Install an instrument on a domain, replacing one of the same type."""
+    domain.instruments = tuple(
+        installed
+        for installed in domain.instruments
+        if type(installed) is not type(instrument)
+    ) + (instrument,)
+
+
+def init_miss_collector(app, domain):
+    """Install a miss collector if ``I18N_MISSES_SAMPLE_RATE`` is set."""
+    if not app.config["I18N_MISSES_SAMPLE_RATE"]:
+        return None
+    ignored_locales = app.config["I18N_MISSES_IGNORED_LOCALES"]
+    if ignored_locales is None:
+        ignored_locales = [app.config.get("BABEL_DEFAULT_LOCALE", "en")]
+    collector = MissCollector(
+        app.config["I18N_MISSES_SAMPLE_RATE"],
+        app.config["I18N_MISSES_MAX_ENTRIES"],
+        directory=app.config["I18N_INSTRUMENTATION_DIRECTORY"],
+        flush_interval=app.config["I18N_INSTRUMENTATION_FLUSH_INTERVAL"],
+        ignored_locales=ignored_locales,
+    )
+    install_instrument(domain, collector)
+    app.extensions["invenio-i18n-misses"] = collector
+    return collector
+
+
+def get_miss_collector(app=None):
+    """Get the miss collector of an application or ``None``."""
+    return (app or current_app).extensions.get("invenio-i18n-misses")
+
+
+def init_lookup_statistics(app, domain):
+    """Install lookup statistics if ``I18N_LOOKUPS_SAMPLE_RATE`` is set."""
+    if not app.config["I18N_LOOKUPS_SAMPLE_RATE"]:
+        return None
+    statistics = LookupStatistics(
+        app.config["I18N_LOOKUPS_SAMPLE_RATE"],
+        app.config["I18N_LOOKUPS_MAX_ENTRIES"],
+        directory=app.config["I18N_INSTRUMENTATION_DIRECTORY"],
+        flush_interval=app.config["I18N_INSTRUMENTATION_FLUSH_INTERVAL"],
+    )
+    install_instrument(domain, statistics)
+    app.extensions["invenio-i18n-lookups"] = statistics
+    app.after_request(statistics.request_finished)
+    return statistics
+
+
+def get_lookup_statistics(app=None):
+    """Get the lookup statistics of an application or ``None``."""
+    return (app or current_app).extensions.get("invenio-i18n-lookups")
+
+
+def get_request_lookups():
+    """Get the number of lookups of the current request so far.
+
+    Includes the lookups of rendered templates. Only counted if ``I18N_LOOKUPS_SAMPLE_RATE`` is set.
+    """
+    return g.get("_invenio_i18n_lookups", 0)
+
+
+def _aggregate_entries(dumps, limit=None):
+    """Sum the message counts of several process dumps."""
+    counts = {}
+    estimates = {}
+    for dump in dumps:
+        rate = dump.get("sample_rate") or 1
+        for locale, context, msgid, msgid_plural, count, *estimated in dump.get(
+            "entries", []
+        ):
+            key = (locale, context, msgid, msgid_plural)
+            counts[key] = counts.get(key, 0) + count
+            estimates[key] = estimates.get(key, 0) + (
+                estimated[0] if estimated else count / rate
+            )
+
+    report = {}
+    for key, count in sorted(counts.items(), key=lambda item: -item[1]):
+        locale, context, msgid, msgid_plural = key
+        entries = report.setdefault(locale, [])
+        if limit is not None and len(entries) >= limit:
+            continue
+        entries.append(
+            {
+                "msgid": msgid,
+                "msgid_plural": msgid_plural,
+                "context": context,
+                "count": count,
+                "estimated": round(estimates[key]),
+            }
+        )
+    return report
+
+
+def aggregate_misses(dumps):
+    """Sum the misses of several process dumps.
+
+    :returns: Dictionary mapping locales to lists of entries (dictionaries
+        with ``msgid``, ``msgid_plural``, ``context``, the sampled ``count``
+        and the ``estimated`` number of lookups), most missed first.
+    """
+    return _aggregate_entries(dumps)
+
+
+def aggregate_lookups(dumps, limit=None):
+    """Sum the lookup statistics of several process dumps.
+
+    :param limit: Maximum number of messages per locale.
+    :returns: Dictionary with the most looked up translated messages per
+        locale in ``locales`` (see :func:`aggregate_misses`) and the
+        ``requests``, total and ``average`` number of ``lookups``, and
+        ``max`` lookups of a request per endpoint in ``endpoints``.
+    """
+    endpoints = {}
+    for dump in dumps:
+        for endpoint, (requests, lookups, maximum) in dump.get("endpoints", {}).items():
+            stats = endpoints.setdefault(
+                endpoint, {"requests": 0, "lookups": 0, "max": 0}
+            )
+            stats["requests"] += requests
+            stats["lookups"] += lookups
+            stats["max"] = max(stats["max"], maximum)
+    for stats in endpoints.values():
+        stats["average"] = round(stats["lookups"] / (stats["requests"] or 1), 2)
+
+    return {
+        "locales": _aggregate_entries(dumps, limit),
+        "endpoints": dict(
+            sorted(endpoints.items(), key=lambda item: -item[1]["lookups"])
+        ),
+    }
+
+
+def write_misses_po(report, output_directory):
+    """Write one PO file per locale with its missing translations.
+
+    :returns: List of written files.
+    """
+    os.makedirs(output_directory, exist_ok=True)
+    written = []
+    for locale, entries in sorted(report.items()):
+        catalog = Catalog(locale=locale)
+        for entry in entries:
+            msgid = entry["msgid"]
+            if entry["msgid_plural"] is not None:
+                msgid = (msgid, entry["msgid_plural"])
+            catalog.add(
+                msgid,
+                context=entry["context"],
+                auto_comments=[f"Estimated lookups: {entry['estimated']}"],
+            )
+        filename = os.path.join(output_directory, f"{locale}.po")
+        with open(filename, "wb") as fp:
+            write_po(fp, catalog, sort_output=False)
+        written.append(filename)
+    return written
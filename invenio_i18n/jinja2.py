@@ -8,14 +8,18 @@ See full documentation of corresponding methods in Flask-Babel
  * https://python-babel.github.io/flask-babel/
 """
 
-from babel import Locale
-from flask_babel import get_locale, to_user_timezone, to_utc
+from flask_babel import get_domain, get_locale
+
+from .babel import lookup_message
+from .registry import lookup_display_name
+from .timezones import to_user_timezone, to_utc
 
 
 def filter_to_user_timezone(dt):
     """Convert a datetime object to the user's timezone.
 
-    Installed on application as ``tousertimezone``.
+    Installed on application as ``tousertimezone``. See
+    :func:`~invenio_i18n.timezones.to_user_timezone`.
     """
     return to_user_timezone(dt)
 
@@ -23,7 +27,8 @@ def filter_to_user_timezone(dt):
 def filter_to_utc(dt):
     """Convert a datetime object to UTC and drop tzinfo.
 
-    Installed on application as ``toutc``.
+    Installed on application as ``toutc``. See
+    :func:`~invenio_i18n.timezones.to_utc`.
     """
     return to_utc(dt)
 
@@ -31,14 +36,53 @@ def filter_to_utc(dt):
 def filter_language_name(lang_code):
     """Convert language code into display name in current locale.
 
-    Installed on application as ``language_name``.
+    Installed on application as ``language_name``. See
+    :func:`~invenio_i18n.registry.lookup_display_name`.
     """
-    return Locale.parse(lang_code).get_display_name(get_locale().language)
+    return lookup_display_name(lang_code, get_locale().language)
 
 
 def filter_language_name_local(lang_code):
     """Convert language code into display name in local locale.
 
-    Installed on application as ``language_name_local``.
+    Installed on application as ``language_name_local``. See
+    :func:`~invenio_i18n.registry.lookup_display_name`.
+    """
+    return lookup_display_name(lang_code, lang_code)
+
+
+def _lookup(singular, plural=None, num=None, context=None):
+    """Look a message up in the domain of the current request."""
+    domain = get_domain()
+    lookup = getattr(domain, "lookup", None)
+    if lookup is None:
+        return lookup_message(domain.get_translations(), singular, plural, num, context)
+    return lookup(singular, plural, num, context)
+
+
+def template_gettext(string):
+    """Translate a string in a template (``_()`` and ``{% trans %}``).
+
+    Flask-Babel installs gettext callables which bypass the domain. These
+    ones go through :meth:`~invenio_i18n.babel.MultidirDomain.lookup`, so
+    that template lookups are seen by the instruments (see
+    :mod:`invenio_i18n.instrumentation`). Installed on application with
+    :func:`template_ngettext`, :func:`template_pgettext` and
+    :func:`template_npgettext`.
     """
-    return Locale.parse(lang_code).display_name
+    return _lookup(string)
+
+
+def template_ngettext(singular, plural, num):
+    """Translate a plural string in a template."""
+    return _lookup(singular, plural, num)
+
+
+def template_pgettext(context, string):
+    """Translate a string with context in a template."""
+    return _lookup(string, context=context)
+
+
+def template_npgettext(context, singular, plural, num):
+    """Translate a plural string with context in a template."""
+    return _lookup(singular, plural, num, context)
@@ -0,0 +1,108 @@
+# SPDX-FileCopyrightText: 2026 CERN.
+# SPDX-License-Identifier: MIT
+
+"""JSON provider serializing lazy strings.
+
+:class:`I18NJSONProvider` is installed on the application by
+:class:`~invenio_i18n.ext.InvenioI18N`. It serializes
+``flask_babel.LazyString`` (e.g. of ``lazy_gettext``) as the
+translated string, and resolves each distinct lazy string only once per
+serialized document. Responses embedding the same lazily translated labels
+many times (e.g. facet or vocabulary titles of search results) therefore
+look each label up once.
+
+If ``I18N_JSON_BACKEND`` is ``"orjson"`` and `orjson
+<https://github.com/ijl/orjson>`_ is installed, documents are serialized
+with it instead of :mod:`json`.
+"""
+
+import json
+
+from flask.json.provider import DefaultJSONProvider
+from flask_babel import LazyString
+
+from .lazy import lazy_string_key
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+class I18NJSONProvider(DefaultJSONProvider):
+    """JSON provider with support for lazy strings.
+
+    See :class:`flask.json.provider.DefaultJSONProvider` for the other
+    supported types.
+    """
+
+    def __init__(self, app):
+        """Constructor.
+
+        :param app: The Flask application.
+        """
+        super().__init__(app)
+        self.use_orjson = (
+            orjson is not None and app.config.get("I18N_JSON_BACKEND") == "orjson"
+        )
+
+    def make_default(self):
+        """Create a ``default`` function for serializing one document.
+
+        Lazy strings are resolved once per document, as the locale does not
+        change while it is serialized.
+        """
+        resolved = {}
+        default = self.default
+
+        def _default(o):
+            if isinstance(o, LazyString):
+                try:
+                    key = lazy_string_key(o)
+                    value = resolved.get(key)
+                except TypeError:
+                    # Unhashable arguments.
+                    return str(o)
+                if value is None:
+                    value = resolved[key] = str(o)
+                return value
+            return default(o)
+
+        return _default
+
+    def _dumps_orjson(self, obj, kwargs):
+        """Serialize with ``orjson`` if it supports the arguments.
+
+        :returns: The JSON string or ``None``.
+        """
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        for key, value in kwargs.items():
+            if key == "sort_keys":
+                option |= orjson.OPT_SORT_KEYS if value else 0
+            elif key == "indent" and value == 2:
+                option |= orjson.OPT_INDENT_2
+            elif key == "separators" and tuple(value) == (",", ":"):
+                continue
+            elif key not in ("default", "ensure_ascii"):
+                return None
+        try:
+            return orjson.dumps(obj, default=kwargs["default"], option=option).decode()
+        except orjson.JSONEncodeError:
+            # E.g. non-string keys or large integers.
+            return None
+
+    def dumps(self, obj, **kwargs):
+        """Serialize data as JSON to a string.
+
+        See :meth:`flask.json.provider.DefaultJSONProvider.dumps`. With
+        ``orjson``, ``ensure_ascii`` is ignored (non-ASCII characters are
+        never escaped).
+        """
+        kwargs.setdefault("default", self.make_default())
+        kwargs.setdefault("ensure_ascii", self.ensure_ascii)
+        kwargs.setdefault("sort_keys", self.sort_keys)
+        if self.use_orjson:
+            data = self._dumps_orjson(obj, kwargs)
+            if data is not None:
+                return data
+        return json.dumps(obj, **kwargs)
@@ -0,0 +1,64 @@
+# SPDX-FileCopyrightText: 2026 CERN.
+# SPDX-License-Identifier: MIT
+
+"""Lazy strings with memoized resolution.
+
+The lazy strings of Flask-Babel look the message up in the catalog every
+time they are converted to a string. The lazy strings created by the
+functions of this module are resolved through
+:meth:`~invenio_i18n.babel.MultidirDomain.resolve_lazy_string`, which
+memoizes the strings per locale (see ``I18N_LAZY_STRING_CACHE_SIZE``).
+Labels rendered on every page or serialized in every response are
+therefore looked up once per locale.
+"""
+
+from flask_babel import LazyString, get_domain, gettext, ngettext, npgettext, pgettext
+
+
+def lazy_string_key(lazy_string):
+    """Get the key identifying the resolution of a lazy string.
+
+    Arguments are keyed together with their type, as equal values of
+    different types (e.g. ``1``, ``1.0`` and ``True``) are formatted
+    differently.
+
+    :raises TypeError: If an argument is not hashable.
+    """
+    return (
+        lazy_string._func,
+        tuple((type(value), value) for value in lazy_string._args),
+        tuple(
+            (name, type(value), value) for name, value in lazy_string._kwargs.items()
+        ),
+    )
+
+
+class CachedLazyString(LazyString):
+    """Lazy string whose resolution is memoized by the domain."""
+
+    def __str__(self):
+        """Get the string in the current locale."""
+        resolve = getattr(get_domain(), "resolve_lazy_string", None)
+        if resolve is None:
+            return super().__str__()
+        return resolve(self)
+
+
+def lazy_gettext(*args, **kwargs):
+    """Like ``flask_babel.lazy_gettext``, with memoized resolution."""
+    return CachedLazyString(gettext, *args, **kwargs)
+
+
+def lazy_ngettext(*args, **kwargs):
+    """Like ``flask_babel.lazy_ngettext``, with memoized resolution."""
+    return CachedLazyString(ngettext, *args, **kwargs)
+
+
+def lazy_pgettext(*args, **kwargs):
+    """Like ``flask_babel.lazy_pgettext``, with memoized resolution."""
+    return CachedLazyString(pgettext, *args, **kwargs)
+
+
+def lazy_npgettext(*args, **kwargs):
+    """Like ``flask_babel.lazy_npgettext``, with memoized resolution."""
+    return CachedLazyString(npgettext, *args, **kwargs)
@@ -0,0 +1,115 @@
+# SPDX-FileCopyrightText: 2026 CERN.
+# SPDX-License-Identifier: MIT
+
+"""Cache of translation directories discovered from entry points.
+
+Resolving the translation entry points imports the metadata of every
+installed distribution and checks the ``translations`` directory of every
+registered package. The :class:`DiscoveryManifest` stores the result on disk
+(see ``I18N_DISCOVERY_MANIFEST``), so that further application instances,
+e.g. in every web, Celery or CLI worker, only need to verify the key of the
+manifest.
+
+The key is a hash of the installed distributions: the names and
+modification times of the ``*.dist-info``, ``*.egg-info``, ``*.egg-link``
+and ``*.pth`` entries of every directory on ``sys.path``. Installing,
+upgrading or removing a package therefore invalidates the manifest.
+"""
+
+import hashlib
+import json
+import os
+import sys
+import tempfile
+
+_METADATA_SUFFIXES = (".dist-info", ".egg-info", ".egg-link", ".pth")
+
+
+def distributions_key(path=None):
+    """Compute a hash of the distributions installed on a search path.
+
+    :param path: List of directories. Defaults to ``sys.path``.
+    :returns: Hexadecimal digest.
+    """
+    digest = hashlib.sha256()
+    digest.update(sys.prefix.encode("utf-8", "surrogateescape"))
+    for entry in sys.path if path is None else path:
+        digest.update(b"\0" + entry.encode("utf-8", "surrogateescape"))
+        try:
+            with os.scandir(entry or ".") as it:
+                metadata = sorted(
+                    (item.name, item.stat().st_mtime_ns)
+                    for item in it
+                    if item.name.endswith(_METADATA_SUFFIXES)
+                )
+        except OSError:
+            continue
+        for name, mtime in metadata:
+            digest.update(f"\0{name}\0{mtime}".encode("utf-8", "surrogateescape"))
+    return digest.hexdigest()
+
+
+class DiscoveryManifest:
+    """Translation directories per entry point group, cached in a file."""
+
+    def __init__(self, path, key=None):
+        """Constructor.
+
+        :param path: Path of the manifest file.
+        :param key: Key the manifest must match. Defaults to
+            :func:`distributions_key`.
+        """
+        self.path = path
+        self.key = key or distributions_key()
+        self._groups = None
+
+    def _load(self):
+        """Read the groups of a valid manifest file."""
+        if self._groups is None:
+            try:
+                with open(self.path, encoding="utf-8") as fp:
+                    data = json.load(fp)
+            except (OSError, ValueError):
+                data = None
+            if isinstance(data, dict) and data.get("key") == self.key:
+                self._groups = data.get("groups", {})
+            else:
+                self._groups = {}
+        return self._groups
+
+    def get(self, group):
+        """Get the cached translation directories of an entry point group.
+
+        :returns: List of directories or ``None`` if the group is not cached
+            or one of its directories no longer exists.
+        """
+        directories = self._load().get(group)
+        if not isinstance(directories, list):
+            return None
+        if not all(os.path.isdir(directory) for directory in directories):
+            return None
+        return directories
+
+    def set(self, group, directories):
+        """Cache the translation directories of an entry point group.
+
+        The file is replaced atomically. Errors while writing it (e.g. on a
+        read-only file system) are ignored, the directories are then simply
+        discovered again next time.
+        """
+        groups = self._load()
+        groups[group] = list(directories)
+        data = {"key": self.key, "groups": groups}
+        dirname = os.path.dirname(os.path.abspath(self.path))
+        try:
+            os.makedirs(dirname, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=dirname, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as fp:
+                    json.dump(data, fp)
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError:
+            pass
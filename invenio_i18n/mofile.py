@@ -0,0 +1,224 @@
+# SPDX-FileCopyrightText: 2026 CERN.
+# SPDX-License-Identifier: MIT
+
+"""Memory-mapped gettext catalogs.
+
+:class:`gettext.GNUTranslations` decodes every message of a ``.mo`` file into
+a dictionary of the process. :class:`MmapCatalog` instead maps the file into
+memory and looks messages up in place, using the hash table of the file if it
+has one (as written by GNU ``msgfmt``) or a binary search otherwise (as
+written by Babel). Only the requested messages are decoded, and all processes
+of a host share the pages of the file in the page cache.
+
+The catalog backend is selected with ``I18N_CATALOG_BACKEND``.
+
+.. warning::
+
+   Never recompile a mapped ``.mo`` file in place (e.g. by truncating and
+   rewriting it, as ``msgfmt -o`` or ``pybabel compile`` do). Processes
+   reading a truncated mapping are killed with ``SIGBUS``. Write the new
+   catalog to a temporary file and rename it over the old one instead: the
+   rename is atomic, and mapped catalogs keep the old file until they are
+   reloaded (see :mod:`invenio_i18n.reload`).
+"""
+
+import mmap
+import struct
+from array import array
+from collections import ChainMap
+from collections.abc import Mapping
+from gettext import c2py
+
+from babel import support
+
+LE_MAGIC = 0x950412DE
+BE_MAGIC = 0xDE120495
+
+
+def hashpjw(data):
+    """Compute the hash of a message id used in ``.mo`` hash tables."""
+    hval = 0
+    for char in data:
+        hval = ((hval << 4) + char) & 0xFFFFFFFF
+        high = hval & 0xF0000000
+        if high:
+            hval ^= high >> 24
+            hval ^= high
+    return hval
+
+
+class MmapCatalog(Mapping):
+    """Read-only mapping of the messages of a memory-mapped ``.mo`` file.
+
+    Keys and values are the same as those of the ``_catalog`` of
+    :class:`gettext.GNUTranslations`: message ids (prefixed with the context
+    and an EOT character for messages with a context) map to translations,
+    and ``(msgid, n)`` tuples to the plural forms of a message.
+    """
+
+    def __init__(self, filename):
+        """Constructor.
+
+        :param filename: Path of the ``.mo`` file.
+        """
+        with open(filename, "rb") as fp:
+            self._map = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        buf = self._map
+
+        (magic,) = struct.unpack_from("<I", buf)
+        if magic == LE_MAGIC:
+            self._byteorder = "<"
+        elif magic == BE_MAGIC:
+            self._byteorder = ">"
+        else:
+            raise OSError(0, "Bad magic number", filename)
+        (
+            version,
+            self._count,
+            self._originals,
+            self._translations,
+            self._hash_size,
+            self._hash_offset,
+        ) = struct.unpack_from(self._byteorder + "6I", buf, 4)
+        if version >> 16 not in (0, 1):
+            raise OSError(0, "Bad version number", filename)
+
+        self.filename = filename
+        self._order = None
+        if self._hash_size <= 2:
+            self._hash_size = 0
+            keys = [self._key(index) for index in range(self._count)]
+            if any(a > b for a, b in zip(keys, keys[1:])):
+                # Babel sorts messages without their context, so the file is
+                # not always sorted by key.
+                self._order = array(
+                    "I", sorted(range(self._count), key=keys.__getitem__)
+                )
+
+        self.info = {}
+        self.charset = None
+        self.plural = lambda n: int(n != 1)
+        index = self._find(b"")
+        if index >= 0:
+            self._parse_header(self._string(self._translations, index))
+
+    def _parse_header(self, header):
+        """Parse the metadata of the catalog like ``GNUTranslations``."""
+        for line in header.decode("ascii", "replace").splitlines():
+            key, sep, value = line.partition(":")
+            if not sep:
+                continue
+            key = key.strip().lower()
+            value = value.strip()
+            self.info[key] = value
+            if key == "content-type":
+                self.charset = value.partition("charset=")[2] or None
+            elif key == "plural-forms":
+                self.plural = c2py(value.split(";")[1].split("plural=")[1])
+        self.charset = self.charset or "utf-8"
+
+    def _string(self, table, index):
+        """Get a string of the originals or translations table."""
+        length, offset = struct.unpack_from(
+            self._byteorder + "2I", self._map, table + 8 * index
+        )
+        return self._map[offset : offset + length]
+
+    def _key(self, index):
+        """Get the message id of an entry (the singular for plurals)."""
+        return self._string(self._originals, index).partition(b"\0")[0]
+
+    def _find(self, key):
+        """Get the index of the entry for a message id or ``-1``."""
+        if self._hash_size:
+            hval = hashpjw(key)
+            slot = hval % self._hash_size
+            increment = 1 + hval % (self._hash_size - 2)
+            for _ in range(self._hash_size):
+                (entry,) = struct.unpack_from(
+                    self._byteorder + "I", self._map, self._hash_offset + 4 * slot
+                )
+                if entry == 0:
+                    return -1
+                if self._key(entry - 1) == key:
+                    return entry - 1
+                slot += increment
+                if slot >= self._hash_size:
+                    slot -= self._hash_size
+            return -1
+
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            index = middle if self._order is None else self._order[middle]
+            current = self._key(index)
+            if current < key:
+                low = middle + 1
+            elif current > key:
+                high = middle
+            else:
+                return index
+        return -1
+
+    def __getitem__(self, key):
+        """Look up and decode a translation."""
+        msgid, plural = key if isinstance(key, tuple) else (key, None)
+        try:
+            index = self._find(msgid.encode(self.charset))
+        except (AttributeError, UnicodeEncodeError):
+            index = -1
+        if index < 0:
+            raise KeyError(key)
+
+        translation = self._string(self._translations, index)
+        is_plural = b"\0" in self._string(self._originals, index)
+        if is_plural != (plural is not None):
+            raise KeyError(key)
+        if is_plural:
+            forms = translation.split(b"\0")
+            if not 0 <= plural < len(forms):
+                raise KeyError(key)
+            translation = forms[plural]
+        return translation.decode(self.charset)
+
+    def __iter__(self):
+        """Iterate over all keys (decodes all message ids)."""
+        for index in range(self._count):
+            original = self._string(self._originals, index)
+            if b"\0" in original:
+                msgid = original.partition(b"\0")[0].decode(self.charset)
+                forms = self._string(self._translations, index).count(b"\0") + 1
+                for plural in range(forms):
+                    yield (msgid, plural)
+            else:
+                yield original.decode(self.charset)
+
+    def __len__(self):
+        """Get the number of keys."""
+        return sum(1 for _ in self)
+
+    def close(self):
+        """Unmap the file."""
+        self._map.close()
+
+
+def load_mmap_translations(filenames, domain="messages"):
+    """Create translations looking messages up in memory-mapped files.
+
+    :param filenames: List of ``.mo`` files. Later files override messages of
+        earlier ones, like :meth:`babel.support.Translations.merge`.
+    :param domain: Name of message catalog domain.
+    :returns: A :class:`babel.support.Translations` instance.
+    """
+    translations = support.Translations(domain=domain)
+    catalogs = [MmapCatalog(filename) for filename in filenames]
+    if catalogs:
+        last = catalogs[-1]
+        translations._catalog = (
+            last if len(catalogs) == 1 else ChainMap(*reversed(catalogs))
+        )
+        translations._info = dict(last.info)
+        translations._charset = last.charset
+        translations.plural = last.plural
+        translations.files = list(filenames)
+    return translations
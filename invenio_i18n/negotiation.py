@@ -0,0 +1,291 @@
+# SPDX-FileCopyrightText: 2026 CERN.
+# SPDX-License-Identifier: MIT
+
+"""Locale negotiation index used by the locale selector.
+
+The index is built once per application from ``BABEL_DEFAULT_LOCALE`` and
+``I18N_LANGUAGES`` as part of the
+:class:`~invenio_i18n.registry.LanguageRegistry`, so that the locale
+selector can validate and normalize language codes with dictionary lookups
+instead of rebuilding and scanning lists on every request.
+"""
+
+import re
+from functools import lru_cache
+from types import MappingProxyType
+
+from babel import Locale, UnknownLocaleError
+from babel.core import get_global, parse_locale
+from babel.localedata import locale_identifiers
+
+_MISSING = object()
+
+MAX_IDENTIFIER_LENGTH = 64
+"""Longer values are never valid locale identifiers or language tags."""
+
+LOCALE_IDENTIFIER_RE = re.compile(
+    r"[A-Za-z]{2,8}"
+    r"(?:_[A-Za-z]{4})?"
+    r"(?:_(?:[A-Za-z]{2}|[0-9]{3}))?"
+    r"(?:_[A-Za-z0-9]{4,8})*"
+    r"(?:\.[A-Za-z0-9-]{1,16})?"
+    r"(?:@[A-Za-z0-9_]{1,16})?"
+)
+"""Syntax of the locale identifiers accepted by :meth:`babel.core.Locale.parse`."""
+
+
+def normalize_tag(tag):
+    """Normalize a language tag for case- and delimiter-insensitive lookups.
+
+    ``pt-BR``, ``pt_br`` and ``PT_BR`` are all normalized to ``pt_br``.
+    """
+    return tag.replace("-", "_").lower()
+
+
+def _parse_tag(tag):
+    """Parse a language tag into ``(language, script, territory)``.
+
+    :returns: The lowercased subtags (missing ones are ``None``) or ``None``
+        if the tag is not valid.
+    """
+    try:
+        language, territory, script, _variant = parse_locale(tag.replace("-", "_"))
+    except ValueError:
+        return None
+    return (
+        language.lower(),
+        script.lower() if script else None,
+        territory.lower() if territory else None,
+    )
+
+
+@lru_cache(maxsize=1024)
+def _parse_locale_identifier(identifier):
+    """Parse a syntactically valid locale identifier with Babel."""
+    try:
+        return str(Locale.parse(identifier))
+    except (UnknownLocaleError, ValueError):
+        return None
+
+
+def parse_locale_identifier(identifier):
+    """Parse a locale identifier into its canonical form.
+
+    Values with an impossible syntax are rejected without consulting CLDR
+    and are not memoized, so that junk input cannot grow or flush the cache.
+    The results of other identifiers are memoized, including those of
+    unknown locales, so the function is cheap enough to validate untrusted
+    input on every request.
+
+    :param identifier: A locale identifier, e.g. ``de_at``.
+    :returns: The canonical identifier (e.g. ``de_AT``) or ``None`` if it is
+        not a valid locale.
+    """
+    if (
+        not isinstance(identifier, str)
+        or len(identifier) > MAX_IDENTIFIER_LENGTH
+        or not LOCALE_IDENTIFIER_RE.fullmatch(identifier)
+    ):
+        return None
+    return _parse_locale_identifier(identifier)
+
+
+def _likely_script(language, script, territory, likely_subtags):
+    """Get the explicit or the most likely script of a parsed tag."""
+    if script:
+        return script
+    keys = [f"{language}_{territory.upper()}"] if territory else []
+    keys.append(language)
+    for key in keys:
+        likely = likely_subtags.get(key)
+        if likely:
+            return _parse_tag(likely)[1]
+    return None
+
+
+def build_match_table(codes):
+    """Precompute the best configured code for plausible language tags.
+
+    For every CLDR locale identifier whose language is configured, the
+    table maps the normalized tag and its script- and territory-less variants
+    to the configured code with the same language and (likely) script,
+    preferring the same territory, then a code without territory. Tags
+    without acceptable match (e.g. ``zh_hant`` if only ``zh_Hans`` is
+    configured) map to ``None``.
+
+    :param codes: Configured language codes in order of preference.
+    :returns: Dictionary from normalized tag (see :func:`normalize_tag`) to
+        configured code or ``None``.
+    """
+    likely_subtags = get_global("likely_subtags")
+
+    candidates = {}
+    for code in codes:
+        parsed = _parse_tag(code)
+        if parsed is None:
+            continue
+        language, script, territory = parsed
+        script = _likely_script(language, script, territory, likely_subtags)
+        candidates.setdefault(language, []).append((script, territory, code))
+
+    tags = set()
+    for identifier in locale_identifiers():
+        parsed = _parse_tag(identifier)
+        if parsed is None or parsed[0] not in candidates:
+            continue
+        language, script, territory = parsed
+        tags.add((language, None, None))
+        if script:
+            tags.add((language, script, None))
+        if territory:
+            tags.add((language, None, territory))
+            tags.add((language, script, territory))
+
+    table = {}
+    for language, script, territory in tags:
+        likely = _likely_script(language, script, territory, likely_subtags)
+        best = None
+        best_score = -1
+        for c_script, c_territory, code in candidates[language]:
+            if c_script != likely:
+                continue
+            if c_territory == territory:
+                score = 2
+            elif c_territory is None:
+                score = 1
+            else:
+                score = 0
+            if score > best_score:
+                best, best_score = code, score
+        key = "_".join(subtag for subtag in (language, script, territory) if subtag)
+        table[key] = best
+    return table
+
+
+def iter_language_codes(languages):
+    """Iterate over the language codes of an ``I18N_LANGUAGES`` value.
+
+    Items are usually ``(code, title)`` tuples, but bare codes are accepted
+    as well.
+    """
+    for item in languages:
+        yield item if isinstance(item, str) else item[0]
+
+
+class LocaleIndex:
+    """Immutable lookup tables for the configured languages.
+
+    * ``codes`` is a frozenset of all configured language codes (including
+      the default locale).
+    * ``ordered`` is a tuple of the same codes in order of preference, i.e.
+      the default locale followed by ``I18N_LANGUAGES``.
+    * ``aliases`` maps exact and normalized spellings of a code (see
+      :func:`normalize_tag`) to the configured code.
+    * ``matches`` maps normalized regional and script variants of configured
+      languages (e.g. ``de_at`` or ``zh_hant_tw``) to the best configured
+      code, see :func:`build_match_table`.
+    * ``fallbacks`` maps a primary language subtag (e.g. ``pt``) to the
+      configured code it should fall back to (e.g. ``pt_BR``) for tags
+      unknown to CLDR.
+    """
+
+    __slots__ = (
+        "source",
+        "default",
+        "codes",
+        "ordered",
+        "aliases",
+        "matches",
+        "fallbacks",
+    )
+
+    def __init__(self, default, languages):
+        """Constructor.
+
+        :param default: Code of the default locale.
+        :param languages: Value of ``I18N_LANGUAGES``.
+        """
+        ordered = []
+        for code in (default, *iter_language_codes(languages)):
+            if code not in ordered:
+                ordered.append(code)
+
+        aliases = {}
+        fallbacks = {}
+        for code in ordered:
+            normalized = normalize_tag(code)
+            aliases.setdefault(code, code)
+            aliases.setdefault(normalized, code)
+            primary = normalized.split("_", 1)[0]
+            # A code equal to its primary subtag always wins the fallback,
+            # otherwise the first configured regional variant is used.
+            if primary == normalized or primary not in fallbacks:
+                fallbacks[primary] = code
+
+        self.source = languages
+        self.default = default
+        self.codes = frozenset(ordered)
+        self.ordered = tuple(ordered)
+        self.aliases = MappingProxyType(aliases)
+        self.matches = MappingProxyType(build_match_table(ordered))
+        self.fallbacks = MappingProxyType(fallbacks)
+
+    def __setattr__(self, name, value):
+        """Prevent modifications once the index has been built."""
+        if hasattr(self, "fallbacks"):
+            raise AttributeError(f"{type(self).__name__} is immutable")
+        super().__setattr__(name, value)
+
+    def lookup(self, value):
+        """Return the configured code for ``value`` or ``None``.
+
+        Exact codes are resolved without any allocation; other spellings of
+        a configured code (e.g. ``pt-br`` for ``pt_BR``) are normalized
+        first.
+        """
+        if not isinstance(value, str) or len(value) > MAX_IDENTIFIER_LENGTH:
+            return None
+        code = self.aliases.get(value)
+        if code is None:
+            code = self.aliases.get(normalize_tag(value))
+        return code
+
+    def match(self, value):
+        """Return the best configured code for a language tag or ``None``.
+
+        Unlike :meth:`lookup`, regional and script variants are matched too,
+        e.g. ``de-AT`` selects ``de`` and ``zh-TW`` selects ``zh_Hant``.
+        """
+        code = self.lookup(value)
+        if (
+            code is not None
+            or not isinstance(value, str)
+            or len(value) > MAX_IDENTIFIER_LENGTH
+        ):
+            return code
+        normalized = normalize_tag(value)
+        code = self.matches.get(normalized, _MISSING)
+        if code is not _MISSING:
+            return code
+        return self.fallbacks.get(normalized.split("_", 1)[0])
+
+    def negotiate(self, accept_languages):
+        """Return the best configured code for parsed ``Accept-Language``.
+
+        :param accept_languages: An iterable of ``(tag, quality)`` tuples
+            sorted by preference, e.g. ``request.accept_languages``.
+        :returns: The configured code or ``None``.
+        """
+        # Tags are tried in order of preference and each one is matched with
+        # its regional and script fallbacks, so a preferred ``de-AT`` selects
+        # ``de`` even if a less preferred language is configured exactly.
+        for tag, quality in accept_languages:
+            if quality <= 0:
+                continue
+            if tag == "*":
+                return self.default
+            code = self.match(tag)
+            if code is not None:
+                return code
+
+        return None
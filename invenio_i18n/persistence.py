@@ -0,0 +1,118 @@
+# SPDX-FileCopyrightText: 2026 CERN.
+# SPDX-License-Identifier: MIT
+
+"""Persistence of the language and timezone chosen by the user.
+
+Depending on ``I18N_LANGUAGE_STORAGE`` the language and timezone are kept
+either in the session (default) or in dedicated signed cookies. The cookie
+mode never touches the session, so anonymous requests do not need to load
+it from a server-side session store and responses do not vary on the
+session cookie.
+"""
+
+from flask import current_app, request, session
+from itsdangerous import BadSignature, Signer
+
+
+def _get_signer(salt="invenio-i18n-language"):
+    """Get the signer for a preference cookie."""
+    return Signer(current_app.secret_key, salt=salt)
+
+
+def _load(session_key, cookie_name, salt):
+    """Load a preference from the session or from its signed cookie."""
+    if current_app.config["I18N_LANGUAGE_STORAGE"] == "cookie":
+        if not request:
+            return None
+        value = request.cookies.get(cookie_name)
+        if not value or not current_app.secret_key:
+            return None
+        try:
+            return _get_signer(salt).unsign(value).decode("utf-8")
+        except (BadSignature, UnicodeDecodeError):
+            return None
+
+    if session and session_key in session:
+        return session[session_key]
+    return None
+
+
+def _store(response, value, session_key, cookie_name, salt):
+    """Store a preference in the session or in its signed cookie."""
+    config = current_app.config
+    if config["I18N_LANGUAGE_STORAGE"] == "cookie":
+        response.set_cookie(
+            cookie_name,
+            _get_signer(salt).sign(value).decode("utf-8"),
+            max_age=config["I18N_LANGUAGE_COOKIE_MAX_AGE"],
+            secure=config.get("SESSION_COOKIE_SECURE", False),
+            httponly=True,
+            samesite=config.get("SESSION_COOKIE_SAMESITE"),
+        )
+    else:
+        session[session_key] = value
+    return response
+
+
+def load_language():
+    """Load the language stored for the current user.
+
+    :returns: The stored language code (not validated) or ``None``.
+    """
+    config = current_app.config
+    return _load(
+        config["I18N_SESSION_KEY"],
+        config["I18N_LANGUAGE_COOKIE_NAME"],
+        "invenio-i18n-language",
+    )
+
+
+def store_language(response, language):
+    """Store the language chosen by the current user.
+
+    :param response: Response the language cookie is set on (only used in
+        cookie mode).
+    :param language: The language code.
+    """
+    config = current_app.config
+    return _store(
+        response,
+        language,
+        config["I18N_SESSION_KEY"],
+        config["I18N_LANGUAGE_COOKIE_NAME"],
+        "invenio-i18n-language",
+    )
+
+
+def load_timezone():
+    """Load the timezone stored for the current user.
+
+    Stored like the language, in the session under
+    ``I18N_TIMEZONE_SESSION_KEY`` or in the ``I18N_TIMEZONE_COOKIE_NAME``
+    cookie.
+
+    :returns: The stored timezone name (not validated) or ``None``.
+    """
+    config = current_app.config
+    return _load(
+        config["I18N_TIMEZONE_SESSION_KEY"],
+        config["I18N_TIMEZONE_COOKIE_NAME"],
+        "invenio-i18n-timezone",
+    )
+
+
+def store_timezone(response, timezone):
+    """Store the timezone chosen by the current user.
+
+    :param response: Response the timezone cookie is set on (only used in
+        cookie mode).
+    :param timezone: The timezone name, e.g. ``"Europe/Zurich"``.
+    """
+    config = current_app.config
+    return _store(
+        response,
+        timezone,
+        config["I18N_TIMEZONE_SESSION_KEY"],
+        config["I18N_TIMEZONE_COOKIE_NAME"],
+        "invenio-i18n-timezone",
+    )
@@ -0,0 +1,167 @@
+# SPDX-FileCopyrightText: 2026 CERN.
+# SPDX-License-Identifier: MIT
+
+"""Per-application registry of the configured languages.
+
+The registry is built once per application from ``BABEL_DEFAULT_LOCALE``
+and ``I18N_LANGUAGES`` and stored in ``app.extensions``, so that several
+applications sharing one :class:`~invenio_i18n.ext.InvenioI18N` instance
+(e.g. the UI and the REST API application) each see their own languages.
+"""
+
+from functools import lru_cache
+
+from babel import Locale
+from flask import current_app, has_app_context
+
+from .negotiation import LocaleIndex
+
+
+class LanguageRegistry:
+    """Immutable lists and tables of the configured languages.
+
+    * ``languages`` is a tuple of ``(code, title)`` tuples, starting with the
+      default language (see :meth:`~invenio_i18n.ext.InvenioI18N.get_languages`).
+    * ``locales`` is a tuple of the parsed :class:`~babel.core.Locale` objects in
+      the same order (see :meth:`~invenio_i18n.ext.InvenioI18N.get_locales`).
+    * ``identifiers`` is a frozenset of the canonical identifiers of
+      ``locales`` (see :meth:`~invenio_i18n.ext.InvenioI18N.is_locale_available`).
+    * The names of the configured languages in a configured language are
+      computed on first use (see :meth:`get_display_name`) and kept for the
+      life of the registry, one row per display language.
+    * ``index`` is the :class:`~invenio_i18n.negotiation.LocaleIndex` used to
+      negotiate the locale of a request.
+    """
+
+    __slots__ = (
+        "source",
+        "languages",
+        "locales",
+        "identifiers",
+        "index",
+        "_parsed",
+        "_display_names",
+    )
+
+    def __init__(self, default, languages):
+        """Constructor.
+
+        :param default: Code of the default locale.
+        :param languages: Value of ``I18N_LANGUAGES``.
+        """
+        default_locale = Locale.parse(default)
+        default_lang = default_locale.language
+        entries = [(default_lang, default_locale.get_display_name(default_lang))]
+        locales = [default_locale]
+        for item in languages:
+            if isinstance(item, str):
+                locale = Locale.parse(item)
+                item = (item, locale.get_display_name(item))
+            else:
+                locale = Locale.parse(item[0])
+            entries.append(tuple(item))
+            locales.append(locale)
+
+        self.source = languages
+        self.languages = tuple(entries)
+        self.locales = tuple(locales)
+        self.identifiers = frozenset(str(locale) for locale in locales)
+        index = LocaleIndex(default, languages)
+        self._parsed = {code: Locale.parse(code) for code in index.ordered}
+        # Bounded by the number of configured languages.
+        self._display_names = {}
+        self.index = index
+
+    def __setattr__(self, name, value):
+        """Prevent modifications once the registry has been built."""
+        if hasattr(self, "index"):
+            raise AttributeError(f"{type(self).__name__} is immutable")
+        super().__setattr__(name, value)
+
+    def get_display_name(self, code, display_code=None):
+        """Get the display name of a configured language.
+
+        :param code: Language code or :class:`~babel.core.Locale`.
+        :param display_code: Code or locale of the language to display the name
+            in. Defaults to ``code`` itself.
+        :returns: The display name or ``None`` if one of the codes is not
+            configured.
+        """
+        code = str(code)
+        display_code = code if display_code is None else str(display_code)
+        names = self._display_names.get(display_code)
+        if names is None:
+            display_locale = self._parsed.get(display_code)
+            if display_locale is None:
+                return None
+            # Loading the data of a display locale is slow, so only the rows
+            # of the displayed languages are computed.
+            names = {
+                parsed_code: locale.get_display_name(display_locale)
+                for parsed_code, locale in self._parsed.items()
+            }
+            self._display_names[display_code] = names
+        return names.get(code)
+
+
+def build_language_registry(app):
+    """Build the language registry of an application and store it on the app."""
+    registry = LanguageRegistry(
+        app.extensions["babel"].default_locale,
+        app.config.get("I18N_LANGUAGES", []),
+    )
+    app.extensions["invenio-i18n-registry"] = registry
+    return registry
+
+
+def get_language_registry(app=None):
+    """Get the language registry of an application.
+
+    The registry is rebuilt if ``I18N_LANGUAGES`` has been replaced since the
+    registry was built.
+
+    :returns: The :class:`LanguageRegistry` or ``None`` if Invenio-I18N is not
+        installed on the application.
+    """
+    app = app or current_app
+    registry = app.extensions.get("invenio-i18n-registry")
+    if registry is not None and registry.source is not app.config.get("I18N_LANGUAGES"):
+        registry = build_language_registry(app)
+    return registry
+
+
+def get_locale_index(app=None):
+    """Get the locale negotiation index of an application.
+
+    :returns: The :class:`~invenio_i18n.negotiation.LocaleIndex` of the
+        :class:`LanguageRegistry` or ``None`` if Invenio-I18N is not installed
+        on the application.
+    """
+    registry = get_language_registry(app)
+    return registry.index if registry is not None else None
+
+
+@lru_cache(maxsize=2048)
+def _parse_display_name(code, display_code):
+    """Get the display name of any language known to Babel."""
+    return Locale.parse(code).get_display_name(display_code)
+
+
+def lookup_display_name(code, display_code):
+    """Get the name of a language in another language.
+
+    Configured languages are looked up in the table of the
+    :class:`LanguageRegistry`. Names of other languages are computed with
+    Babel and kept in a bounded LRU cache.
+
+    :param code: Language code or :class:`~babel.core.Locale`.
+    :param display_code: Code of the language to display the name in.
+    :raises babel.core.UnknownLocaleError: If a code is not known to Babel.
+    """
+    if has_app_context():
+        registry = get_language_registry()
+        if registry is not None:
+            name = registry.get_display_name(code, display_code)
+            if name is not None:
+                return name
+    return _parse_display_name(code, display_code)
@@ -0,0 +1,127 @@
+# SPDX-FileCopyrightText: 2026 CERN.
+# SPDX-License-Identifier: MIT
+
+"""Reloading of translation catalogs without restarting workers.
+
+If ``I18N_RELOAD_INTERVAL`` is set, every worker process runs a
+:class:`CatalogReloader` thread. It periodically reloads the cached locales
+whose catalog files have changed, and all cached locales once the trigger
+file ``I18N_RELOAD_TRIGGER_FILE`` is touched, e.g. with
+``invenio i18n reload-catalogs``.
+
+Catalog files should be replaced (e.g. written to a temporary file and
+renamed) rather than modified in place, in particular with the ``mmap``
+catalog backend.
+"""
+
+import logging
+import os
+from threading import Event, Lock, Thread
+
+from flask import current_app
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogReloader:
+    """Background thread reloading the catalogs of a domain."""
+
+    def __init__(self, domain, interval, trigger_file=None):
+        """Constructor.
+
+        :param domain: The :class:`~invenio_i18n.babel.MultidirDomain`.
+        :param interval: Seconds between two checks.
+        :param trigger_file: Path of a file whose modification forces a reload
+            of all cached locales.
+        """
+        self.domain = domain
+        self.interval = interval
+        self.trigger_file = trigger_file
+        self._trigger_mtime = self._get_trigger_mtime()
+        self._pid = None
+        self._lock = Lock()
+        self._stopped = Event()
+
+    def _get_trigger_mtime(self):
+        """Get the modification time of the trigger file or ``None``."""
+        if not self.trigger_file:
+            return None
+        try:
+            return os.stat(self.trigger_file).st_mtime_ns
+        except OSError:
+            return None
+
+    def check(self):
+        """Reload the catalogs if they changed or a reload was triggered.
+
+        :returns: List of reloaded locale identifiers.
+        """
+        mtime = self._get_trigger_mtime()
+        if mtime != self._trigger_mtime:
+            self._trigger_mtime = mtime
+            return self.domain.reload()
+        return self.domain.reload_changed()
+
+    def _run(self):
+        """Check for changes until the reloader is stopped."""
+        while not self._stopped.wait(self.interval):
+            try:
+                reloaded = self.check()
+            except Exception:
+                logger.exception("Failed to reload translation catalogs.")
+            else:
+                if reloaded:
+                    logger.info("Reloaded translations: %s", ", ".join(reloaded))
+
+    def ensure_started(self):
+        """Start the thread in the current process if it is not running.
+
+        Threads do not survive a fork, so this is called before each request
+        (see :func:`init_catalog_reloader`) to start one thread per worker.
+        """
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._lock:
+            if self._pid == pid:
+                return
+            self._pid = pid
+            self._stopped.clear()
+            Thread(target=self._run, name="invenio-i18n-reloader", daemon=True).start()
+
+    def stop(self):
+        """Stop the thread of the current process."""
+        self._stopped.set()
+        self._pid = None
+
+
+def init_catalog_reloader(app, domain):
+    """Install a catalog reloader if ``I18N_RELOAD_INTERVAL`` is set."""
+    if not app.config["I18N_RELOAD_INTERVAL"]:
+        return None
+    reloader = CatalogReloader(
+        domain,
+        app.config["I18N_RELOAD_INTERVAL"],
+        app.config["I18N_RELOAD_TRIGGER_FILE"],
+    )
+    app.extensions["invenio-i18n-reloader"] = reloader
+    app.before_request(reloader.ensure_started)
+    return reloader
+
+
+def get_catalog_reloader(app=None):
+    """Get the catalog reloader of an application or ``None``."""
+    return (app or current_app).extensions.get("invenio-i18n-reloader")
+
+
+def trigger_reload(app=None):
+    """Touch the trigger file, so that all workers reload their catalogs.
+
+    :returns: ``False`` if ``I18N_RELOAD_TRIGGER_FILE`` is not set.
+    """
+    trigger_file = (app or current_app).config.get("I18N_RELOAD_TRIGGER_FILE")
+    if not trigger_file:
+        return False
+    with open(trigger_file, "a"):
+        os.utime(trigger_file)
+    return True
@@ -0,0 +1,140 @@
+# SPDX-FileCopyrightText: 2026 CERN.
+# SPDX-License-Identifier: MIT
+
+"""Language prefixes in URLs (e.g. ``/de/records/1``).
+
+When ``I18N_URL_PREFIX_ROUTING`` is enabled, :class:`LocalePrefixMiddleware`
+moves a leading language code from the path into the script name of the
+request. The application routes are therefore unchanged, the selected
+language becomes part of the URL (and thus of the cache key of proxies) and
+``url_for`` carries the prefix over to generated links.
+
+Only the exact configured codes are accepted as prefix. Other spellings of
+a configured code (e.g. ``/DE/`` or ``/pt-br/``) are redirected to the
+canonical prefix, so that each language variant of a page has a single
+URL. Links to language independent endpoints, such as static files, never
+get a prefix (see ``I18N_URL_PREFIX_EXCLUDED_ENDPOINTS``).
+"""
+
+from fnmatch import fnmatchcase
+from functools import lru_cache
+from urllib.parse import quote, urlsplit, urlunsplit
+
+from flask import request
+from werkzeug.utils import redirect
+
+from .registry import get_locale_index
+
+URL_LOCALE_KEY = "invenio_i18n.url_locale"
+"""WSGI environ key holding the language code taken from the URL."""
+
+SCRIPT_NAME_KEY = "invenio_i18n.script_name"
+"""WSGI environ key holding the script name without the language prefix."""
+
+
+class LocalePrefixMiddleware:
+    """WSGI middleware moving a language prefix into the script name."""
+
+    def __init__(self, wsgi_app, app):
+        """Constructor.
+
+        :param wsgi_app: The wrapped WSGI application.
+        :param app: The Flask application the languages are configured on.
+        """
+        self.wsgi_app = wsgi_app
+        self.app = app
+
+    def __call__(self, environ, start_response):
+        """Strip the language prefix from the path of the request."""
+        path = environ.get("PATH_INFO", "")
+        segment, sep, rest = path[1:].partition("/")
+        if segment:
+            index = get_locale_index(self.app)
+            code = index.lookup(segment) if index is not None else None
+            if code is not None:
+                script_name = environ.get("SCRIPT_NAME", "")
+                if segment != code:
+                    # Other spellings of the code would be cached separately.
+                    location = quote(
+                        f"{script_name}/{code}{sep}{rest}".encode("latin-1"),
+                        safe="/:@!$&'()*+,;=-._~%",
+                    )
+                    query = environ.get("QUERY_STRING")
+                    if query:
+                        location = f"{location}?{query}"
+                    return redirect(location, 301)(environ, start_response)
+                environ[SCRIPT_NAME_KEY] = script_name
+                environ[URL_LOCALE_KEY] = code
+                environ["SCRIPT_NAME"] = f"{script_name}/{segment}"
+                environ["PATH_INFO"] = sep + rest
+        return self.wsgi_app(environ, start_response)
+
+
+@lru_cache(maxsize=1024)
+def is_excluded_endpoint(endpoint, patterns):
+    """Check if links to an endpoint never get a language prefix.
+
+    :param endpoint: The endpoint name.
+    :param patterns: Tuple of endpoint patterns, see
+        ``I18N_URL_PREFIX_EXCLUDED_ENDPOINTS``.
+    """
+    return any(fnmatchcase(endpoint, pattern) for pattern in patterns)
+
+
+def make_url_for(app):
+    """Wrap ``url_for`` of an application to skip excluded endpoints.
+
+    Links to endpoints matching ``I18N_URL_PREFIX_EXCLUDED_ENDPOINTS`` are
+    built without the language prefix of the current request.
+    """
+    url_for = app.url_for
+
+    def url_for_without_prefix(endpoint, **values):
+        rv = url_for(endpoint, **values)
+        if not request or URL_LOCALE_KEY not in request.environ:
+            return rv
+        patterns = tuple(app.config["I18N_URL_PREFIX_EXCLUDED_ENDPOINTS"])
+        if not is_excluded_endpoint(endpoint, patterns):
+            return rv
+        prefixed = request.environ["SCRIPT_NAME"]
+        base = request.environ[SCRIPT_NAME_KEY]
+        parts = urlsplit(rv)
+        if parts.path.startswith(f"{prefixed}/"):
+            rv = urlunsplit(parts._replace(path=base + parts.path[len(prefixed) :]))
+        return rv
+
+    return url_for_without_prefix
+
+
+def init_url_prefix_routing(app):
+    """Install the language prefix middleware if enabled."""
+    if not app.config["I18N_URL_PREFIX_ROUTING"]:
+        return
+    if not isinstance(app.wsgi_app, LocalePrefixMiddleware):
+        app.wsgi_app = LocalePrefixMiddleware(app.wsgi_app, app)
+        app.url_for = make_url_for(app)
+
+
+def get_url_locale():
+    """Get the language code from the URL of the current request."""
+    return request.environ.get(URL_LOCALE_KEY) if request else None
+
+
+def localize_url(url, lang_code):
+    """Replace (or add) the language prefix of a local URL.
+
+    :param url: A URL of the current application.
+    :param lang_code: The language code to use as prefix.
+    """
+    base = request.environ.get(SCRIPT_NAME_KEY, request.script_root)
+    parts = urlsplit(url)
+    path = parts.path
+    if path.startswith(base):
+        path = path[len(base) :]
+
+    segment, sep, rest = path[1:].partition("/")
+    index = get_locale_index()
+    if segment and index is not None and index.lookup(segment) is not None:
+        path = sep + rest
+
+    return urlunsplit(parts._replace(path=f"{base}/{lang_code}{path or '/'}"))
@@ -8,67 +8,384 @@ See `Flask-Babel documentation <https://python-babel.github.io/flask-babel/>`
 for corresponding methods.
 """
 
-from flask import current_app, request, session
+from collections import OrderedDict, namedtuple
+from threading import Lock
+from time import perf_counter
 
-try:
-    from flask_login import current_user
-except ImportError:  # pragma nocover
-    current_user = None
+from flask import current_app, g, request
+from invenio_base.utils import obj_or_import_string
+
+from .persistence import load_language, load_timezone
+from .registry import get_locale_index
+from .routing import get_url_locale
+from .signals import locale_selected
+from .timezones import parse_timezone
+from .users import get_user_language_resolver, get_user_timezone_resolver
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+LocaleSelection = namedtuple("LocaleSelection", ["locale", "stage", "vary"])
+
+_MISSING = object()
+
+
+class AcceptLanguageCache:
+    """Bounded LRU cache of negotiated locales keyed by raw header value.
+
+    The cache belongs to a single application. It is tied to the
+    :class:`~invenio_i18n.negotiation.LocaleIndex` it was filled from and
+    is emptied as soon as a different index (i.e. a changed
+    ``I18N_LANGUAGES``) is used.
+    """
+
+    max_header_length = 512
+    """Longer header values are negotiated but never cached."""
+
+    def __init__(self, maxsize=256):
+        """Constructor.
+
+        :param maxsize: Maximum number of distinct header values to keep.
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._index = None
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def negotiate(self, index, header, accept_languages):
+        """Get the best configured locale for an ``Accept-Language`` header.
+
+        :param index: The current :class:`~invenio_i18n.negotiation.LocaleIndex`.
+        :param header: Raw value of the ``Accept-Language`` header.
+        :param accept_languages: Callable returning the parsed header. It is
+            only called on cache misses.
+        """
+        if self.maxsize <= 0 or len(header) > self.max_header_length:
+            return index.negotiate(accept_languages())
+
+        with self._lock:
+            if self._index is not index:
+                self._entries.clear()
+                self._index = index
+            language = self._entries.get(header, _MISSING)
+            if language is not _MISSING:
+                self._entries.move_to_end(header)
+                self.hits += 1
+                return language
+            self.misses += 1
+
+        language = index.negotiate(accept_languages())
+
+        with self._lock:
+            if self._index is index:
+                self._entries[header] = language
+                if len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return language
+
+    def cache_info(self):
+        """Report cache statistics."""
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self._entries))
+
+    def cache_clear(self):
+        """Clear the cache and its statistics."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+
+def init_accept_language_cache(app):
+    """Install the ``Accept-Language`` cache on an application."""
+    cache = AcceptLanguageCache(app.config["I18N_ACCEPT_LANGUAGE_CACHE_SIZE"])
+    app.extensions["invenio-i18n-accept-language-cache"] = cache
+    return cache
+
+
+def get_accept_language_cache(app=None):
+    """Get the ``Accept-Language`` cache of an application."""
+    return (app or current_app).extensions["invenio-i18n-accept-language-cache"]
+
+
+class LocaleSelector:
+    """Stage of the locale selector pipeline.
+
+    Stages are declared in ``I18N_LOCALE_SELECTORS`` and tried in order until
+    one returns a configured language code.
+    """
+
+    name = None
+    """Name used to report statistics of the stage."""
+
+    vary = ()
+    """Request headers the stage depends on (see ``I18N_RESPONSE_HEADERS``)."""
+
+    def select(self, index):
+        """Select a locale.
+
+        :param index: The :class:`~invenio_i18n.negotiation.LocaleIndex` of the
+            application.
+        :returns: A configured language code or ``None`` to continue with the
+            next stage.
+        """
+        raise NotImplementedError()
+
+
+class URLLocaleSelector(LocaleSelector):
+    """URL starts with a language prefix (see ``I18N_URL_PREFIX_ROUTING``)."""
+
+    name = "url"
+
+    def select(self, index):
+        """Select the locale from the URL prefix."""
+        return get_url_locale()
+
+
+class QueryStringLocaleSelector(LocaleSelector):
+    """User has specified a concrete language in the ``ln`` query argument."""
+
+    name = "querystring"
+
+    def select(self, index):
+        """Select the locale from the query string."""
+        if request and "ln" in request.args:
+            return index.match(request.args["ln"])
+        return None
+
+
+class StoredLocaleSelector(LocaleSelector):
+    """User has set a language for the session (or in the language cookie).
+
+    See ``I18N_LANGUAGE_STORAGE``.
+    """
+
+    name = "session"
+    vary = ("Cookie",)
+
+    def select(self, index):
+        """Select the locale stored for the user."""
+        return index.match(load_language())
+
+
+class UserLocaleSelector(LocaleSelector):
+    """Registered user has a preferred language set in the profile.
+
+    The user is only loaded if the request has one and its language is not
+    cached (see :mod:`invenio_i18n.users`).
+    """
+
+    name = "user"
+    vary = ("Cookie",)
+
+    def select(self, index):
+        """Select the locale of the logged-in user."""
+        return index.match(get_user_language_resolver()())
+
+
+class HeaderLocaleSelector(LocaleSelector):
+    """Best match for the ``Accept-Language`` header the browser has sent."""
+
+    name = "headers"
+    vary = ("Accept-Language",)
+
+    def select(self, index):
+        """Select the locale from the request headers."""
+        header = request.headers.get("Accept-Language") if request else None
+        if not header:
+            return None
+        cache = get_accept_language_cache()
+        return cache.negotiate(index, header, _get_accept_languages)
+
+
+class LocaleSelectorPipeline:
+    """Chain of locale selector stages with per-stage statistics.
+
+    The result is kept in ``g`` for :func:`set_response_headers`, including
+    the request headers of all stages which were consulted: a different value
+    of any of them could have changed the selected locale.
+
+    For every stage the pipeline counts how often it was called, how often it
+    decided the locale and how much time it took. After every selection the
+    :data:`~invenio_i18n.signals.locale_selected` signal is sent.
+    """
+
+    default_name = "default"
+    """Name reported when no stage decided and the default locale is used."""
+
+    def __init__(self, stages):
+        """Constructor.
+
+        :param stages: List of :class:`LocaleSelector` instances.
+        """
+        self.stages = tuple(stages)
+        self._lock = Lock()
+        self.reset_stats()
+
+    def __call__(self):
+        """Select the locale of the current request."""
+        index = get_locale_index()
+        if index is None:
+            return current_app.config["BABEL_DEFAULT_LOCALE"]
+
+        timings = []
+        vary = set()
+        language = None
+        decided_by = self.default_name
+        for stage in self.stages:
+            start = perf_counter()
+            language = stage.select(index)
+            timings.append((stage.name, perf_counter() - start))
+            vary.update(stage.vary)
+            if language is not None:
+                decided_by = stage.name
+                break
+        else:
+            # If there is no way to know the language, use the default.
+            language = index.default
+
+        self._record(timings, decided_by)
+        g._invenio_i18n_selection = LocaleSelection(language, decided_by, vary)
+        if locale_selected.receivers:
+            locale_selected.send(
+                current_app._get_current_object(),
+                locale=language,
+                stage=decided_by,
+                timings=timings,
+            )
+        return language
+
+    def _record(self, timings, decided_by):
+        """Add the timings of a selection to the statistics."""
+        with self._lock:
+            for name, duration in timings:
+                stats = self._stats[name]
+                stats["calls"] += 1
+                stats["time"] += duration
+            self._stats[decided_by]["decisions"] += 1
+
+    def stats(self):
+        """Get the statistics per stage.
+
+        :returns: Dictionary mapping stage names (and ``"default"``) to
+            dictionaries with ``calls``, ``decisions`` and ``time`` (total
+            seconds spent in the stage).
+        """
+        with self._lock:
+            return {name: dict(stats) for name, stats in self._stats.items()}
+
+    def reset_stats(self):
+        """Reset the statistics."""
+        with self._lock:
+            self._stats = {
+                name: {"calls": 0, "decisions": 0, "time": 0.0}
+                for name in [stage.name for stage in self.stages] + [self.default_name]
+            }
+
+
+def init_locale_selector(app):
+    """Build the locale selector pipeline from ``I18N_LOCALE_SELECTORS``."""
+    stages = []
+    for value in app.config["I18N_LOCALE_SELECTORS"]:
+        stage = obj_or_import_string(value)
+        stages.append(stage() if isinstance(stage, type) else stage)
+    pipeline = LocaleSelectorPipeline(stages)
+    app.extensions["invenio-i18n-locale-selector"] = pipeline
+    return pipeline
+
+
+def get_locale_selector(app=None):
+    """Get the locale selector pipeline of an application."""
+    return (app or current_app).extensions.get("invenio-i18n-locale-selector")
+
+
+def set_response_headers(response):
+    """Add ``Content-Language`` and ``Vary`` headers to a response.
+
+    Only done if the locale was selected while handling the request. The
+    ``Vary`` header lists the request headers of the consulted selector
+    stages, e.g. ``Accept-Language`` if the locale was negotiated but nothing
+    if it came from the URL or the query string. It also includes ``Cookie``
+    if the timezone was selected from the stored or the user's timezone
+    (see :func:`get_timezone`).
+
+    Installed as ``after_request`` handler if ``I18N_RESPONSE_HEADERS`` is
+    enabled.
+    """
+    selection = g.get("_invenio_i18n_selection")
+    if selection is not None:
+        response.headers.setdefault(
+            "Content-Language", selection.locale.replace("_", "-")
+        )
+        if selection.vary:
+            response.vary.update(selection.vary)
+    timezone_vary = g.get("_invenio_i18n_timezone_vary")
+    if timezone_vary:
+        response.vary.update(timezone_vary)
+    return response
 
 
 def get_locale():
     """Get locale.
 
-    Searches for locale in the following the order:
+    Runs the stages configured in ``I18N_LOCALE_SELECTORS``. By default,
+    searches for locale in the following the order:
 
+    - URL starts with a language prefix.
     - User has specified a concrete language in the query string.
-    - Current session has a language set.
+    - Current session (or language cookie) has a language set.
     - User has a language set in the profile.
     - Headers of the HTTP request.
     - Default language from ``BABEL_DEFAULT_LOCALE``.
 
-    Will only accept languages defined in ``I18N_LANGUAGES``.
+    Will only accept languages defined in ``I18N_LANGUAGES``. Codes are
+    matched against the application's
+    :class:`~invenio_i18n.negotiation.LocaleIndex`, so regional and script
+    variants (e.g. ``de-AT``) select the best configured language.
     """
-    locales = []
-    if "invenio-i18n" in current_app.extensions:
-        locales = [x[0] for x in current_app.extensions["invenio-i18n"].get_languages()]
-
-    # In the case of the user specifies a language for the resource.
-    if request and "ln" in request.args:
-        language = request.args.get("ln")
-        if language in locales:
-            return language
-
-    # In the case of the user has set a language for the current session.
-    language_session_key = current_app.config["I18N_SESSION_KEY"]
-    if session and language_session_key in session:
-        language = session[language_session_key]
-        if language in locales:
-            return language
-
-    # In the case of the registered user has a prefered language.
-    language_user_key = current_app.config["I18N_USER_LANG_ATTR"]
-    if (
-        language_user_key is not None
-        and hasattr(current_app, "login_manager")
-        and current_user is not None
-        and hasattr(current_user, "is_authenticated")
-        and current_user.is_authenticated
-    ):
-        language = getattr(current_user, language_user_key, None)
-        if language is not None and language in locales:
-            return language
-
-    # Using the headers that the navigator has sent.
-    if request:
-        headers_best_match = request.accept_languages.best_match(locales)
-        if headers_best_match is not None:
-            return headers_best_match
+    pipeline = get_locale_selector()
+    if pipeline is None:
+        return current_app.config["BABEL_DEFAULT_LOCALE"]
+    return pipeline()
+
 
-    # If there is no way to know the language, return BABEL_DEFAULT_LOCALE
-    return current_app.config["BABEL_DEFAULT_LOCALE"]
+def _get_accept_languages():
+    """Get the parsed ``Accept-Language`` header of the current request."""
+    return request.accept_languages
 
 
 def get_timezone():
-    """Get default timezone (i.e. ``BABEL_DEFAULT_TIMEZONE``)."""
+    """Get timezone.
+
+    Searches for the timezone in the following order:
+
+    - User has specified a timezone in the query string (see
+      ``I18N_TIMEZONE_QUERY_ARG``).
+    - Current session (or timezone cookie) has a timezone set.
+    - User has a timezone set in the profile (see
+      ``I18N_USER_TIMEZONE_ATTR``). Cached per user like the language.
+    - Default timezone from ``BABEL_DEFAULT_TIMEZONE``.
+
+    Unknown timezone names are ignored. Unless the timezone is taken from
+    the query string, the response varies on the ``Cookie`` header (see
+    :func:`set_response_headers`).
+
+    :returns: A ``pytz`` timezone, or the name of the default timezone.
+    """
+    if request:
+        arg = current_app.config["I18N_TIMEZONE_QUERY_ARG"]
+        if arg and arg in request.args:
+            tz = parse_timezone(request.args[arg])
+            if tz is not None:
+                return tz
+
+        # The stored and the user's timezone depend on the cookies.
+        g._invenio_i18n_timezone_vary = ("Cookie",)
+        tz = parse_timezone(load_timezone())
+        if tz is not None:
+            return tz
+
+        tz = parse_timezone(get_user_timezone_resolver()())
+        if tz is not None:
+            return tz
+
     return current_app.extensions["babel"].default_timezone
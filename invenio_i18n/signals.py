@@ -0,0 +1,31 @@
+# SPDX-FileCopyrightText: 2026 CERN.
+# SPDX-License-Identifier: MIT
+
+"""Signals for Invenio-I18N."""
+
+from blinker import Namespace
+
+_signals = Namespace()
+
+locale_selected = _signals.signal("locale-selected")
+"""Signal sent after the locale of a request has been selected.
+
+Parameters:
+
+- ``sender`` - the Flask application.
+- ``locale`` - the selected language code.
+- ``stage`` - name of the selector stage which decided the locale (or
+  ``"default"``).
+- ``timings`` - list of ``(stage name, seconds)`` tuples of the stages which
+  were run.
+
+Example subscriber:
+
+.. code-block:: python
+
+    def receiver(sender, locale=None, stage=None, timings=None):
+        ...
+
+    from invenio_i18n.signals import locale_selected
+    locale_selected.connect(receiver)
+"""
@@ -0,0 +1,128 @@
+# SPDX-FileCopyrightText: 2026 CERN.
+# SPDX-License-Identifier: MIT
+
+"""Timezone conversion with :mod:`zoneinfo`.
+
+Flask-Babel selects the timezone of a request as a ``pytz`` timezone, whose
+conversions go through ``localize`` and ``normalize``. The functions of this
+module convert with :class:`zoneinfo.ZoneInfo` objects instead, which are
+created once per process, and keep the zone of the current user in ``g``
+for the rest of the request.
+
+Used by the ``toutc`` and ``tousertimezone`` template filters and by
+:mod:`invenio_i18n.formatting`. The timezone selected through Flask-Babel
+(see ``flask_babel.get_timezone``) stays a ``pytz`` timezone, as
+Flask-Babel relies on its API.
+"""
+
+from datetime import timezone
+from functools import lru_cache
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+import pytz
+from flask import g, has_app_context
+from flask_babel import get_timezone
+
+UTC = timezone.utc
+
+
+@lru_cache(maxsize=1024)
+def get_zone(name):
+    """Get the :class:`~zoneinfo.ZoneInfo` of a timezone name.
+
+    Falls back to the ``pytz`` timezone if the timezone database used by
+    :mod:`zoneinfo` does not know the name (e.g. without the ``tzdata``
+    package on systems without a timezone database).
+
+    :raises KeyError: If the timezone is unknown.
+    """
+    try:
+        return ZoneInfo(name)
+    except ZoneInfoNotFoundError:
+        return pytz.timezone(name)
+
+
+@lru_cache(maxsize=1024)
+def parse_timezone(name):
+    """Get the ``pytz`` timezone of a timezone name.
+
+    Used to validate timezone names given by users, e.g. in the query
+    string. Names are matched case-insensitively.
+
+    :returns: The timezone or ``None`` if the name is unknown.
+    """
+    if not isinstance(name, str) or len(name) > 64:
+        return None
+    try:
+        return pytz.timezone(name)
+    except pytz.UnknownTimeZoneError:
+        return None
+
+
+def get_tzinfo(tz):
+    """Get the ``zoneinfo`` equivalent of a timezone.
+
+    :param tz: A timezone name, a ``pytz`` timezone or any other
+        :class:`~datetime.tzinfo`, which is returned as is.
+    """
+    if isinstance(tz, str):
+        return get_zone(tz)
+    name = getattr(tz, "zone", None)  # pytz
+    if name is not None:
+        return UTC if name == "UTC" else get_zone(name)
+    return tz
+
+
+def get_user_timezone():
+    """Get the timezone of the current user as :class:`~zoneinfo.ZoneInfo`.
+
+    The zone is kept in ``g`` as long as Flask-Babel selects the same
+    timezone.
+    """
+    tz = get_timezone()
+    if not has_app_context():
+        return get_tzinfo(tz)
+    cached = g.get("_invenio_i18n_timezone")
+    if cached is not None and cached[0] is tz:
+        return cached[1]
+    zone = get_tzinfo(tz)
+    g._invenio_i18n_timezone = (tz, zone)
+    return zone
+
+
+def localize(dt, tz):
+    """Attach a timezone to a naive datetime like ``pytz`` ``localize``.
+
+    Ambiguous and non-existent local times are resolved to standard time,
+    as ``localize`` does by default.
+    """
+    if hasattr(tz, "localize"):
+        # A pytz timezone (see get_zone).
+        return tz.localize(dt)
+    first = dt.replace(tzinfo=tz, fold=0)
+    second = dt.replace(tzinfo=tz, fold=1)
+    if first.utcoffset() == second.utcoffset() or not first.dst():
+        return first
+    return second
+
+
+def to_user_timezone(dt):
+    """Convert a datetime to the timezone of the user.
+
+    Naive datetimes are assumed to be in UTC. Same as
+    ``flask_babel.to_user_timezone``.
+    """
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=UTC)
+    return dt.astimezone(get_user_timezone())
+
+
+def to_utc(dt):
+    """Convert a datetime to UTC and drop the timezone.
+
+    Naive datetimes are assumed to be in the timezone of the user. Same as
+    ``flask_babel.to_utc``.
+    """
+    if dt.tzinfo is None:
+        dt = localize(dt, get_user_timezone())
+    return dt.astimezone(UTC).replace(tzinfo=None)
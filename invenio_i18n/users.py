@@ -0,0 +1,204 @@
+# SPDX-FileCopyrightText: 2026 CERN.
+# SPDX-License-Identifier: MIT
+
+"""Cached lookups of preferences stored on the logged-in user.
+
+Used for the language (see ``I18N_USER_LANG_ATTR``) and the timezone (see
+``I18N_USER_TIMEZONE_ATTR``) of the user.
+
+Dereferencing ``current_user`` runs the Flask-Login user loader, which
+usually means a database query. The resolvers in this module avoid that:
+
+* Requests which certainly have no logged-in user (no session cookie, no
+  remember cookie and no request loader) are answered without touching
+  the session or the user loader.
+* If enabled, values are cached per user for a limited time, so the user is
+  only loaded when the cache entry is missing or expired.
+
+The cache is local to each process. :meth:`UserAttributeResolver.invalidate`
+only drops the entries of the calling process, other processes keep serving
+the old value until their entries expire. Caching is therefore disabled by
+default.
+
+Users are keyed by the string of ``user.get_id()``, i.e. the id stored in
+the session by Flask-Login. With Flask-Security this is the
+``fs_uniquifier`` of the user, not its primary key.
+"""
+
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+
+from flask import current_app, g, request, session
+from invenio_base.utils import obj_or_import_string
+
+try:
+    from flask_login import current_user
+except ImportError:  # pragma nocover
+    current_user = None
+
+_UNKNOWN = object()
+
+_MISSING = object()
+
+
+def peek_user_id():
+    """Get the id of the logged-in user without loading the user.
+
+    :returns: The user id, ``None`` if the request certainly has no
+        logged-in user or ``_UNKNOWN`` if the user has to be loaded to find
+        out.
+    """
+    config = current_app.config
+    if config["SESSION_COOKIE_NAME"] in request.cookies:
+        user_id = session.get("_user_id")
+        if user_id is not None:
+            return str(user_id)
+
+    login_manager = current_app.login_manager
+    if (
+        config.get("REMEMBER_COOKIE_NAME", "remember_token") in request.cookies
+        or getattr(login_manager, "request_callback", None) is not None
+    ):
+        return _UNKNOWN
+    return None
+
+
+class UserAttributeResolver:
+    """Resolve an attribute of the logged-in user with a per-user cache."""
+
+    def __init__(self, attr, ttl=0, maxsize=1024):
+        """Constructor.
+
+        :param attr: Name of the attribute on the user object. ``None``
+            disables the resolver.
+        :param ttl: Number of seconds a value is cached for a user. ``0``
+            disables caching.
+        :param maxsize: Maximum number of cached users.
+        """
+        self.attr = attr
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def __call__(self):
+        """Get the attribute value of the logged-in user or ``None``."""
+        if (
+            self.attr is None
+            or not request
+            or current_user is None
+            or not hasattr(current_app, "login_manager")
+        ):
+            return None
+
+        # Flask-Login stores a user in ``g`` once it has been loaded.
+        user = g.get("_login_user")
+        if user is None:
+            user_id = peek_user_id()
+            if user_id is None:
+                return None
+            if user_id is not _UNKNOWN:
+                value = self._get(user_id)
+                if value is not _MISSING:
+                    return value
+            user = current_user._get_current_object()
+
+        if not getattr(user, "is_authenticated", False):
+            return None
+        value = getattr(user, self.attr, None)
+        self._set(str(user.get_id()), value)
+        return value
+
+    def _get(self, user_id):
+        """Get a cached value or ``_MISSING``."""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return _MISSING
+            value, expires = entry
+            if expires < monotonic():
+                del self._entries[user_id]
+                return _MISSING
+            return value
+
+    def _set(self, user_id, value):
+        """Cache a value for a user."""
+        if self.ttl <= 0 or self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[user_id] = (value, monotonic() + self.ttl)
+            self._entries.move_to_end(user_id)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user=None):
+        """Drop the cached value of a user in the current process.
+
+        Call it when the attribute changes, e.g. after the user profile has
+        been saved.
+
+        :param user: The user object or the value of its ``get_id()``. If
+            ``None``, all users are dropped.
+        """
+        with self._lock:
+            if user is None:
+                self._entries.clear()
+            else:
+                if hasattr(user, "get_id"):
+                    user = user.get_id()
+                self._entries.pop(str(user), None)
+
+
+def _init_resolver(app, factory, attr, ttl, maxsize):
+    """Create a resolver from a factory or for a user attribute."""
+    factory = obj_or_import_string(factory)
+    if factory is not None:
+        return factory(app)
+    return UserAttributeResolver(attr, ttl=ttl, maxsize=maxsize)
+
+
+def init_user_language_resolver(app):
+    """Install the user language resolver on an application.
+
+    Uses the factory from ``I18N_USER_LANG_RESOLVER`` if set, otherwise a
+    :class:`UserAttributeResolver` for ``I18N_USER_LANG_ATTR``.
+    """
+    config = app.config
+    resolver = _init_resolver(
+        app,
+        config["I18N_USER_LANG_RESOLVER"],
+        config["I18N_USER_LANG_ATTR"],
+        config["I18N_USER_LANG_CACHE_TTL"],
+        config["I18N_USER_LANG_CACHE_SIZE"],
+    )
+    app.extensions["invenio-i18n-user-language"] = resolver
+    return resolver
+
+
+def get_user_language_resolver(app=None):
+    """Get the user language resolver of an application."""
+    return (app or current_app).extensions["invenio-i18n-user-language"]
+
+
+def init_user_timezone_resolver(app):
+    """Install the user timezone resolver on an application.
+
+    Uses the factory from ``I18N_USER_TIMEZONE_RESOLVER`` if set, otherwise
+    a :class:`UserAttributeResolver` for ``I18N_USER_TIMEZONE_ATTR``.
+    """
+    config = app.config
+    resolver = _init_resolver(
+        app,
+        config["I18N_USER_TIMEZONE_RESOLVER"],
+        config["I18N_USER_TIMEZONE_ATTR"],
+        config["I18N_USER_TIMEZONE_CACHE_TTL"],
+        config["I18N_USER_TIMEZONE_CACHE_SIZE"],
+    )
+    app.extensions["invenio-i18n-user-timezone"] = resolver
+    return resolver
+
+
+def get_user_timezone_resolver(app=None):
+    """Get the user timezone resolver of an application."""
+    return (app or current_app).extensions["invenio-i18n-user-timezone"]
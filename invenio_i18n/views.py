@@ -6,7 +6,10 @@
 
 from urllib.parse import urljoin, urlparse
 
-from flask import Blueprint, abort, current_app, redirect, request, session, url_for
+from flask import Blueprint, abort, current_app, redirect, request, url_for
+
+from .persistence import store_language
+from .routing import localize_url
 
 
 def is_local_url(target):
@@ -24,23 +27,24 @@ def get_redirect_target():
 
 
 def set_lang(lang_code=None):
-    """Set language in session and redirect."""
+    """Set language in session (or language cookie) and redirect."""
     # Check if language is available.
     lang_code = lang_code or request.values.get("lang_code")
     languages = dict(current_app.extensions["invenio-i18n"].get_languages())
     if lang_code is None or lang_code not in languages:
         abort(404 if request.method == "GET" else 400)
 
-    # Set language in session.
-    session[current_app.config["I18N_SESSION_KEY"]] = lang_code.lower()
-
     # Redirect user back.
     target = get_redirect_target()
     if not target:
         endpoint = current_app.config["I18N_DEFAULT_REDIRECT_ENDPOINT"]
         target = url_for(endpoint) if endpoint else "/"
 
-    return redirect(target)
+    if current_app.config["I18N_URL_PREFIX_ROUTING"]:
+        target = localize_url(target, lang_code)
+
+    # Set language in session (or language cookie).
+    return store_language(redirect(target), lang_code.lower())
 
 
 def create_blueprint(register_default_routes=True, url_prefix=None):
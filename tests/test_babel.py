@@ -3,13 +3,26 @@
 
 """Basic tests."""
 
+import os
 from os.path import dirname, join
 
 import pytest
+from babel import Locale
+from babel.messages.catalog import Catalog
+from babel.messages.mofile import write_mo
 from babel.support import NullTranslations, Translations
-from flask_babel import Babel, force_locale, get_locale
+from click.testing import CliRunner
+from flask_babel import Babel, force_locale, get_locale, gettext
 
-from invenio_i18n.babel import MultidirDomain
+from invenio_i18n import InvenioI18N
+from invenio_i18n.babel import (
+    CatalogCache,
+    MultidirDomain,
+    estimate_size,
+    merge_catalogs,
+)
+from invenio_i18n.cli import i18n as i18n_cli
+from invenio_i18n.manifest import DiscoveryManifest, distributions_key
 
 
 def test_init():
@@ -22,6 +35,159 @@ def test_init():
     assert len(d._translation_directories) == 0
 
 
+def test_discovery_manifest(tmp_path, monkeypatch):
+    """Test caching of entry point translation directories."""
+    path = str(tmp_path / "manifest.json")
+    group = "invenio_i18n.translations"
+    expected = MultidirDomain(entry_point_group=group)._translation_directories
+
+    d = MultidirDomain()
+    d.add_entrypoint(group, manifest=DiscoveryManifest(path))
+    assert d._translation_directories == expected
+
+    def fail(**kwargs):
+        raise AssertionError("entry points resolved")
+
+    with monkeypatch.context() as m:
+        m.setattr("invenio_i18n.babel.entry_points", fail)
+        d = MultidirDomain()
+        d.add_entrypoint(group, manifest=DiscoveryManifest(path))
+        assert d._translation_directories == expected
+
+    # A different set of installed distributions invalidates the manifest.
+    manifest = DiscoveryManifest(path, key="other")
+    assert manifest.get(group) is None
+    d = MultidirDomain()
+    d.add_entrypoint(group, manifest=manifest)
+    assert d._translation_directories == expected
+    assert DiscoveryManifest(path, key="other").get(group) == expected
+
+
+def test_distributions_key(tmp_path):
+    """Test that the key changes with the installed distributions."""
+    key = distributions_key([str(tmp_path)])
+    (tmp_path / "other.txt").write_text("")
+    assert distributions_key([str(tmp_path)]) == key
+    (tmp_path / "package-1.0.dist-info").mkdir()
+    assert distributions_key([str(tmp_path)]) != key
+    assert distributions_key([str(tmp_path / "missing")])
+
+
+def test_preload(tmp_path):
+    """Test loading merged translations up front."""
+    d = MultidirDomain(paths=[join(dirname(__file__), "translations")])
+    d.preload(["da", Locale("en")])
+    assert set(d.cache) == {("da", "messages"), ("en", "messages")}
+    translations = d.cache["da", "messages"]
+    assert translations.gettext("Translate") == "Oversætte"
+    assert d.load_translations("da") is translations
+
+    # Known directories are not added again.
+    d.add_path(join(dirname(__file__), "translations"))
+    assert d.translation_directories == [join(dirname(__file__), "translations")]
+    assert set(d.cache) == {("da", "messages"), ("en", "messages")}
+
+    # New directories invalidate the merged translations.
+    d.add_path(str(tmp_path))
+    assert d.cache == {}
+
+
+def write_catalog(dirname, locale, messages):
+    """Write a compiled catalog."""
+    catalog = Catalog(locale=locale)
+    for msgid, string in messages.items():
+        catalog.add(msgid, string)
+    path = dirname / locale / "LC_MESSAGES"
+    path.mkdir(parents=True)
+    with open(path / "messages.mo", "wb") as fp:
+        write_mo(fp, catalog)
+
+
+def test_merged_catalogs(app, tmp_path):
+    """Test writing and loading merged catalogs."""
+    first, second = tmp_path / "first", tmp_path / "second"
+    write_catalog(first, "da", {"A": "first", "B": "first", ("n", "ns"): ("1", "2")})
+    write_catalog(second, "da", {"B": "second"})
+    write_catalog(second, "de", {"A": "zweite"})
+
+    d = MultidirDomain(paths=[str(first), str(second)])
+    output = tmp_path / "merged"
+    written = d.write_merged_catalogs(str(output))
+    assert sorted(written) == [
+        str(output / locale / "LC_MESSAGES" / "messages.mo") for locale in ["da", "de"]
+    ]
+    assert merge_catalogs([str(first)], "fr") is None
+
+    merged = MultidirDomain(paths=[str(output)])
+    for locale in ["da", "de", "da_DK", "fr"]:
+        expected = d.load_translations(locale)
+        translations = merged.load_translations(locale)
+        for msgid in ["A", "B", "C"]:
+            assert translations.gettext(msgid) == expected.gettext(msgid)
+        for n in [1, 2]:
+            assert translations.ngettext("n", "ns", n) == expected.ngettext(
+                "n", "ns", n
+            )
+    assert merged.load_translations("da").gettext("B") == "second"
+
+    app.config["I18N_TRANSLATIONS_PATHS"] = [str(first), str(second)]
+    InvenioI18N(app, entry_point_group=None)
+    runner = CliRunner()
+    result = runner.invoke(i18n_cli, ["merge-catalogs"])
+    assert "Provide --output-directory" in result.output
+    cli_output = str(tmp_path / "cli")
+    result = runner.invoke(i18n_cli, ["merge-catalogs", "-o", cli_output, "-l", "de"])
+    assert result.exit_code == 0, result.output
+    assert os.listdir(cli_output) == ["de"]
+
+    app.config["I18N_MERGED_TRANSLATIONS_PATH"] = cli_output
+    i18n = InvenioI18N(app, entry_point_group=None)
+    assert i18n.domain.translation_directories == [cli_output]
+
+
+def test_catalog_cache():
+    """Test LRU eviction of cached translations."""
+    cache = CatalogCache(maxsize=2, pinned=["en"])
+    translations = {name: Translations() for name in ["en", "da", "de", "fr"]}
+    for name in ["en", "da", "de"]:
+        cache[name, "messages"] = translations[name]
+    # The pinned default locale is not evicted.
+    assert list(cache) == [("en", "messages"), ("de", "messages")]
+
+    assert cache.get(("en", "messages")) is translations["en"]
+    assert cache.get(("da", "messages")) is None
+    cache["fr", "messages"] = translations["fr"]
+    assert cache.stats() == {
+        "locales": ["en", "fr"],
+        "bytes": 2 * estimate_size(translations["en"]),
+        "hits": 1,
+        "misses": 1,
+        "evictions": 2,
+        "maxsize": 2,
+        "max_bytes": 0,
+        "pinned": ["en"],
+    }
+
+
+def test_catalog_cache_bytes(app):
+    """Test limiting the size of the cached translations."""
+    app.config.update(
+        I18N_LANGUAGES=[("da", "Danish"), ("de", "German")],
+        I18N_TRANSLATIONS_PATHS=[join(dirname(__file__), "translations")],
+        I18N_CATALOG_CACHE_BYTES=1,
+        I18N_CATALOG_CACHE_PINNED=["de"],
+    )
+    i18n = InvenioI18N(app)
+    i18n.preload_translations(app, locales=["de", "da", "en"])
+    assert i18n.domain.cache.stats()["locales"] == ["de", "en"]
+    assert i18n.domain.cache.stats()["bytes"] > 1
+    assert i18n.domain.cache.evictions == 1
+
+    with app.test_request_context(headers=[("Accept-Language", "da")]):
+        assert gettext("Translate") == "Oversætte"
+    assert i18n.domain.cache.stats()["locales"] == ["de", "en"]
+
+
 def test_add_nonexisting_path():
     """Test add non-existing path."""
     d = MultidirDomain()
@@ -0,0 +1,164 @@
+# SPDX-FileCopyrightText: 2026 CERN.
+# SPDX-License-Identifier: MIT
+
+"""Formatting tests."""
+
+from datetime import date, datetime, time
+
+import flask_babel
+import pytest
+from babel import Locale
+from babel.dates import parse_pattern
+from babel.units import format_unit
+from flask import render_template_string
+from pytz import timezone
+
+from invenio_i18n import InvenioI18N, force_locale
+from invenio_i18n.formatting import (
+    PREDEFINED_FORMATS,
+    combine_datetime_pattern,
+    format_date,
+    format_datetime,
+    format_datetimes,
+    format_decimal,
+    format_filesize,
+    format_filesizes,
+    format_number,
+    format_numbers,
+    format_time,
+    get_date_pattern,
+)
+
+VALUES = [
+    datetime(2020, 3, 29, 0, 30),
+    timezone("UTC").localize(datetime(2021, 10, 31, 1, 15)),
+    date(2020, 1, 2),
+    1600000000,
+]
+
+
+@pytest.mark.parametrize("tz", ["UTC", "Europe/Zurich", "America/New_York"])
+@pytest.mark.parametrize("locale", ["en", "da", "de_AT", "os_RU", "ja", "ar_EG"])
+def test_same_as_flask_babel(app, locale, tz):
+    """Test that the output is the same as the one of Flask-Babel."""
+    app.config["BABEL_DEFAULT_TIMEZONE"] = tz
+    InvenioI18N(app)
+    with app.test_request_context(), force_locale(locale):
+        for format in [None, "short", "medium", "long", "full", "yyyy-MM-dd zzzz"]:
+            custom = format not in (None, *PREDEFINED_FORMATS)
+            for value in VALUES:
+                assert format_datetime(value, format) == (
+                    flask_babel.format_datetime(value, format)
+                )
+                assert format_datetime(value, format, rebase=False) == (
+                    flask_babel.format_datetime(value, format, rebase=False)
+                )
+                if custom:
+                    continue
+                if not isinstance(value, int):
+                    assert format_date(value, format) == (
+                        flask_babel.format_date(value, format)
+                    )
+                if type(value) is not date:
+                    assert format_time(value, format) == (
+                        flask_babel.format_time(value, format)
+                    )
+            if not custom:
+                assert format_time(time(12, 30), format) == (
+                    flask_babel.format_time(time(12, 30), format)
+                )
+        assert format_number(1234567.891) == flask_babel.format_number(1234567.891)
+        assert format_decimal(1.2345, "#.##") == (
+            flask_babel.format_decimal(1.2345, "#.##")
+        )
+
+
+def test_combine_datetime_pattern():
+    """Test combining patterns ending and starting with literals."""
+    pattern = combine_datetime_pattern(
+        "{1} 'at' {0}%", parse_pattern("d 'of' MMMM"), parse_pattern("'kl.' HH")
+    )
+    value = datetime(2020, 3, 29, 13, 30)
+    assert pattern.apply(value, "en") == "29 of March at kl. 13%"
+
+
+def test_pattern_cache(app):
+    """Test that patterns are compiled once per locale and format."""
+    app.config["BABEL_DEFAULT_TIMEZONE"] = "Europe/Zurich"
+    babel = InvenioI18N(app).babel
+    babel.date_formats["datetime.short"] = "dd.MM.yyyy HH:mm"
+    value = datetime(2020, 3, 29, 12, 30)
+
+    get_date_pattern.cache_clear()
+    with app.test_request_context():
+        assert format_datetime(value, "short") == "29.03.2020 14:30"
+        assert format_datetime(value) == "Mar 29, 2020, 2:30:00 PM"
+        assert format_datetime(value) == "Mar 29, 2020, 2:30:00 PM"
+        assert get_date_pattern.cache_info().misses == 2
+        assert get_date_pattern(Locale("en"), "datetime", "medium").pattern == (
+            "MMM d, y, h:mm:ss a"
+        )
+
+        tpl = "{{ dt|format_datetime }} {{ dt|format_date('short') }} {{ n|format_number }}"
+        assert render_template_string(tpl, dt=value, n=1234.5) == (
+            "Mar 29, 2020, 2:30:00 PM 3/29/20 1,234.5"
+        )
+        assert render_template_string("{{ dt|format_time('HH:mm') }}", dt=value) == (
+            "14:30"
+        )
+
+
+@pytest.mark.parametrize("locale", ["en", "da", "ru", "ar"])
+def test_batch_formatting(app, locale):
+    """Test formatting lists of values."""
+    app.config["BABEL_DEFAULT_TIMEZONE"] = "Europe/Zurich"
+    InvenioI18N(app)
+    with app.test_request_context(), force_locale(locale):
+        assert format_datetimes(VALUES, "short") == [
+            format_datetime(value, "short") for value in VALUES
+        ]
+        assert format_datetimes(VALUES, rebase=False) == [
+            format_datetime(value, rebase=False) for value in VALUES
+        ]
+        numbers = [0, 1.5, -1234567.891]
+        assert format_numbers(numbers) == [format_number(n) for n in numbers]
+        assert format_numbers(numbers, "#.#") == [
+            format_decimal(n, "#.#") for n in numbers
+        ]
+
+        sizes = [0, 1, 999, 1000, 1500, 21 * 10**6, 3 * 10**9, 10**19]
+        units = ["byte"] * 3 + ["kilobyte"] * 2 + ["megabyte", "gigabyte", "petabyte"]
+        values = [0, 1, 999, 1, 1.5, 21, 3, 10**4]
+        assert format_filesizes(sizes) == [
+            format_unit(value, f"digital-{unit}", "short", "#,##0.#", locale=locale)
+            for value, unit in zip(values, units)
+        ]
+        assert format_filesize(2000) == format_filesizes([2000])[0]
+        assert format_datetimes([]) == format_filesizes([]) == []
+
+
+def test_batch_filters(app):
+    """Test the batch template filters."""
+    InvenioI18N(app)
+    tpl = (
+        "{{ sizes|format_filesizes|join('|') }} {{ 1500|format_filesize }} "
+        "{{ numbers|format_numbers|join('|') }} {{ dates|format_datetimes|join('|') }}"
+    )
+    with app.test_request_context():
+        assert render_template_string(
+            tpl,
+            sizes=[12, 2 * 10**6],
+            numbers=[1234, 0.5],
+            dates=[datetime(2020, 1, 2, 3, 4)],
+        ) == ("12 byte|2 MB 1.5 kB 1,234|0.5 Jan 2, 2020, 3:04:00\u202fAM")
+
+
+def test_filesize_fallback(app):
+    """Test file sizes in locales without patterns for all plural forms."""
+    InvenioI18N(app)
+    with app.test_request_context(), force_locale("ar"):
+        assert format_filesize(1500, "long") == "1.5 كيلوبايت"
+
+    with app.test_request_context(), force_locale("en"):
+        assert format_filesize(1500, "long") == "1.5 kilobytes"
+        assert format_filesize(1000, "long") == "1 kilobyte"
@@ -0,0 +1,361 @@
+# SPDX-FileCopyrightText: 2026 CERN.
+# SPDX-License-Identifier: MIT
+
+"""Lookup instrumentation tests."""
+
+import json
+import os
+import subprocess
+import sys
+from os.path import dirname, join
+
+from babel.messages.pofile import read_po
+from click.testing import CliRunner
+from flask import g, render_template_string
+from flask_babel import gettext, ngettext, npgettext, pgettext
+
+from invenio_i18n import InvenioI18N
+from invenio_i18n.cli import i18n as i18n_cli
+from invenio_i18n.instrumentation import (
+    BoundedCounter,
+    aggregate_misses,
+    get_dump_path,
+    get_lookup_statistics,
+    get_miss_collector,
+    merge_dumps,
+    read_dump,
+    write_dump,
+)
+
+
+def test_bounded_counter():
+    """Test that new keys are dropped once the counter is full."""
+    counter = BoundedCounter(2)
+    for key in ["a", "b", "a", "c", "b", "a"]:
+        counter.add(key)
+    assert counter.most_common() == [("a", 3), ("b", 2)]
+    assert counter.most_common(1) == [("a", 3)]
+    assert counter.dropped == 1
+
+
+def test_miss_collector(app, tmp_path):
+    """Test collecting and reporting missing translations."""
+    app.config.update(
+        I18N_LANGUAGES=[("da", "Danish")],
+        I18N_TRANSLATIONS_PATHS=[join(dirname(__file__), "translations")],
+        I18N_MISSES_SAMPLE_RATE=1,
+        I18N_INSTRUMENTATION_DIRECTORY=str(tmp_path / "dumps"),
+    )
+    i18n = InvenioI18N(app, entry_point_group=None)
+    collector = get_miss_collector(app)
+    assert i18n.domain.instruments == (collector,)
+
+    with app.test_request_context(headers=[("Accept-Language", "da")]):
+        assert gettext("Translate") == "Oversætte"
+        assert gettext("Missing") == "Missing"
+        assert gettext("Missing %(x)s", x=1) == "Missing 1"
+        assert gettext("Missing") == "Missing"
+        assert ngettext("%(num)d file", "%(num)d files", 2) == "2 files"
+        assert pgettext("menu", "Open") == "Open"
+        assert npgettext("menu", "tab", "tabs", 1) == "tab"
+
+        # Lookups in templates.
+        tpl = (
+            "{{ _('Translate') }} {{ _('In template %(x)s', x=1) }} "
+            "{% trans count=2 %}{{ count }} row{% pluralize %}{{ count }} rows"
+            "{% endtrans %} {{ pgettext('menu', 'Open') }}"
+        )
+        assert render_template_string(tpl) == "Oversætte In template 1 2 rows Open"
+
+    # Misses in the default locale are not collected.
+    with app.test_request_context():
+        assert gettext("Missing") == "Missing"
+        assert render_template_string("{{ _('Missing') }}") == "Missing"
+
+    assert collector.counter.most_common() == [
+        (("da", None, "Missing", None), 2),
+        (("da", "menu", "Open", None), 2),
+        (("da", None, "Missing %(x)s", None), 1),
+        (("da", None, "%(num)d file", "%(num)d files"), 1),
+        (("da", "menu", "tab", "tabs"), 1),
+        (("da", None, "In template %(x)s", None), 1),
+        (("da", None, "%(count)s row", "%(count)s rows"), 1),
+    ]
+
+    # Other processes with a lower sample rate.
+    collector.flush()
+    collector.sample_rate = 0.5
+    collector.prefix = "misses-other"
+    collector.flush()
+    collector.sample_rate = 1
+    collector.prefix = "misses"
+
+    runner = CliRunner()
+    output = tmp_path / "report" / "missing.json"
+    result = runner.invoke(i18n_cli, ["missing-report", "-o", str(output)])
+    assert result.exit_code == 0, result.output
+    report = json.loads(output.read_text())
+    assert list(report) == ["da"]
+    assert report["da"][0] == {
+        "msgid": "Missing",
+        "msgid_plural": None,
+        "context": None,
+        "count": 4,
+        "estimated": 6,
+    }
+
+    output = tmp_path / "po"
+    result = runner.invoke(
+        i18n_cli, ["missing-report", "--format", "po", "-o", str(output), "-l", "da"]
+    )
+    assert result.exit_code == 0, result.output
+    with open(output / "da.po", "rb") as fp:
+        catalog = read_po(fp)
+    assert catalog.get("Missing").auto_comments == ["Estimated lookups: 6"]
+    assert catalog.get("tab", context="menu").id == ("tab", "tabs")
+
+
+def test_miss_collector_dumps(app, tmp_path):
+    """Test that dumps of finished processes are merged."""
+    directory = str(tmp_path / "dumps")
+    app.config.update(
+        I18N_MISSES_SAMPLE_RATE=1,
+        I18N_MISSES_IGNORED_LOCALES=[],
+        I18N_INSTRUMENTATION_DIRECTORY=directory,
+    )
+    InvenioI18N(app, entry_point_group=None)
+    collector = get_miss_collector(app)
+
+    # Empty counters are not written.
+    assert collector.flush() is None
+    assert not os.path.exists(get_dump_path(directory, "misses"))
+
+    with app.test_request_context():
+        gettext("Missing")
+    assert collector.flush() == get_dump_path(directory, "misses")
+
+    # A finished process with another sample rate.
+    process = subprocess.Popen([sys.executable, "-c", ""])
+    process.wait()
+    finished = write_dump(
+        directory,
+        "misses",
+        {
+            "sample_rate": 0.5,
+            "dropped": 1,
+            "entries": [["en", None, "Missing", None, 2]],
+        },
+        name=process.pid,
+    )
+    with app.test_request_context():
+        gettext("Other")
+    collector.flush()
+    assert not os.path.exists(finished)
+    merged = read_dump(get_dump_path(directory, "misses", "merged"))
+    assert merged == {
+        "sample_rate": None,
+        "dropped": 1,
+        "entries": [["en", None, "Missing", None, 2, 4.0]],
+    }
+    assert aggregate_misses([merged, collector.dump()])["en"][0] == {
+        "msgid": "Missing",
+        "msgid_plural": None,
+        "context": None,
+        "count": 3,
+        "estimated": 5,
+    }
+
+    # Merged dumps keep the most counted messages.
+    assert merge_dumps([merged, collector.dump()], maxsize=1) == {
+        "sample_rate": None,
+        "dropped": 2,
+        "entries": [["en", None, "Missing", None, 3, 5.0]],
+    }
+
+    # Counters written before being cleared are removed.
+    collector.clear()
+    assert collector.flush() is None
+    assert not os.path.exists(get_dump_path(directory, "misses"))
+
+    # The report command does not write a dump itself.
+    result = CliRunner().invoke(
+        i18n_cli, ["missing-report", "-o", str(tmp_path / "missing.json")]
+    )
+    assert result.exit_code == 0, result.output
+    assert [name for name in os.listdir(directory) if name.endswith(".json")] == [
+        os.path.basename(get_dump_path(directory, "misses", "merged"))
+    ]
+
+
+def test_miss_collector_flush_interval(app, tmp_path, monkeypatch):
+    """Test that lookups write the counters once per interval in a thread."""
+    app.config.update(
+        I18N_MISSES_SAMPLE_RATE=1,
+        I18N_MISSES_IGNORED_LOCALES=[],
+        I18N_INSTRUMENTATION_DIRECTORY=str(tmp_path),
+    )
+    InvenioI18N(app, entry_point_group=None)
+    collector = get_miss_collector(app)
+    started = []
+
+    class FakeThread:
+        def __init__(self, target, **kwargs):
+            self.target = target
+
+        def start(self):
+            started.append(self.target)
+
+    monkeypatch.setattr("invenio_i18n.instrumentation.Thread", FakeThread)
+    with app.test_request_context():
+        gettext("Missing")
+        assert started == []
+        collector._next_flush = 0
+        gettext("Missing")
+        gettext("Missing")
+    assert started == [collector.flush]
+
+
+def test_miss_collector_sampling(app, monkeypatch):
+    """Test that only sampled lookups are recorded."""
+    app.config.update(I18N_MISSES_SAMPLE_RATE=0.25, I18N_MISSES_IGNORED_LOCALES=[])
+    InvenioI18N(app, entry_point_group=None)
+    collector = get_miss_collector(app)
+
+    values = iter([0.5, 0.1])
+    monkeypatch.setattr(
+        "invenio_i18n.instrumentation.random.random", lambda: next(values)
+    )
+    with app.test_request_context():
+        gettext("First")
+        gettext("Second")
+    assert collector.counter.most_common() == [(("en", None, "Second", None), 1)]
+    assert aggregate_misses([collector.dump()]) == {
+        "en": [
+            {
+                "msgid": "Second",
+                "msgid_plural": None,
+                "context": None,
+                "count": 1,
+                "estimated": 4,
+            }
+        ]
+    }
+
+
+def test_miss_collector_disabled(app):
+    """Test that no instrument is installed by default."""
+    i18n = InvenioI18N(app)
+    assert i18n.domain.instruments == ()
+    assert get_miss_collector(app) is None
+
+    result = CliRunner().invoke(i18n_cli, ["missing-report", "-o", "report.json"])
+    assert "I18N_INSTRUMENTATION_DIRECTORY is not set" in result.output
+
+
+def test_lookup_statistics(app, tmp_path):
+    """Test counting translated lookups per message and per request."""
+    app.config.update(
+        I18N_LANGUAGES=[("da", "Danish")],
+        I18N_TRANSLATIONS_PATHS=[join(dirname(__file__), "translations")],
+        I18N_LOOKUPS_SAMPLE_RATE=1,
+        I18N_INSTRUMENTATION_DIRECTORY=str(tmp_path / "dumps"),
+    )
+    i18n = InvenioI18N(app, entry_point_group=None)
+    statistics = get_lookup_statistics(app)
+    assert i18n.domain.instruments == (statistics,)
+
+    @app.route("/page")
+    def page():
+        gettext("Translate")
+        gettext("Translate")
+        gettext("Missing")
+        return str(i18n.request_lookups)
+
+    @app.route("/template")
+    def template():
+        return render_template_string(
+            "{{ _('Translate') }} {{ _('Missing') }} {{ current_i18n.request_lookups }}"
+        )
+
+    @app.route("/empty")
+    def empty():
+        return ""
+
+    g.pop("_invenio_i18n_lookups", None)
+    with app.test_client() as client:
+        headers = [("Accept-Language", "da")]
+        assert client.get("/page", headers=headers).text == "3"
+        assert client.get("/page", headers=headers).text == "3"
+        assert client.get("/template", headers=headers).text == "Oversætte Missing 2"
+        client.get("/empty")
+        client.get("/not-found")
+
+    report = i18n.get_lookup_statistics()
+    assert report["locales"] == {
+        "da": [
+            {
+                "msgid": "Translate",
+                "msgid_plural": None,
+                "context": None,
+                "count": 5,
+                "estimated": 5,
+            }
+        ]
+    }
+    assert report["endpoints"] == {
+        "page": {"requests": 2, "lookups": 6, "max": 3, "average": 3.0},
+        "template": {"requests": 1, "lookups": 2, "max": 2, "average": 2.0},
+        "empty": {"requests": 1, "lookups": 0, "max": 0, "average": 0.0},
+        "<unmatched>": {"requests": 1, "lookups": 0, "max": 0, "average": 0.0},
+    }
+
+    statistics.flush()
+    output = tmp_path / "report" / "lookups.json"
+    result = CliRunner().invoke(
+        i18n_cli, ["lookup-report", "-o", str(output), "-n", "1", "-l", "da"]
+    )
+    assert result.exit_code == 0, result.output
+    assert json.loads(output.read_text()) == report
+
+    # Dumps of finished processes are merged.
+    process = subprocess.Popen([sys.executable, "-c", ""])
+    process.wait()
+    directory = str(tmp_path / "dumps")
+    finished = write_dump(
+        directory,
+        "lookups",
+        {
+            "sample_rate": 1,
+            "dropped": 0,
+            "entries": [],
+            "endpoints": {"page": [1, 5, 5]},
+        },
+        name=process.pid,
+    )
+    result = CliRunner().invoke(i18n_cli, ["lookup-report", "-o", str(output)])
+    assert result.exit_code == 0, result.output
+    assert not os.path.exists(finished)
+    assert json.loads(output.read_text())["endpoints"]["page"] == {
+        "requests": 3,
+        "lookups": 11,
+        "max": 5,
+        "average": 3.67,
+    }
+
+    statistics.clear()
+    assert i18n.get_lookup_statistics() == {"locales": {}, "endpoints": {}}
+    assert statistics.flush() is None
+
+    # Requests without lookups are written.
+    statistics.record_request("empty", 0)
+    assert statistics.flush() == get_dump_path(directory, "lookups")
+
+
+def test_lookup_statistics_disabled(app):
+    """Test that lookup statistics are disabled by default."""
+    i18n = InvenioI18N(app)
+    assert get_lookup_statistics(app) is None
+    assert i18n.get_lookup_statistics() is None
+    with app.test_request_context():
+        gettext("Translate")
+        assert i18n.request_lookups == 0
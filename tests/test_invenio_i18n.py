@@ -7,8 +7,9 @@
 from datetime import datetime
 from os.path import dirname, join
 
+import pytest
 from babel import Locale
-from flask import render_template_string
+from flask import Flask, render_template_string
 from flask_babel import (
     force_locale,
     format_datetime,
@@ -20,7 +21,14 @@ from flask_babel import (
 from invenio_assets import InvenioAssets
 from pytz import timezone
 
+from invenio_i18n.babel import get_translation_domain
 from invenio_i18n.ext import InvenioI18N, current_i18n
+from invenio_i18n.json import I18NJSONProvider
+from invenio_i18n.registry import (
+    _parse_display_name,
+    get_language_registry,
+    lookup_display_name,
+)
 
 
 def test_version():
@@ -80,8 +88,9 @@ def test_get_languages(app):
 def test_json_provider_class(app):
     """Test extension initalization."""
     InvenioI18N(app)
-    assert app.json_provider_class().encode("test") == '"test"'
-    assert app.json_provider_class().encode(lazy_gettext("test")) == '"test"'
+    assert app.json_provider_class is I18NJSONProvider
+    assert app.json.dumps("test") == '"test"'
+    assert app.json.dumps(lazy_gettext("test")) == '"test"'
 
 
 def test_timezone_selector(app):
@@ -136,6 +145,74 @@ def test_locale_selector(app):
         assert gettext("Translate") == "From test catalog"
 
 
+def test_preload_translations(app):
+    """Test preloading translations of the configured locales."""
+    app.config.update(
+        I18N_LANGUAGES=[("da", "Danish")],
+        I18N_TRANSLATIONS_PATHS=[join(dirname(__file__), "translations")],
+        I18N_PRELOAD_LOCALES=True,
+    )
+    i18n = InvenioI18N(app)
+    assert set(i18n.domain.cache) == {("en", "messages"), ("da", "messages")}
+    translations = i18n.domain.cache["da", "messages"]
+
+    with app.test_request_context(headers=[("Accept-Language", "da")]):
+        assert gettext("Translate") == "Oversætte"
+        assert i18n.domain.get_translations() is translations
+
+    i18n.domain.cache.clear()
+    i18n.preload_translations(app, locales=["da"])
+    assert set(i18n.domain.cache) == {("da", "messages")}
+
+
+def test_translation_domain_per_app(app, tmp_path):
+    """Test that apps sharing an extension have their own translations."""
+    test_translations = join(dirname(__file__), "translations")
+    app.config.update(
+        I18N_LANGUAGES=[("da", "Danish")],
+        I18N_TRANSLATIONS_PATHS=[test_translations],
+        I18N_PRELOAD_LOCALES=True,
+    )
+    other_app = Flask("otherapp")
+    other_app.config.update(
+        I18N_LANGUAGES=[("da", "Danish")],
+        I18N_CATALOG_BACKEND="mmap",
+        I18N_CATALOG_CACHE_SIZE=1,
+    )
+    babel_app = Flask("babelapp")
+    babel_app.config["BABEL_TRANSLATION_DIRECTORIES"] = f"{test_translations};x"
+
+    i18n = InvenioI18N()
+    i18n.init_app(app)
+    i18n.init_app(other_app)
+    i18n.init_app(babel_app)
+    i18n.init_app(app)
+
+    domain = get_translation_domain(app)
+    other_domain = get_translation_domain(other_app)
+    assert domain is not other_domain
+    directories = domain.translation_directories
+    assert directories.count(test_translations) == 1
+    assert len(set(directories)) == len(directories)
+    assert test_translations not in other_domain.translation_directories
+    assert set(domain.cache) == {("en", "messages"), ("da", "messages")}
+    assert other_domain.cache.maxsize == 1
+    assert (domain.catalog_backend, other_domain.catalog_backend) == ("gnu", "mmap")
+    assert get_translation_domain(babel_app).translation_directories == [
+        test_translations
+    ]
+
+    for application, expected in [
+        (app, "Oversætte"),
+        (other_app, "Translate"),
+        (babel_app, "Oversætte"),
+    ]:
+        with application.test_request_context(headers=[("Accept-Language", "da")]):
+            assert i18n.domain is get_translation_domain(application)
+            with force_locale("da"):
+                assert gettext("Translate") == expected
+
+
 def test_get_locales(app):
     """Test getting locales."""
     app.config["I18N_LANGUAGES"] = [("da", "Danish")]
@@ -145,6 +222,71 @@ def test_get_locales(app):
         assert [str(lang) for lang in i18n.get_locales()] == ["en", "da"]
 
 
+def test_language_registry(app):
+    """Test that apps sharing an extension have their own languages."""
+    app.config["I18N_LANGUAGES"] = [("da", "Danish")]
+    other_app = Flask("otherapp")
+    other_app.config.update(
+        I18N_LANGUAGES=[("de", "German")], BABEL_DEFAULT_LOCALE="da"
+    )
+    i18n = InvenioI18N()
+    i18n.init_app(app)
+    i18n.init_app(other_app)
+
+    with app.app_context():
+        registry = get_language_registry()
+        assert i18n.get_languages() == [("en", "English"), ("da", "Danish")]
+        assert [str(lang) for lang in i18n.get_locales()] == ["en", "da"]
+        # Display names are computed per display language on first use.
+        assert registry._display_names == {}
+        assert i18n.get_display_name("da") == "dansk"
+        assert registry._display_names == {"da": {"en": "engelsk", "da": "dansk"}}
+        assert i18n.get_display_name("da", "en") == "Danish"
+        assert i18n.get_display_name(Locale("en"), "da") == "engelsk"
+        assert i18n.get_display_name("de") is None
+        assert get_language_registry() is registry
+        with pytest.raises(AttributeError):
+            registry.locales = ()
+
+    with other_app.app_context():
+        assert i18n.get_languages() == [("da", "dansk"), ("de", "German")]
+        assert [str(lang) for lang in i18n.get_locales()] == ["da", "de"]
+        assert i18n.get_display_name("de", "da") == "tysk"
+
+    with app.app_context():
+        app.config["I18N_LANGUAGES"] = [("de", "German")]
+        assert get_language_registry() is not registry
+        assert i18n.get_languages() == [("en", "English"), ("de", "German")]
+
+
+def test_lookup_display_name(app, monkeypatch):
+    """Test looking up language names in the precomputed table."""
+    app.config["I18N_LANGUAGES"] = [("da", "Danish")]
+    InvenioI18N(app)
+
+    def parse(code, display_code):
+        raise AssertionError("Configured languages should not be parsed.")
+
+    with app.test_request_context():
+        with monkeypatch.context() as m:
+            m.setattr("invenio_i18n.registry._parse_display_name", parse)
+            assert lookup_display_name("da", "en") == "Danish"
+            with force_locale("da"):
+                assert render_template_string('{{"en"|language_name}}') == "engelsk"
+                assert render_template_string('{{"da"|language_name_local}}') == (
+                    "dansk"
+                )
+
+        # Other languages are computed once.
+        _parse_display_name.cache_clear()
+        assert render_template_string('{{"fr"|language_name}}') == "French"
+        assert render_template_string('{{"fr"|language_name}}') == "French"
+        assert render_template_string('{{"fr"|language_name_local}}') == "français"
+        assert _parse_display_name.cache_info().hits == 1
+
+    assert lookup_display_name("da", "de") == "Dänisch"
+
+
 def test_is_locale_available(app):
     """Test checking if provided locale is available."""
     app.config["I18N_LANGUAGES"] = [("da", "Danish")]
@@ -6,12 +6,28 @@
 
 from os.path import dirname, join
 
-from flask import session
-from flask_babel import gettext
+from flask import g, session
+from flask_babel import get_timezone as get_current_timezone
+from flask_babel import gettext, refresh
 from flask_login import LoginManager, login_user
 
 from invenio_i18n import InvenioI18N
-from invenio_i18n.selectors import get_locale
+from invenio_i18n.ext import current_i18n
+from invenio_i18n.persistence import store_timezone
+from invenio_i18n.selectors import (
+    QueryStringLocaleSelector,
+    get_accept_language_cache,
+    get_locale,
+    get_locale_selector,
+    get_timezone,
+)
+from invenio_i18n.signals import locale_selected
+from invenio_i18n.users import (
+    _MISSING,
+    UserAttributeResolver,
+    get_user_language_resolver,
+    get_user_timezone_resolver,
+)
 
 
 class FakeUser:
@@ -151,3 +167,286 @@ def test_get_locale_anonymous_user(app):
 
     with app.test_request_context():
         assert "en" == get_locale()
+
+
+def test_get_locale_headers_cache(app):
+    """Test caching of negotiated Accept-Language headers."""
+    app.config.update(
+        I18N_LANGUAGES=[("da", "Danish"), ("es", "Spanish")],
+        I18N_ACCEPT_LANGUAGE_CACHE_SIZE=2,
+    )
+    InvenioI18N(app)
+    cache = get_accept_language_cache(app)
+
+    for header, expected in [
+        ("da", "da"),
+        ("da", "da"),
+        ("es;q=0.5, da", "da"),
+        ("fr", "en"),
+        ("da", "da"),
+    ]:
+        with app.test_request_context(headers=[("Accept-Language", header)]):
+            assert get_locale() == expected
+
+    info = cache.cache_info()
+    assert (info.hits, info.misses, info.currsize) == (1, 4, 2)
+
+    # Changing the languages invalidates the cache.
+    app.config["I18N_LANGUAGES"] = [("es", "Spanish")]
+    with app.test_request_context(headers=[("Accept-Language", "fr")]):
+        assert get_locale() == "en"
+    with app.test_request_context(headers=[("Accept-Language", "da")]):
+        assert get_locale() == "en"
+    assert cache.cache_info().currsize == 2
+    assert cache.cache_info().hits == 1
+
+    cache.cache_clear()
+    assert cache.cache_info() == (0, 0, 2, 0)
+
+
+def test_get_locale_user_cache(app):
+    """Test caching of the user language."""
+    app.config.update(
+        I18N_LANGUAGES=[("da", "Danish"), ("es", "Spanish")],
+        I18N_USER_LANG_CACHE_TTL=300,
+        SECRET_KEY="secret key",
+    )
+    users = {"1": FakeUser("da")}
+    loaded = []
+
+    def load_user(user_id):
+        loaded.append(user_id)
+        return users.get(user_id)
+
+    login_manager = LoginManager()
+    login_manager.init_app(app)
+    login_manager.user_loader(load_user)
+    InvenioI18N(app)
+
+    @app.route("/")
+    def index():
+        return get_locale()
+
+    def get(client):
+        # The application context (and ``g``) is shared by all requests of a
+        # test, so drop the user loaded by a previous request.
+        g.pop("_login_user", None)
+        return client.get("/").get_data(as_text=True)
+
+    with app.test_client() as client:
+        # Anonymous requests never load a user.
+        assert get(client) == "en"
+        assert loaded == []
+
+        with client.session_transaction() as sess:
+            sess["_user_id"] = "1"
+
+        assert get(client) == "da"
+        assert get(client) == "da"
+        assert loaded == ["1"]
+
+        # Changes are picked up after invalidation.
+        users["1"] = FakeUser("es")
+        assert get(client) == "da"
+        current_i18n.invalidate_user_language(users["1"])
+        assert get(client) == "es"
+        assert loaded == ["1", "1"]
+
+        # Users are keyed by ``get_id()``.
+        users["1"] = FakeUser("da")
+        current_i18n.invalidate_user_language("1")
+        assert get(client) == "da"
+        assert loaded == ["1", "1", "1"]
+
+
+def test_get_locale_user_no_cache(app):
+    """Test that the user language and timezone are not cached by default."""
+    app.config.update(I18N_LANGUAGES=[("da", "Danish")], SECRET_KEY="secret key")
+    user = FakeUser("da")
+    user.timezone = "Asia/Tokyo"
+    loaded = []
+
+    def load_user(user_id):
+        loaded.append(user_id)
+        return user
+
+    login_manager = LoginManager()
+    login_manager.init_app(app)
+    login_manager.user_loader(load_user)
+    InvenioI18N(app)
+
+    @app.route("/")
+    def index():
+        return f"{get_locale()} {get_timezone()}"
+
+    with app.test_client() as client:
+        with client.session_transaction() as sess:
+            sess["_user_id"] = "1"
+        for _ in range(2):
+            for key in ["_login_user", "_flask_babel"]:
+                g.pop(key, None)
+            assert client.get("/").get_data(as_text=True) == "da Asia/Tokyo"
+        assert loaded == ["1", "1"]
+    assert not get_user_language_resolver(app)._entries
+    assert not get_user_timezone_resolver(app)._entries
+
+
+def test_get_timezone(app):
+    """Test getting the timezone from the request and the session."""
+    app.config["BABEL_DEFAULT_TIMEZONE"] = "Europe/Zurich"
+    app.secret_key = "secret key"
+    InvenioI18N(app)
+
+    with app.test_request_context():
+        assert str(get_timezone()) == "Europe/Zurich"
+        session["timezone"] = "Asia/Tokyo"
+        assert get_timezone().zone == "Asia/Tokyo"
+        assert get_current_timezone().zone == "Asia/Tokyo"
+
+    with app.test_request_context("/?tz=america/new_york"):
+        session["timezone"] = "Asia/Tokyo"
+        assert get_timezone().zone == "America/New_York"
+
+    # Unknown names are ignored.
+    with app.test_request_context("/?tz=Nowhere/Atlantis"):
+        session["timezone"] = "Nowhere/Atlantis"
+        assert str(get_timezone()) == "Europe/Zurich"
+
+    app.config["I18N_TIMEZONE_QUERY_ARG"] = None
+    with app.test_request_context("/?tz=Asia/Tokyo"):
+        assert str(get_timezone()) == "Europe/Zurich"
+
+    # Outside of requests the default is used.
+    with app.app_context():
+        assert str(get_timezone()) == "Europe/Zurich"
+
+
+def test_get_timezone_cookie(app):
+    """Test getting the timezone from the timezone cookie."""
+    app.config.update(I18N_LANGUAGE_STORAGE="cookie", SECRET_KEY="secret key")
+    InvenioI18N(app)
+
+    @app.route("/")
+    def index():
+        return str(get_timezone())
+
+    @app.route("/set")
+    def set_timezone():
+        return store_timezone(app.response_class("ok"), "Asia/Tokyo")
+
+    with app.test_client() as client:
+        refresh()
+        assert client.get("/").get_data(as_text=True) == "UTC"
+        client.get("/set")
+        assert client.get_cookie("timezone").value.startswith("Asia/Tokyo.")
+        assert client.get("/").get_data(as_text=True) == "Asia/Tokyo"
+
+        # Tampered cookies are ignored.
+        client.set_cookie("timezone", "Asia/Tokyo.invalid")
+        assert client.get("/").get_data(as_text=True) == "UTC"
+
+
+def test_get_timezone_user_cache(app):
+    """Test caching of the user timezone."""
+    app.config.update(I18N_USER_TIMEZONE_CACHE_TTL=300, SECRET_KEY="secret key")
+    users = {"1": FakeUser("en")}
+    users["1"].timezone = "Asia/Tokyo"
+    loaded = []
+
+    def load_user(user_id):
+        loaded.append(user_id)
+        return users.get(user_id)
+
+    login_manager = LoginManager()
+    login_manager.init_app(app)
+    login_manager.user_loader(load_user)
+    InvenioI18N(app)
+
+    @app.route("/")
+    def index():
+        return str(get_timezone())
+
+    def get(client):
+        g.pop("_login_user", None)
+        return client.get("/").get_data(as_text=True)
+
+    with app.test_client() as client:
+        # Anonymous requests never load a user.
+        assert get(client) == "UTC"
+        assert loaded == []
+
+        with client.session_transaction() as sess:
+            sess["_user_id"] = "1"
+
+        assert get(client) == "Asia/Tokyo"
+        assert get(client) == "Asia/Tokyo"
+        assert loaded == ["1"]
+
+        # Changes are picked up after invalidation.
+        users["1"].timezone = "America/New_York"
+        assert get(client) == "Asia/Tokyo"
+        current_i18n.invalidate_user_timezone(users["1"])
+        assert get(client) == "America/New_York"
+        assert loaded == ["1", "1"]
+
+
+def test_user_attribute_resolver_ttl(app, monkeypatch):
+    """Test expiration of cached user attributes."""
+    app.secret_key = "secret key"
+    LoginManager().init_app(app)
+    resolver = UserAttributeResolver("prefered_language", ttl=10, maxsize=1)
+
+    now = [100]
+    monkeypatch.setattr("invenio_i18n.users.monotonic", lambda: now[0])
+
+    with app.test_request_context():
+        login_user(FakeUser("da"))
+        assert resolver() == "da"
+    assert resolver._get("1") == "da"
+    now[0] = 111
+    assert resolver._get("1") is _MISSING
+
+
+def test_locale_selector_pipeline(app):
+    """Test configuring the selector stages and reading their statistics."""
+    app.config.update(
+        I18N_LANGUAGES=[("da", "Danish"), ("es", "Spanish")],
+        I18N_LOCALE_SELECTORS=[
+            QueryStringLocaleSelector,
+            "invenio_i18n.selectors:HeaderLocaleSelector",
+        ],
+    )
+    InvenioI18N(app)
+    pipeline = get_locale_selector(app)
+    assert [s.name for s in pipeline.stages] == ["querystring", "headers"]
+
+    received = []
+
+    def receiver(sender, **kwargs):
+        received.append(kwargs)
+
+    with locale_selected.connected_to(receiver, sender=app):
+        with app.test_request_context("/?ln=da"):
+            assert get_locale() == "da"
+        with app.test_request_context(headers=[("Accept-Language", "es")]):
+            assert get_locale() == "es"
+        with app.test_request_context():
+            assert get_locale() == "en"
+
+    assert [(r["locale"], r["stage"]) for r in received] == [
+        ("da", "querystring"),
+        ("es", "headers"),
+        ("en", "default"),
+    ]
+    assert [name for name, _ in received[1]["timings"]] == ["querystring", "headers"]
+
+    stats = pipeline.stats()
+    assert stats["querystring"]["calls"] == 3
+    assert stats["querystring"]["decisions"] == 1
+    assert stats["headers"]["calls"] == 2
+    assert stats["headers"]["decisions"] == 1
+    assert stats["default"]["decisions"] == 1
+    assert stats["headers"]["time"] > 0
+
+    pipeline.reset_stats()
+    assert pipeline.stats()["querystring"]["calls"] == 0
@@ -0,0 +1,102 @@
+# SPDX-FileCopyrightText: 2026 CERN.
+# SPDX-License-Identifier: MIT
+
+"""JSON provider tests."""
+
+import json
+from datetime import datetime
+from os.path import dirname, join
+
+import pytest
+from flask import jsonify
+from flask.json.provider import DefaultJSONProvider
+from flask_babel import LazyString, force_locale, lazy_gettext
+
+from invenio_i18n import InvenioI18N
+from invenio_i18n.json import I18NJSONProvider
+
+
+def test_lazy_strings(app):
+    """Test that lazy strings are resolved once per document."""
+    app.config.update(
+        I18N_LANGUAGES=[("da", "Danish")],
+        I18N_TRANSLATIONS_PATHS=[join(dirname(__file__), "translations")],
+    )
+    InvenioI18N(app, entry_point_group=None)
+    calls = []
+
+    def translate(string, **variables):
+        calls.append(string)
+        return lazy_gettext(string, **variables)
+
+    label = LazyString(translate, "Translate")
+    labels = [LazyString(translate, "Translate") for _ in range(3)]
+    with app.test_request_context():
+        with force_locale("da"):
+            data = {"a": label, "b": labels, "c": lazy_gettext("Translate")}
+            assert json.loads(app.json.dumps(data)) == {
+                "a": "Oversætte",
+                "b": ["Oversætte"] * 3,
+                "c": "Oversætte",
+            }
+            assert calls == ["Translate"]
+            assert app.json.dumps(LazyString(translate, "Translate", x=[])) == (
+                '"Overs\\u00e6tte"'
+            )
+
+        # The next document resolves it again in the current locale.
+        assert jsonify([label]).get_json() == ["From test catalog"]
+        assert len(calls) == 3
+
+
+def test_lazy_string_argument_types(app):
+    """Test that equal arguments of different types are not mixed up."""
+    InvenioI18N(app)
+    with app.test_request_context():
+        data = [
+            lazy_gettext("%(n)s", n=1),
+            lazy_gettext("%(n)s", n=True),
+            lazy_gettext("%(n)s", n=1.0),
+        ]
+        assert json.loads(app.json.dumps(data)) == ["1", "True", "1.0"]
+
+
+def test_custom_provider(app):
+    """Test that a custom JSON provider of the application is kept."""
+
+    class CustomJSONProvider(DefaultJSONProvider):
+        pass
+
+    app.json_provider_class = CustomJSONProvider
+    app.json = CustomJSONProvider(app)
+    InvenioI18N(app)
+    assert app.json_provider_class is CustomJSONProvider
+    assert type(app.json) is CustomJSONProvider
+
+
+def test_orjson_backend(app):
+    """Test serializing with orjson."""
+    orjson = pytest.importorskip("orjson")
+    app.config["I18N_JSON_BACKEND"] = "orjson"
+    InvenioI18N(app)
+    provider = app.json
+    assert isinstance(provider, I18NJSONProvider)
+    assert provider.use_orjson
+
+    data = {"b": lazy_gettext("Translate"), "a": datetime(2020, 1, 2, 3, 4, 5)}
+    with app.test_request_context():
+        assert provider.dumps(data) == (
+            orjson.dumps(
+                {"a": "Thu, 02 Jan 2020 03:04:05 GMT", "b": "Translate"}
+            ).decode()
+        )
+        assert provider.dumps(["æ"]) == '["æ"]'
+        assert provider.dumps([1], indent=2) == "[\n  1\n]"
+        assert provider.response({"a": 1}).get_data(as_text=True) == '{"a":1}\n'
+
+        # Unsupported by orjson.
+        assert provider.dumps({1: 2}, sort_keys=False) == '{"1": 2}'
+        assert provider.dumps([1], indent=4) == "[\n    1\n]"
+        assert provider.dumps([2**70]) == f"[{2**70}]"
+        with pytest.raises(TypeError):
+            provider.dumps(object())
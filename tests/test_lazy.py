@@ -0,0 +1,116 @@
+# SPDX-FileCopyrightText: 2026 CERN.
+# SPDX-License-Identifier: MIT
+
+"""Lazy string tests."""
+
+import gc
+import weakref
+from os.path import dirname, join
+
+from flask import g
+from flask_babel import LazyString, force_locale, get_domain, gettext
+
+from invenio_i18n import InvenioI18N, lazy_gettext
+from invenio_i18n.lazy import CachedLazyString, lazy_ngettext
+
+
+def test_lazy_string_memo(app):
+    """Test that lazy strings are resolved once per locale."""
+    app.config.update(
+        I18N_LANGUAGES=[("da", "Danish")],
+        I18N_TRANSLATIONS_PATHS=[join(dirname(__file__), "translations")],
+    )
+    i18n = InvenioI18N(app, entry_point_group=None)
+    calls = []
+
+    def translate(string, **variables):
+        calls.append(string)
+        return gettext(string, **variables)
+
+    label = CachedLazyString(translate, "Translate")
+    other = CachedLazyString(translate, "Translate")
+    assert isinstance(label, LazyString)
+    with app.test_request_context():
+        assert get_domain() is i18n.domain
+        assert str(label) == str(other) == "From test catalog"
+        with force_locale("da"):
+            assert str(label) == str(other) == "Oversætte"
+        assert calls == ["Translate", "Translate"]
+        assert len(i18n.domain.resolved) == 2
+
+        assert str(lazy_gettext("Translate")) == "From test catalog"
+        assert str(lazy_ngettext("%(num)d file", "%(num)d files", 2)) == "2 files"
+        assert str(CachedLazyString(translate, "Translate", x=[])) == (
+            "From test catalog"
+        )
+        assert len(calls) == 3
+
+        assert {key[0] for key in i18n.domain.resolved} == {"en", "da"}
+
+        i18n.reload_translations(["en"])
+        assert {key[0] for key in i18n.domain.resolved} == {"da"}
+        assert str(label) == "From test catalog"
+        assert len(calls) == 4
+
+
+def test_lazy_string_memo_eviction(app):
+    """Test that memoized strings do not outlive their translations."""
+    app.config.update(
+        I18N_LANGUAGES=[("da", "Danish"), ("de", "German")],
+        I18N_TRANSLATIONS_PATHS=[join(dirname(__file__), "translations")],
+        I18N_CATALOG_CACHE_SIZE=1,
+        I18N_LAZY_STRING_CACHE_SIZE=2,
+    )
+    i18n = InvenioI18N(app, entry_point_group=None)
+    with app.test_request_context(), force_locale("da"):
+        assert str(lazy_gettext("Translate")) == "Oversætte"
+        translations = weakref.ref(i18n.domain.get_translations())
+    assert [key[0] for key in i18n.domain.resolved] == ["da"]
+
+    with app.test_request_context(), force_locale("de"):
+        g.pop("_invenio_i18n_translations", None)
+        assert str(lazy_gettext("Translate")) == "Translate"
+    # The catalog of "da" was evicted, its strings are dropped.
+    assert [key[0] for key in i18n.domain.resolved] == ["de"]
+    g.pop("_invenio_i18n_translations", None)
+    gc.collect()
+    assert translations() is None
+
+    # Least recently used strings are dropped.
+    with app.test_request_context():
+        for msgid in ["Translate", "First", "Translate", "Second"]:
+            str(lazy_gettext(msgid))
+    assert [key[2] for key in i18n.domain.resolved] == [
+        ((str, "Translate"),),
+        ((str, "Second"),),
+    ]
+
+
+def test_lazy_string_memo_argument_types(app):
+    """Test that equal arguments of different types are not mixed up."""
+    i18n = InvenioI18N(app)
+    with app.test_request_context():
+        assert str(lazy_gettext("%(n)s items", n=1)) == "1 items"
+        assert str(lazy_gettext("%(n)s items", n=True)) == "True items"
+        assert str(lazy_gettext("%(n)s items", n=1.0)) == "1.0 items"
+        assert str(lazy_gettext("%(n)s items", n=1)) == "1 items"
+        assert len(i18n.domain.resolved) == 3
+
+
+def test_lazy_string_memo_disabled(app):
+    """Test resolving lazy strings without memo."""
+    app.config["I18N_LAZY_STRING_CACHE_SIZE"] = 1
+    i18n = InvenioI18N(app)
+    with app.test_request_context():
+        assert str(lazy_gettext("Translate")) == "Translate"
+        assert str(lazy_gettext("Other")) == "Other"
+        assert len(i18n.domain.resolved) == 1
+
+    # Outside of an application context.
+    assert str(lazy_gettext("Translate")) == "Translate"
+
+    app.config["I18N_LAZY_STRING_CACHE_SIZE"] = 0
+    i18n = InvenioI18N(app)
+    with app.test_request_context():
+        assert str(lazy_gettext("Translate")) == "Translate"
+        assert i18n.domain.resolved == {}
@@ -0,0 +1,161 @@
+# SPDX-FileCopyrightText: 2026 CERN.
+# SPDX-License-Identifier: MIT
+
+"""Memory-mapped catalog tests."""
+
+import struct
+
+import pytest
+from babel.messages.catalog import Catalog
+from babel.messages.mofile import write_mo
+from babel.support import Translations
+
+from invenio_i18n.babel import MultidirDomain
+from invenio_i18n.mofile import MmapCatalog, hashpjw, load_mmap_translations
+
+# Hashes of the message ids computed with ``hash_string`` of GNU gettext
+# (gettext-runtime/intl/hash-string.c), which ``msgfmt`` uses to build the
+# hash table of a catalog.
+GNU_HASHES = {
+    b"": 0,
+    b"Search": 94079128,
+    b"Zebra": 6338945,
+    b"Open": 353982,
+    b"state\x04Open": 174115902,
+    b"%(num)d record": 147880852,
+    b"upload\x04file": 121027957,
+    "Ünïcode".encode(): 182806677,
+    b"Missing": 67805207,
+    b"An unusually long message id": 42668036,
+}
+
+
+def write_catalog(path, messages, locale="de"):
+    """Write a compiled catalog with ``(msgid, string, context)`` messages."""
+    catalog = Catalog(locale=locale)
+    for msgid, string, context in messages:
+        catalog.add(msgid, string, context=context)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "wb") as fp:
+        write_mo(fp, catalog)
+    return str(path)
+
+
+def add_hash_table(filename, size=13):
+    """Rewrite a catalog with a hash table like GNU ``msgfmt`` does."""
+    with open(filename, "rb") as fp:
+        data = fp.read()
+    count, originals, translations = struct.unpack_from("<3I", data, 8)
+    tables = []
+    for table in (originals, translations):
+        tables.append(list(struct.unpack_from(f"<{2 * count}I", data, table)))
+
+    slots = [0] * size
+    for index in range(count):
+        length, offset = tables[0][2 * index : 2 * index + 2]
+        key = data[offset : offset + length].partition(b"\0")[0]
+        hval = GNU_HASHES[key]
+        slot, increment = hval % size, 1 + hval % (size - 2)
+        while slots[slot]:
+            slot = (slot + increment) % size
+        slots[slot] = index + 1
+
+    for table in tables:
+        table[1::2] = [offset + 4 * size for offset in table[1::2]]
+    hash_offset = 28 + 16 * count
+    header = (0x950412DE, 0, count, 28, 28 + 8 * count, size, hash_offset)
+    with open(filename, "wb") as fp:
+        fp.write(struct.pack("<7I", *header))
+        fp.write(struct.pack(f"<{4 * count}I", *tables[0], *tables[1]))
+        fp.write(struct.pack(f"<{size}I", *slots))
+        fp.write(data[hash_offset:])
+
+
+MESSAGES = [
+    ("Search", "Suche", None),
+    ("Zebra", "Zebra", None),
+    ("Open", "Öffnen", None),
+    ("Open", "Offen", "state"),
+    (
+        ("%(num)d record", "%(num)d records"),
+        ("%(num)d Datensatz", "%(num)d Sätze"),
+        None,
+    ),
+    (("file", "files"), ("Datei", "Dateien"), "upload"),
+    ("Ünïcode", "Unicode", None),
+]
+
+
+def test_hashpjw():
+    """Test that message ids hash like in GNU gettext."""
+    for key, hval in GNU_HASHES.items():
+        assert hashpjw(key) == hval
+
+
+@pytest.mark.parametrize("hashed", [False, True])
+def test_mmap_catalog(tmp_path, hashed):
+    """Test that lookups match the decoded catalog."""
+    filename = write_catalog(tmp_path / "messages.mo", MESSAGES)
+    if hashed:
+        add_hash_table(filename)
+
+    with open(filename, "rb") as fp:
+        expected = Translations(fp)
+    translations = load_mmap_translations([filename])
+    catalog = translations._catalog
+    assert isinstance(catalog, MmapCatalog)
+    assert bool(catalog._hash_size) == hashed
+    assert catalog.charset == "utf-8"
+
+    assert dict(catalog) == expected._catalog
+    for msgid in ["Search", "Zebra", "Open", "Ünïcode", "Missing", "", "file"]:
+        assert translations.gettext(msgid) == expected.gettext(msgid)
+    for n in [1, 2, 5]:
+        args = ("%(num)d record", "%(num)d records", n)
+        assert translations.ngettext(*args) == expected.ngettext(*args)
+        args = ("upload", "file", "files", n)
+        assert translations.npgettext(*args) == expected.npgettext(*args)
+    assert translations.pgettext("state", "Open") == "Offen"
+    assert translations.pgettext("other", "Open") == "Open"
+    assert "Open" in catalog
+    assert ("Open", 0) not in catalog
+    assert ("%(num)d record", 2) not in catalog
+    assert catalog.get(42) is None
+    catalog.close()
+
+
+def test_mmap_translations_merge(tmp_path):
+    """Test that later catalogs override earlier ones."""
+    first = write_catalog(
+        tmp_path / "first" / "de" / "LC_MESSAGES" / "messages.mo",
+        [("Search", "Suche", None), ("Open", "Öffnen", None)],
+    )
+    write_catalog(
+        tmp_path / "second" / "de" / "LC_MESSAGES" / "messages.mo",
+        [("Search", "Finden", None)],
+    )
+
+    assert load_mmap_translations([]).gettext("Search") == "Search"
+    assert load_mmap_translations([first]).gettext("Search") == "Suche"
+
+    paths = [str(tmp_path / "first"), str(tmp_path / "second")]
+    gnu = MultidirDomain(paths=paths)
+    domain = MultidirDomain(paths=paths, catalog_backend="mmap")
+    for locale in ["de", "de_AT", "fr"]:
+        expected = gnu.load_translations(locale)
+        translations = domain.load_translations(locale)
+        for msgid in ["Search", "Open", "Missing"]:
+            assert translations.gettext(msgid) == expected.gettext(msgid)
+    assert domain.load_translations("de").gettext("Search") == "Finden"
+    assert domain.load_translations("de").files == [
+        str(tmp_path / d / "de" / "LC_MESSAGES" / "messages.mo")
+        for d in ["first", "second"]
+    ]
+
+
+def test_mmap_catalog_invalid(tmp_path):
+    """Test that invalid files are rejected."""
+    path = tmp_path / "messages.mo"
+    path.write_bytes(b"\0" * 28)
+    with pytest.raises(OSError):
+        MmapCatalog(str(path))
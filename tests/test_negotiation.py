@@ -0,0 +1,157 @@
+# SPDX-FileCopyrightText: 2026 CERN.
+# SPDX-License-Identifier: MIT
+
+"""Locale negotiation index tests."""
+
+import pytest
+from babel import Locale
+from flask import session
+from werkzeug.datastructures import LanguageAccept
+
+from invenio_i18n import InvenioI18N
+from invenio_i18n.negotiation import (
+    LocaleIndex,
+    _parse_locale_identifier,
+    parse_locale_identifier,
+)
+from invenio_i18n.registry import get_locale_index
+from invenio_i18n.selectors import get_locale
+
+
+def test_locale_index():
+    """Test lookup tables of the index."""
+    index = LocaleIndex("en", [("da", "Danish"), ("pt_BR", "Portuguese"), "de"])
+
+    assert index.codes == frozenset(["en", "da", "pt_BR", "de"])
+    assert index.ordered == ("en", "da", "pt_BR", "de")
+    assert index.lookup("da") == "da"
+    assert index.lookup("pt-br") == "pt_BR"
+    assert index.lookup("PT_BR") == "pt_BR"
+    assert index.lookup("es") is None
+    assert index.lookup(None) is None
+    assert index.lookup(["da"]) is None
+    assert index.fallbacks["pt"] == "pt_BR"
+
+    with pytest.raises(AttributeError):
+        index.codes = frozenset()
+
+
+def test_locale_index_negotiate():
+    """Test Accept-Language negotiation."""
+    index = LocaleIndex("en", [("da", "Danish"), ("pt_BR", "Portuguese")])
+
+    def negotiate(header):
+        return index.negotiate(LanguageAccept(header))
+
+    assert negotiate([("da", 1)]) == "da"
+    assert negotiate([("es", 1), ("da", 0.5)]) == "da"
+    assert negotiate([("pt-BR", 1)]) == "pt_BR"
+    assert negotiate([("pt-PT", 1)]) == "pt_BR"
+    assert negotiate([("da-DK", 1), ("en", 0.5)]) == "da"
+    assert negotiate([("zh-CN", 1), ("en", 0.5)]) == "en"
+    assert negotiate([("da-DK", 1)]) == "da"
+    assert negotiate([("es", 1), ("*", 0.1)]) == "en"
+    assert negotiate([("da", 0)]) is None
+    assert negotiate([]) is None
+
+
+def test_get_locale_index(app):
+    """Test that the index is rebuilt when I18N_LANGUAGES is replaced."""
+    app.config["I18N_LANGUAGES"] = [("da", "Danish")]
+    InvenioI18N(app)
+
+    with app.app_context():
+        index = get_locale_index()
+        assert index.codes == frozenset(["en", "da"])
+        assert get_locale_index() is index
+
+        app.config["I18N_LANGUAGES"] = [("de", "German")]
+        assert get_locale_index().codes == frozenset(["en", "de"])
+
+
+def test_get_locale_aliases(app):
+    """Test that differently spelled codes select the configured locale."""
+    app.config["I18N_LANGUAGES"] = [("da", "Danish"), ("pt_BR", "Portuguese")]
+    app.secret_key = "secret key"
+    InvenioI18N(app)
+
+    with app.test_request_context("/?ln=pt-br"):
+        assert get_locale() == "pt_BR"
+
+    with app.test_request_context():
+        session["language"] = "pt_br"
+        assert get_locale() == "pt_BR"
+
+
+def test_locale_index_match():
+    """Test matching regional and script variants."""
+    index = LocaleIndex(
+        "en", [("de", "German"), ("zh_Hant", "Chinese"), ("sr_Latn", "Serbian")]
+    )
+
+    assert index.match("de") == "de"
+    assert index.match("de-AT") == "de"
+    assert index.match("de_ch") == "de"
+    assert index.match("en-GB") == "en"
+    assert index.match("zh-TW") == "zh_Hant"
+    assert index.match("zh-Hant-HK") == "zh_Hant"
+    # Script mismatches are rejected.
+    assert index.match("zh-CN") is None
+    assert index.match("sr") is None
+    assert index.match("sr-Latn-RS") == "sr_Latn"
+    # Tags unknown to CLDR fall back to the primary language.
+    assert index.match("de-CH-1996") == "de"
+    assert index.match("xx") is None
+    assert index.match(None) is None
+
+
+def test_get_locale_match(app):
+    """Test selecting regional variants from the query string and headers."""
+    app.config["I18N_LANGUAGES"] = [("de", "German"), ("zh_Hant", "Chinese")]
+    i18n = InvenioI18N(app)
+
+    with app.test_request_context("/?ln=de-AT"):
+        assert get_locale() == "de"
+    with app.test_request_context(headers=[("Accept-Language", "zh-TW, de;q=0.5")]):
+        assert get_locale() == "zh_Hant"
+    with app.test_request_context(headers=[("Accept-Language", "zh-CN, de;q=0.5")]):
+        assert get_locale() == "de"
+
+    with app.app_context():
+        assert not i18n.is_locale_available("de_AT")
+        assert i18n.is_locale_available("de_AT", fallback=True)
+        assert not i18n.is_locale_available("fr_FR", fallback=True)
+
+
+def test_parse_locale_identifier(monkeypatch):
+    """Test memoized parsing of locale identifiers."""
+    _parse_locale_identifier.cache_clear()
+    assert parse_locale_identifier("de_at") == "de_AT"
+    assert parse_locale_identifier("EN") == "en"
+    assert parse_locale_identifier("zh_Hant_TW") == "zh_Hant_TW"
+    assert parse_locale_identifier("xx") is None
+    assert _parse_locale_identifier.cache_info().currsize == 4
+    # Invalid syntax is rejected without consulting CLDR and is not cached.
+    for value in ["", "en-US", "no_loc-ale", "x" * 100_000, "<script>", "de_AT_", 1]:
+        assert parse_locale_identifier(value) is None
+    assert _parse_locale_identifier.cache_info().currsize == 4
+
+    # Negative results are memoized too.
+    monkeypatch.setattr("invenio_i18n.negotiation.Locale.parse", None)
+    assert parse_locale_identifier("de_at") == "de_AT"
+    assert parse_locale_identifier("xx") is None
+
+
+def test_is_locale_available_junk(app):
+    """Test that junk input is rejected without raising."""
+    app.config["I18N_LANGUAGES"] = [("de", "German")]
+    i18n = InvenioI18N(app)
+
+    with app.app_context():
+        assert i18n.is_locale_available("de")
+        assert i18n.is_locale_available("DE")
+        assert i18n.is_locale_available(Locale("de"))
+        _parse_locale_identifier.cache_clear()
+        for value in ["", "de-DE", "en-US", "\x00", "de" * 1000, b"de"]:
+            assert not i18n.is_locale_available(value)
+        assert _parse_locale_identifier.cache_info().currsize == 0
@@ -0,0 +1,115 @@
+# SPDX-FileCopyrightText: 2026 CERN.
+# SPDX-License-Identifier: MIT
+
+"""Catalog reloading tests."""
+
+import os
+import threading
+
+from babel.messages.catalog import Catalog
+from babel.messages.mofile import write_mo
+from click.testing import CliRunner
+from flask import g
+from flask_babel import gettext
+
+from invenio_i18n import InvenioI18N
+from invenio_i18n.babel import MultidirDomain
+from invenio_i18n.cli import i18n as i18n_cli
+from invenio_i18n.reload import CatalogReloader, get_catalog_reloader
+
+
+def write_catalog(dirname, locale, messages, mtime):
+    """Replace a compiled catalog and set its modification time."""
+    catalog = Catalog(locale=locale)
+    for msgid, string in messages.items():
+        catalog.add(msgid, string)
+    path = dirname / locale / "LC_MESSAGES"
+    path.mkdir(parents=True, exist_ok=True)
+    with open(path / "messages.tmp", "wb") as fp:
+        write_mo(fp, catalog)
+    os.utime(path / "messages.tmp", ns=(mtime, mtime))
+    os.replace(path / "messages.tmp", path / "messages.mo")
+
+
+def test_reload_changed(tmp_path):
+    """Test reloading modified, added and removed catalogs."""
+    first, second = tmp_path / "first", tmp_path / "second"
+    second.mkdir()
+    write_catalog(first, "da", {"Search": "Søg"}, 1)
+    write_catalog(first, "de", {"Search": "Suche"}, 1)
+    domain = MultidirDomain(paths=[str(first), str(second)])
+    domain.preload(["da", "de"])
+    translations = domain.load_translations("da")
+    assert domain.reload_changed() == []
+
+    write_catalog(first, "da", {"Search": "Find"}, 2)
+    assert domain.reload_changed() == ["da"]
+    assert translations.gettext("Search") == "Søg"
+    assert domain.load_translations("da").gettext("Search") == "Find"
+    assert domain.load_translations("de").gettext("Search") == "Suche"
+
+    write_catalog(second, "de", {"Search": "Finden"}, 1)
+    assert domain.reload_changed() == ["de"]
+    assert domain.load_translations("de").gettext("Search") == "Finden"
+
+    os.remove(second / "de" / "LC_MESSAGES" / "messages.mo")
+    assert domain.reload_changed() == ["de"]
+    assert domain.load_translations("de").gettext("Search") == "Suche"
+
+    assert sorted(domain.reload()) == ["da", "de"]
+    assert domain.reload(["fr"]) == ["fr"]
+
+
+def test_reload_request_consistency(app, tmp_path):
+    """Test that a request keeps its translations during a reload."""
+    write_catalog(tmp_path, "da", {"Search": "Søg"}, 1)
+    app.config.update(
+        I18N_LANGUAGES=[("da", "Danish")],
+        I18N_TRANSLATIONS_PATHS=[str(tmp_path)],
+        I18N_RELOAD_INTERVAL=3600,
+        I18N_RELOAD_TRIGGER_FILE=str(tmp_path / "reload"),
+    )
+    i18n = InvenioI18N(app, entry_point_group=None)
+    reloader = get_catalog_reloader(app)
+    assert reloader.interval == 3600
+
+    with app.test_request_context(headers=[("Accept-Language", "da")]):
+        assert gettext("Search") == "Søg"
+        write_catalog(tmp_path, "da", {"Search": "Find"}, 2)
+        assert reloader.check() == ["da"]
+        assert gettext("Search") == "Søg"
+        g.pop("_invenio_i18n_translations")
+        assert gettext("Search") == "Find"
+
+    # Touching the trigger file reloads all cached locales.
+    assert reloader.check() == []
+    result = CliRunner().invoke(i18n_cli, ["reload-catalogs"])
+    assert result.exit_code == 0, result.output
+    assert os.path.exists(tmp_path / "reload")
+    assert reloader.check() == ["da"]
+    assert i18n.reload_translations(["da"]) == ["da"]
+
+
+def test_reloader_thread(tmp_path):
+    """Test that the reloader starts one thread per process."""
+    domain = MultidirDomain()
+    reloader = CatalogReloader(domain, 3600)
+
+    def threads():
+        return [t for t in threading.enumerate() if t.name == "invenio-i18n-reloader"]
+
+    before = len(threads())
+    reloader.ensure_started()
+    reloader.ensure_started()
+    assert len(threads()) == before + 1
+    reloader.stop()
+    threads()[-1].join(1)
+    assert len(threads()) == before
+
+
+def test_reload_catalogs_cli(app):
+    """Test the reload command without trigger file."""
+    InvenioI18N(app)
+    assert get_catalog_reloader(app) is None
+    result = CliRunner().invoke(i18n_cli, ["reload-catalogs"])
+    assert "I18N_RELOAD_TRIGGER_FILE is not set" in result.output
@@ -0,0 +1,123 @@
+# SPDX-FileCopyrightText: 2026 CERN.
+# SPDX-License-Identifier: MIT
+
+"""Timezone conversion tests."""
+
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+import flask_babel
+import pytest
+from flask import g, render_template_string
+from pytz import timezone as pytz_timezone
+
+from invenio_i18n import InvenioI18N
+from invenio_i18n.timezones import (
+    get_tzinfo,
+    get_user_timezone,
+    get_zone,
+    localize,
+    parse_timezone,
+    to_user_timezone,
+    to_utc,
+)
+
+
+def test_get_tzinfo():
+    """Test converting timezones to zoneinfo."""
+    assert get_tzinfo("Europe/Zurich") is get_tzinfo(pytz_timezone("Europe/Zurich"))
+    assert get_tzinfo("Europe/Zurich") == ZoneInfo("Europe/Zurich")
+    assert get_tzinfo(pytz_timezone("UTC")) is timezone.utc
+    assert get_tzinfo(timezone.utc) is timezone.utc
+    with pytest.raises(KeyError):
+        get_tzinfo("Nowhere/Atlantis")
+
+
+def test_get_zone_fallback(app, monkeypatch):
+    """Test falling back to pytz for names unknown to zoneinfo."""
+
+    def zone_info(name):
+        raise ZoneInfoNotFoundError(name)
+
+    monkeypatch.setattr("invenio_i18n.timezones.ZoneInfo", zone_info)
+    get_zone.cache_clear()
+    try:
+        assert get_zone("US/Pacific") is pytz_timezone("US/Pacific")
+        with pytest.raises(KeyError):
+            get_zone("Nowhere/Atlantis")
+
+        app.config["BABEL_DEFAULT_TIMEZONE"] = "US/Pacific"
+        InvenioI18N(app)
+        g.pop("_invenio_i18n_timezone", None)
+        with app.test_request_context():
+            for value in [datetime(2021, 3, 14, 2, 30), datetime(2021, 11, 7, 1, 30)]:
+                assert to_utc(value) == flask_babel.to_utc(value)
+                assert str(to_user_timezone(value)) == str(
+                    flask_babel.to_user_timezone(value)
+                )
+    finally:
+        get_zone.cache_clear()
+        g.pop("_invenio_i18n_timezone", None)
+
+
+def test_parse_timezone():
+    """Test validating timezone names."""
+    assert parse_timezone("europe/zurich") is pytz_timezone("Europe/Zurich")
+    assert get_tzinfo(parse_timezone("europe/zurich")) == ZoneInfo("Europe/Zurich")
+    for name in ["Nowhere/Atlantis", "", None, "a" * 100]:
+        assert parse_timezone(name) is None
+
+
+@pytest.mark.parametrize(
+    "naive",
+    [
+        datetime(2021, 3, 28, 2, 30),  # does not exist
+        datetime(2021, 10, 31, 2, 30),  # ambiguous
+        datetime(2021, 7, 1, 12, 0),
+    ],
+)
+def test_localize(naive):
+    """Test that local times are resolved like pytz."""
+    pytz_zone = pytz_timezone("Europe/Zurich")
+    localized = localize(naive, get_tzinfo(pytz_zone))
+    assert localized.utcoffset() == pytz_zone.localize(naive).utcoffset()
+
+
+@pytest.mark.parametrize("tz", ["UTC", "Europe/Zurich", "Australia/Lord_Howe"])
+def test_same_as_flask_babel(app, tz):
+    """Test that conversions are the same as with Flask-Babel."""
+    app.config["BABEL_DEFAULT_TIMEZONE"] = tz
+    InvenioI18N(app)
+    g.pop("_invenio_i18n_timezone", None)
+    with app.test_request_context():
+        assert get_user_timezone() is get_user_timezone()
+        start = datetime(2021, 1, 1)
+        for hours in range(0, 24 * 365, 7):
+            value = start + timedelta(hours=hours, minutes=30)
+            assert to_utc(value) == flask_babel.to_utc(value)
+            converted = to_user_timezone(value)
+            expected = flask_babel.to_user_timezone(value)
+            # Datetimes in a repeated hour never equal ones of other zones.
+            assert converted.timestamp() == expected.timestamp()
+            assert str(converted) == str(expected)
+
+
+def test_filters(app):
+    """Test the timezone template filters."""
+    selected = ["Europe/Zurich"]
+    InvenioI18N(app, timezoneselector=lambda: selected[0])
+    g.pop("_invenio_i18n_timezone", None)
+    value = datetime(2021, 7, 1, 12, 0)
+    with app.test_request_context():
+        assert render_template_string("{{ dt|tousertimezone }}", dt=value) == (
+            "2021-07-01 14:00:00+02:00"
+        )
+        assert render_template_string("{{ dt|toutc }}", dt=value) == (
+            "2021-07-01 10:00:00"
+        )
+        assert isinstance(get_user_timezone(), ZoneInfo)
+
+        # A newly selected timezone replaces the one kept in ``g``.
+        selected[0] = "America/New_York"
+        flask_babel.refresh()
+        assert str(get_user_timezone()) == "America/New_York"
@@ -4,10 +4,13 @@
 
 """Basic tests."""
 
-from flask import session, url_for
+from datetime import datetime
+
+from flask import g, render_template_string, session, url_for
 from flask_babel import get_locale
 
 from invenio_i18n import InvenioI18N
+from invenio_i18n.persistence import store_timezone
 from invenio_i18n.views import create_blueprint_from_app
 
 
@@ -96,3 +99,164 @@ def test_lang_view_redirect(app):
         assert res.location == "/"
         res = client.get(da_lang_url, headers={"Referer": "http://example.org"})
         assert res.location == "/"
+
+
+def test_lang_view_cookie_storage(app):
+    """Test storing the language in a signed cookie instead of the session."""
+    app.config.update(
+        I18N_LANGUAGES=[
+            ("da", "Danish"),
+        ],
+        I18N_LANGUAGE_STORAGE="cookie",
+        I18N_RESPONSE_HEADERS=False,
+        SECRET_KEY="CHANGEME",
+    )
+    InvenioI18N(app)
+    app.register_blueprint(create_blueprint_from_app(app))
+
+    @app.route("/")
+    def index():
+        return get_locale().language
+
+    with app.test_request_context():
+        da_lang_url = url_for("invenio_i18n.set_lang", lang_code="da")
+
+    with app.test_client() as client:
+        res = client.get(da_lang_url)
+        assert res.status_code == 302
+        assert "session" not in res.headers.get("Set-Cookie")
+        assert not session
+        cookie = client.get_cookie("language")
+        assert cookie.value.startswith("da.")
+
+        res = client.get("/")
+        assert res.get_data(as_text=True) == "da"
+        # The session was not accessed.
+        assert "Cookie" not in res.headers.get("Vary", "")
+
+        # Tampered cookies are ignored.
+        client.set_cookie("language", "da.invalid")
+        res = client.get("/")
+        assert res.get_data(as_text=True) == "en"
+
+
+def test_url_prefix_routing(app):
+    """Test selecting the language with a URL prefix."""
+    app.config.update(
+        I18N_LANGUAGES=[("da", "Danish"), ("pt_BR", "Portuguese")],
+        I18N_URL_PREFIX_ROUTING=True,
+        SECRET_KEY="CHANGEME",
+    )
+    InvenioI18N(app)
+    app.register_blueprint(create_blueprint_from_app(app))
+
+    @app.route("/page/")
+    def page():
+        return f"{get_locale()} {url_for('page')} {url_for('static', filename='x.css')}"
+
+    with app.test_client() as client:
+        res = client.get("/page/")
+        assert res.get_data(as_text=True) == "en /page/ /static/x.css"
+        res = client.get("/da/page/")
+        assert res.get_data(as_text=True) == "da /da/page/ /static/x.css"
+        res = client.get("/pt_BR/page/")
+        assert res.get_data(as_text=True) == "pt_BR /pt_BR/page/ /static/x.css"
+        assert client.get("/es/page/").status_code == 404
+
+        # Other spellings of a language code redirect to the configured one.
+        res = client.get("/pt-br/page/?q=1")
+        assert res.status_code == 301
+        assert res.location == "/pt_BR/page/?q=1"
+        res = client.get("/DA/page/")
+        assert res.status_code == 301
+        assert res.location == "/da/page/"
+
+        # Switching the language keeps the page but replaces the prefix.
+        res = client.get("/da/lang/pt_BR", headers={"Referer": "/da/page/"})
+        assert res.location == "/pt_BR/page/"
+        res = client.get("/lang/da?next=/page/")
+        assert res.location == "/da/page/"
+        res = client.get("/lang/da")
+        assert res.location == "/da/"
+
+
+def test_response_headers(app):
+    """Test Content-Language and Vary headers of localized responses."""
+    app.config.update(
+        I18N_LANGUAGES=[("da", "Danish"), ("pt_BR", "Portuguese")],
+        I18N_URL_PREFIX_ROUTING=True,
+    )
+    InvenioI18N(app)
+
+    @app.route("/localized")
+    def localized():
+        return get_locale().language
+
+    @app.route("/plain")
+    def plain():
+        return "plain"
+
+    def get(client, url, **kwargs):
+        # The application context (and ``g``) is shared by all requests of a
+        # test, so drop the locale selected by a previous request.
+        g.pop("_invenio_i18n_selection", None)
+        return client.get(url, **kwargs)
+
+    with app.test_client() as client:
+        res = get(client, "/localized", headers={"Accept-Language": "pt-BR"})
+        assert res.headers["Content-Language"] == "pt-BR"
+        assert set(res.vary) == {"Accept-Language", "Cookie"}
+
+        res = get(client, "/localized?ln=da")
+        assert res.headers["Content-Language"] == "da"
+        assert "Vary" not in res.headers
+
+        res = get(client, "/da/localized")
+        assert res.headers["Content-Language"] == "da"
+        assert "Vary" not in res.headers
+
+        res = get(client, "/plain", headers={"Accept-Language": "da"})
+        assert "Content-Language" not in res.headers
+        assert "Vary" not in res.headers
+
+
+def test_timezone_vary_header(app):
+    """Test that responses using the stored timezone vary on cookies."""
+    app.config.update(
+        I18N_LANGUAGES=[("de", "German")],
+        I18N_URL_PREFIX_ROUTING=True,
+        I18N_LANGUAGE_STORAGE="cookie",
+        SECRET_KEY="CHANGEME",
+    )
+    InvenioI18N(app)
+
+    @app.route("/r")
+    def record():
+        return render_template_string(
+            "{{ dt|format_time('HH:mm zzzz') }}", dt=datetime(2021, 7, 1, 12)
+        )
+
+    @app.route("/tz")
+    def set_timezone():
+        return store_timezone(app.response_class(""), "Asia/Tokyo")
+
+    def get(client, url):
+        # The application context (and ``g``) is shared by all requests of a
+        # test, so drop the timezone selected by a previous request.
+        for key in ["_flask_babel", "_invenio_i18n_timezone_vary"]:
+            g.pop(key, None)
+        return client.get(url)
+
+    with app.test_client() as client:
+        res = get(client, "/de/r")
+        assert res.get_data(as_text=True) == "12:00 Koordinierte Weltzeit"
+        assert "Cookie" in res.vary
+
+        client.get("/tz")
+        res = get(client, "/de/r")
+        assert res.get_data(as_text=True) == "21:00 Japanische Normalzeit"
+        assert "Cookie" in res.vary
+
+        res = get(client, "/de/r?tz=Europe/Zurich")
+        assert res.get_data(as_text=True) == ("14:00 Mitteleuropäische Sommerzeit")
+        assert "Vary" not in res.headers